@@ -1 +1,7 @@
-from .eda import EDA
+try:
+    from .eda import EDA
+except ImportError:
+    EDA = None
+
+from .event_validation import pre_post_table
+from .event_matrix import build_event_indicator_matrix
@@ -0,0 +1,157 @@
+"""Event × indicator association matrix.
+
+Notebook 03 built `outputs/event_indicator_matrix.csv` in a cell that probed
+column names, merged impact links onto their events and pivoted the mean
+impact. Notebook 04 and the dashboard then read that CSV, which
+went stale whenever the unified data changed.
+
+`build_event_indicator_matrix(store)` builds the same matrix from a
+`UnifiedStore`, accumulating the (event, indicator) means with `np.bincount`
+into a SciPy sparse matrix, and caches it next to the store under a content
+hash of the input rows, so callers can ask for it every time and only pay for a
+rebuild when the events or impact links actually change. The cache keeps the
+`MAX_CACHED` most recently used matrices, so callers alternating between
+value columns or stores still hit it.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+
+from src.forecasting.events import link_estimates
+
+CACHE_DIR = "matrix_cache"
+MAX_CACHED = 16
+EVENT_COLUMNS = ["record_id", "indicator"]
+LINK_COLUMNS = ["parent_id", "related_indicator", "impact_estimate", "impact_magnitude", "impact_direction"]
+
+PathLike = Union[str, os.PathLike]
+
+
+def _frame(store, record_type: str, columns) -> pd.DataFrame:
+    frame = store.events(arrow=False) if record_type == "event" else store.impact_links(arrow=False)
+    return frame.reindex(columns=columns).reset_index(drop=True)
+
+
+def content_hash(*frames: pd.DataFrame) -> str:
+    """Order-independent SHA-256 over the rows of the given frames."""
+
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(",".join(map(str, frame.columns)).encode())
+        rows = np.sort(pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy())
+        digest.update(rows.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(events: pd.DataFrame, links: pd.DataFrame, value_col: Optional[str] = None) -> str:
+    """Hash of the input rows and of the value the matrix averages."""
+
+    digest = hashlib.sha256(content_hash(events, links).encode())
+    digest.update(f"\0value={value_col or 'estimate'}".encode())
+    return digest.hexdigest()
+
+
+def matrix_from_links(events: pd.DataFrame, links: pd.DataFrame, value_col: Optional[str] = None) -> Tuple[sp.csr_matrix, np.ndarray, np.ndarray]:
+    """Sparse (event × indicator) mean impact, with the event and indicator labels.
+
+    The impact is each link's signed estimate (see `link_estimates`), or the
+    numeric values of `value_col` when given.
+    """
+
+    names = events.drop_duplicates("record_id").set_index("record_id")["indicator"]
+    parent = links["parent_id"]
+    event_name = parent.map(names).fillna(parent)
+    if value_col is None:
+        value = pd.Series(link_estimates(links), index=links.index)
+    else:
+        value = pd.to_numeric(links[value_col], errors="coerce")
+    keep = event_name.notna() & links["related_indicator"].notna() & value.notna()
+    event_name, indicator, value = event_name[keep].astype(str), links.loc[keep, "related_indicator"].astype(str), value[keep]
+
+    row_codes, row_labels = pd.factorize(event_name, sort=True)
+    col_codes, col_labels = pd.factorize(indicator, sort=True)
+    shape = (len(row_labels), len(col_labels))
+    cell = row_codes * max(shape[1], 1) + col_codes
+    size = shape[0] * shape[1]
+    totals = np.bincount(cell, weights=value.to_numpy(dtype=float), minlength=size)
+    counts = np.bincount(cell, minlength=size)
+    filled = np.flatnonzero(counts)
+    means = totals[filled] / counts[filled]
+    matrix = sp.csr_matrix((means, np.divmod(filled, max(shape[1], 1))), shape=shape)
+    return matrix, np.asarray(row_labels, dtype=str), np.asarray(col_labels, dtype=str)
+
+
+def _load(path: Path) -> Tuple[sp.csr_matrix, np.ndarray, np.ndarray]:
+    # The modification time doubles as the last-use time for eviction
+    os.utime(path)
+    with np.load(path) as cached:
+        matrix = sp.csr_matrix((cached["data"], cached["indices"], cached["indptr"]), shape=tuple(cached["shape"]))
+        return matrix, cached["events"], cached["indicators"]
+
+
+def _save(path: Path, matrix: sp.csr_matrix, events: np.ndarray, indicators: np.ndarray):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(
+        tmp,
+        data=matrix.data,
+        indices=matrix.indices,
+        indptr=matrix.indptr,
+        shape=np.asarray(matrix.shape),
+        events=events,
+        indicators=indicators,
+    )
+    os.replace(tmp, path)
+    # Keep the most recently used matrices; older inputs are unlikely to come back
+    cached = sorted(path.parent.glob("event_indicator_*.npz"), key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for stale in cached[MAX_CACHED:]:
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def build_event_indicator_matrix(
+    store,
+    sparse: bool = False,
+    cache_dir: Optional[PathLike] = None,
+    use_cache: bool = True,
+    value_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """Event × indicator matrix of mean impact from a `UnifiedStore`.
+
+    Rows are event names (the event's `indicator` field, falling back to its
+    `record_id`), columns are related indicators and missing pairs are 0, as
+    in the notebook CSV. Cells average each link's numeric `impact_estimate`,
+    falling back to a numeric `impact_magnitude` like `impact_table` (the
+    unified data stores magnitude as high/medium/low text); pass `value_col`
+    to average another numeric column instead. With `sparse=True` the frame
+    is backed by a pandas sparse dtype instead of being densified.
+
+    The result is cached in `cache_dir` (default: `<store root>/matrix_cache`)
+    under a hash of the event and impact-link rows it was built from.
+    """
+
+    link_columns = LINK_COLUMNS if value_col is None or value_col in LINK_COLUMNS else LINK_COLUMNS + [value_col]
+    events = _frame(store, "event", EVENT_COLUMNS)
+    links = _frame(store, "impact_link", link_columns)
+
+    key = cache_key(events, links, value_col)
+    path = Path(cache_dir if cache_dir is not None else Path(store.root) / CACHE_DIR) / f"event_indicator_{key[:16]}.npz"
+    if use_cache and path.exists():
+        matrix, rows, cols = _load(path)
+    else:
+        matrix, rows, cols = matrix_from_links(events, links, value_col)
+        if use_cache:
+            _save(path, matrix, rows, cols)
+
+    index = pd.Index(rows, name="event_name")
+    columns = pd.Index(cols, name="indicator_code")
+    if sparse:
+        return pd.DataFrame.sparse.from_spmatrix(matrix, index=index, columns=columns)
+    return pd.DataFrame(matrix.toarray(), index=index, columns=columns)
@@ -13,6 +13,25 @@ repo_root = Path(__file__).parent.parent.parent
 if str(repo_root) not in sys.path:
     sys.path.insert(0, str(repo_root))
 
+from src.analysis.event_matrix import build_event_indicator_matrix
+from src.dashboard.downsample import webgl_figure
+from src.dashboard.exports import FORMATS, STATIC_EXPORT_DIR, ExportCache, iter_chunks, static_url
+from src.dashboard.live_forecast import TREND_MODELS, LiveForecaster
+from src.dashboard.queries import DashboardQueries
+from src.dashboard.shared_cache import SharedArrowCache, data_version_stamp
+from src.data.unified_store import UnifiedStore
+from src.forecasting import ForecastEngine, MonteCarloForecaster, TargetSolver, impact_table
+
+# Published forecast columns -> (indicator, line colour, band fill) for the simulated uncertainty bands
+BAND_SERIES = {
+    'Access': ('ACC_OWNERSHIP', 'blue', 'rgba(0,0,255,0.2)'),
+    'Usage': ('ACC_MM_ACCOUNT', 'green', 'rgba(0,255,0,0.2)'),
+}
+BAND_YEARS = tuple(range(2025, 2031))
+BAND_DRAWS = 10_000
+WEBGL_THRESHOLD = 20_000  # filtered rows above which the Trends page defaults to WebGL
+VIEWPORT_PX = 1200
+
 # Set page config
 st.set_page_config(
     page_title="Ethiopia Financial Inclusion Dashboard",
@@ -41,29 +60,94 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def open_store():
+    """Open the indexed columnar store, rebuilding it only when the CSV changes"""
+    return UnifiedStore.open_or_build(repo_root / 'data' / 'processed' / 'ethiopia_fi_unified_data_enriched.csv')
+
+
+def export_download(chunks, filters, fmt, version, file_name, label, key):
+    """Link to a cached export, building it only when the user asks.
+
+    Exports live in Streamlit's static folder, so the browser streams the file
+    from disk instead of the session holding its bytes for `st.download_button`.
+    """
+    cache = ExportCache(STATIC_EXPORT_DIR)
+    path = cache.lookup(filters, fmt, version=version)
+    if path is None:
+        if not st.button("Prepare export", key=key, help="Write the file once; later requests reuse it"):
+            return
+        with st.spinner("Writing export..."):
+            path = cache.get_or_create(chunks, filters, fmt, version=version)
+    st.markdown(
+        f'<a href="{static_url(path)}" download="{file_name}">📥 {label}</a>',
+        unsafe_allow_html=True
+    )
+
+
 # Load data
-@st.cache_data
-def load_data():
-    """Load all necessary data for the dashboard"""
-    try:
-        # Historical data
-        df = pd.read_csv(repo_root / 'data' / 'processed' / 'ethiopia_fi_unified_data_enriched.csv')
-        observations = df[df['record_type'] == 'observation'].copy()
-        observations['observation_date'] = pd.to_datetime(observations['observation_date'], errors='coerce')
+@st.cache_resource(max_entries=1)
+def load_data(stamp):
+    """Load all necessary data for the dashboard.
+
+    Frames come from the shared Arrow cache, so every worker and session maps
+    the same files; `stamp` changes whenever data/processed or outputs/ do.
+    Like the loaders below it keeps only the current stamp, so a data change
+    frees the previous version's frames and models.
+    """
+    store = open_store()
+    cache = SharedArrowCache()
+
+    # Historical data, prepared once per stamp for the query layer
+    queries = DashboardQueries.from_shared_cache(store, cache, stamp)
+
+    # Event impact matrix (cached next to the store, rebuilt only when events or links change)
+    matrix = build_event_indicator_matrix(store)
+
+    # Published forecasts (optional: the Forecasts page also computes live ones)
+    forecasts_path = repo_root / 'outputs' / 'financial_inclusion_forecasts_2025_2027.csv'
+    forecasts = None
+    if forecasts_path.exists():
+        forecasts = cache.get_or_build('published_forecasts', lambda: pd.read_csv(forecasts_path), stamp)
+
+    return queries, matrix, forecasts
 
-        # Event impact matrix
-        matrix = pd.read_csv(repo_root / 'outputs' / 'event_indicator_matrix.csv', index_col=0)
 
-        # Forecasts
-        forecasts = pd.read_csv(repo_root / 'outputs' / 'financial_inclusion_forecasts_2025_2027.csv')
+@st.cache_resource(max_entries=1)
+def load_forecaster(stamp):
+    """Live forecaster whose trend fits are memoized per (indicator, version, model)"""
+    return LiveForecaster.from_store(open_store(), load_data(stamp)[0])
+
+
+@st.cache_resource(max_entries=1)
+def load_target_solver(stamp):
+    """Target-attainment solver over simulated trajectories, one per data version"""
+    store = open_store()
+    impacts = impact_table(store.impact_links(arrow=False), store.events(arrow=False))
+    return TargetSolver.from_engine(ForecastEngine.from_store(store), impacts, n_draws=2000, seed=42)
+
+
+@st.cache_resource(max_entries=1)
+def load_forecast_bands(stamp, seed):
+    """National P5–P95 prediction intervals simulated over the store; `seed` changes on refresh"""
+    store = open_store()
+    impacts = impact_table(store.impact_links(arrow=False), store.events(arrow=False))
+    engine = ForecastEngine.from_store(store, [indicator for indicator, _, _ in BAND_SERIES.values()])
+    bands = MonteCarloForecaster(engine, impacts, n_draws=BAND_DRAWS, seed=seed).bands(BAND_YEARS)
+    for col in ('gender', 'region'):
+        if col in bands.columns:
+            bands = bands[bands[col] == 'all']
+    return bands
 
-        return observations, matrix, forecasts
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return None, None, None
 
 # Load data
-observations, matrix, forecasts = load_data()
+try:
+    open_store()  # refresh the store first so the stamp covers it
+    data_version = data_version_stamp()
+    queries, matrix, forecasts = load_data(data_version)
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    data_version, queries, matrix, forecasts = None, None, None, None
+observations = queries.observations if queries is not None else None
 
 if observations is None:
     st.error("Failed to load data. Please ensure all previous tasks are completed.")
@@ -93,22 +177,13 @@ if page == "🏠 Overview":
     # Current metrics
     col1, col2, col3, col4 = st.columns(4)
 
-    # Get latest values
-    latest_access = observations[observations['indicator_code'] == 'ACC_OWNERSHIP']['value_numeric'].max()
-    latest_usage = observations[observations['indicator_code'] == 'ACC_MM_ACCOUNT']['value_numeric'].max()
-
-    # Calculate growth rates
-    access_data = observations[observations['indicator_code'] == 'ACC_OWNERSHIP'].sort_values('observation_date')
-    if len(access_data) >= 2:
-        access_growth = (access_data['value_numeric'].iloc[-1] - access_data['value_numeric'].iloc[-2]) / access_data['value_numeric'].iloc[-2] * 100
-    else:
-        access_growth = 0
-
-    usage_data = observations[observations['indicator_code'] == 'ACC_MM_ACCOUNT'].sort_values('observation_date')
-    if len(usage_data) >= 2:
-        usage_growth = (usage_data['value_numeric'].iloc[-1] - usage_data['value_numeric'].iloc[-2]) / usage_data['value_numeric'].iloc[-2] * 100
-    else:
-        usage_growth = 0
+    # Get latest values and growth rates (precomputed per indicator)
+    latest_access = queries.stat('ACC_OWNERSHIP', 'max', np.nan)
+    latest_usage = queries.stat('ACC_MM_ACCOUNT', 'max', np.nan)
+    access_growth = queries.stat('ACC_OWNERSHIP', 'growth_pct')
+    usage_growth = queries.stat('ACC_MM_ACCOUNT', 'growth_pct')
+    access_data = queries.series('ACC_OWNERSHIP')
+    usage_data = queries.series('ACC_MM_ACCOUNT')
 
     with col1:
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
@@ -122,11 +197,9 @@ if page == "🏠 Overview":
 
     with col3:
         # P2P vs ATM ratio (simplified)
-        p2p_data = observations[observations['indicator_code'].str.contains('P2P', na=False)]
-        atm_data = observations[observations['indicator_code'].str.contains('ATM', na=False)]
-        if not p2p_data.empty and not atm_data.empty:
-            p2p_latest = p2p_data['value_numeric'].max()
-            atm_latest = atm_data['value_numeric'].max()
+        p2p_latest = queries.max_matching('P2P')
+        atm_latest = queries.max_matching('ATM')
+        if p2p_latest is not None and atm_latest is not None:
             ratio = p2p_latest / atm_latest if atm_latest > 0 else 0
         else:
             ratio = 0
@@ -136,11 +209,7 @@ if page == "🏠 Overview":
 
     with col4:
         # Digital payments adoption
-        digital_data = observations[observations['indicator_code'] == 'USG_DIGITAL_PAYMENT']
-        if not digital_data.empty:
-            digital_latest = digital_data['value_numeric'].max()
-        else:
-            digital_latest = 0
+        digital_latest = queries.stat('USG_DIGITAL_PAYMENT', 'max')
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
         st.metric("Digital Payments", f"{digital_latest:.1f}%")
         st.markdown('</div>', unsafe_allow_html=True)
@@ -183,23 +252,23 @@ elif page == "📈 Trends":
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        indicators = observations['indicator_code'].unique()
+        indicators = queries.indicators
         selected_indicators = st.multiselect(
             "Select Indicators",
             options=indicators,
-            default=['ACC_OWNERSHIP', 'ACC_MM_ACCOUNT', 'USG_DIGITAL_PAYMENT'],
+            default=[code for code in ['ACC_OWNERSHIP', 'ACC_MM_ACCOUNT', 'USG_DIGITAL_PAYMENT'] if code in indicators],
             help="Choose which indicators to display"
         )
 
     with col2:
         date_range = st.date_input(
             "Date Range",
-            value=(observations['observation_date'].min(), observations['observation_date'].max()),
+            value=queries.date_range,
             help="Filter data by date range"
         )
 
     with col3:
-        sources = observations['source_name'].unique()
+        sources = queries.sources
         selected_sources = st.multiselect(
             "Data Sources",
             options=sources,
@@ -208,16 +277,34 @@ elif page == "📈 Trends":
         )
 
     # Filter data
-    filtered_data = observations[
-        (observations['indicator_code'].isin(selected_indicators)) &
-        (observations['observation_date'] >= pd.to_datetime(date_range[0])) &
-        (observations['observation_date'] <= pd.to_datetime(date_range[1])) &
-        (observations['source_name'].isin(selected_sources))
-    ]
+    start_date = pd.to_datetime(date_range[0])
+    end_date = pd.to_datetime(date_range[-1])
+    filtered_data = queries.filtered(selected_indicators, selected_sources, start_date, end_date)
 
     # Interactive time series
     st.subheader("📊 Interactive Time Series")
-    if not filtered_data.empty:
+    webgl = st.toggle(
+        "WebGL rendering (downsampled)",
+        value=len(filtered_data) > WEBGL_THRESHOLD,
+        help="Draw with Scattergl and reduce each series to about one point per pixel"
+    )
+    if not filtered_data.empty and webgl:
+        # Zooming re-queries the indexed store, so a narrow range comes back at full resolution
+        zoom = st.slider(
+            "Zoom",
+            min_value=start_date.to_pydatetime(),
+            max_value=max(end_date, start_date + pd.Timedelta(days=1)).to_pydatetime(),
+            value=(start_date.to_pydatetime(), max(end_date, start_date + pd.Timedelta(days=1)).to_pydatetime())
+        )
+        method = st.radio("Downsampling", ["lttb", "minmax"], horizontal=True,
+                          help="LTTB keeps the shape; min-max keeps every spike")
+        zoomed = queries.filtered(selected_indicators, selected_sources, zoom[0], zoom[1])
+        fig = webgl_figure(zoomed, viewport_px=VIEWPORT_PX, method=method,
+                           title='Financial Inclusion Indicators Over Time')
+        fig.update_layout(xaxis_title='Date', yaxis_title='Value (%)', legend_title='Indicator')
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"{sum(len(trace.x) for trace in fig.data):,} of {len(zoomed):,} points drawn")
+    elif not filtered_data.empty:
         fig = px.line(filtered_data, x='observation_date', y='value_numeric',
                      color='indicator_code', line_group='source_name',
                      title='Financial Inclusion Indicators Over Time',
@@ -235,10 +322,8 @@ elif page == "📈 Trends":
     st.markdown("---")
     st.subheader("🏦 Channel Comparison")
 
-    # Group by indicator and source
-    channel_data = filtered_data.groupby(['indicator_code', 'source_name']).agg({
-        'value_numeric': 'mean'
-    }).reset_index()
+    # Mean by indicator and source, from the precomputed cumulative sums
+    channel_data = queries.channel_means(selected_indicators, selected_sources, start_date, end_date)
 
     if not channel_data.empty:
         fig = px.bar(channel_data, x='indicator_code', y='value_numeric',
@@ -250,99 +335,147 @@ elif page == "📈 Trends":
     # Data download
     st.markdown("---")
     st.subheader("📥 Download Data")
-    csv = filtered_data.to_csv(index=False)
-    st.download_button(
-        label="Download Filtered Data as CSV",
-        data=csv,
-        file_name='filtered_financial_inclusion_data.csv',
-        mime='text/csv',
-        help="Download the filtered dataset for further analysis"
+    export_format = st.selectbox("Format", list(FORMATS), key="trends_export_format")
+    # Streamed to disk in chunks and shared by every session asking for the same slice
+    export_filters = {
+        'indicators': sorted(selected_indicators), 'sources': sorted(selected_sources),
+        'start': start_date, 'end': end_date,
+    }
+    export_download(
+        lambda: queries.iter_filtered(selected_indicators, selected_sources, start_date, end_date),
+        export_filters, export_format, data_version,
+        file_name=f'filtered_financial_inclusion_data.{FORMATS[export_format][0]}',
+        label=f"Download Filtered Data as {export_format.upper()}",
+        key="trends_export"
     )
 
 elif page == "🔮 Forecasts":
     st.title("🔮 Financial Inclusion Forecasts")
     st.markdown("Explore future projections for Access and Usage indicators")
 
-    if forecasts is None:
-        st.error("Forecast data not available. Please ensure Task 4 is completed.")
-    else:
-        # Model selection
+    # Live forecast: trend fits are cached, sliders only re-run the event overlay
+    st.subheader("⚡ Live Forecast")
+    forecaster = load_forecaster(data_version)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        live_indicator = st.selectbox(
+            "Indicator",
+            options=queries.indicators,
+            index=queries.indicators.index('ACC_OWNERSHIP') if 'ACC_OWNERSHIP' in queries.indicators else 0
+        )
+    with col2:
         model_type = st.selectbox(
             "Select Forecast Model",
             ["Event-Augmented", "Trend Only"],
             help="Choose between models with or without event impacts"
         )
-
-        # Forecast visualization
-        st.subheader("📈 Forecast Projections (2025-2027)")
-
-        # Create forecast plot
+    with col3:
+        trend_model = st.selectbox("Trend", list(TREND_MODELS), help="Shape of the fitted trend")
+
+    last_year = int(queries.stat(live_indicator, 'last_date', pd.Timestamp.today()).year)
+    horizon = st.slider("Forecast horizon (years)", min_value=1, max_value=10, value=3)
+
+    event_scale = {}
+    linked_events = forecaster.events(live_indicator)
+    if model_type == "Event-Augmented" and not linked_events.empty:
+        with st.expander("Event magnitudes", expanded=False):
+            for event in linked_events.itertuples():
+                event_scale[event.event_id] = st.slider(
+                    f"{event.event_name} ({event.estimate:+.1f})",
+                    min_value=0.0, max_value=2.0, value=1.0, step=0.1,
+                    key=f"event_scale_{event.event_id}",
+                    help="Multiplier on the event's estimated impact"
+                )
+
+    live_years = list(range(last_year + 1, last_year + horizon + 1))
+    try:
+        live = forecaster.forecast(
+            live_indicator, live_years, model_type=trend_model,
+            with_events=model_type == "Event-Augmented", event_scale=event_scale
+        )
+        history = queries.series(live_indicator)
         fig = go.Figure()
+        fig.add_trace(go.Scatter(x=history['observation_date'].dt.year, y=history['value_numeric'],
+                                 mode='markers', name='Observed'))
+        fig.add_trace(go.Scatter(x=live['year'], y=live['forecast'], mode='lines+markers',
+                                 name='Trend', line=dict(dash='dash')))
+        if model_type == "Event-Augmented":
+            fig.add_trace(go.Scatter(x=live['year'], y=live['forecast_events'], mode='lines+markers',
+                                     name='With events', line=dict(width=3)))
+        fig.update_layout(title=f'{live_indicator} forecast', xaxis_title='Year', yaxis_title='Value')
+        st.plotly_chart(fig, use_container_width=True)
+    except ValueError as e:
+        st.warning(f"Cannot forecast {live_indicator}: {e}")
 
-        # Base forecast
-        fig.add_trace(go.Scatter(
-            x=forecasts['Year'],
-            y=forecasts['Access_Base'],
-            mode='lines+markers',
-            name='Access - Base',
-            line=dict(color='blue', width=3)
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=forecasts['Year'],
-            y=forecasts['Usage_Base'],
-            mode='lines+markers',
-            name='Usage - Base',
-            line=dict(color='green', width=3)
-        ))
-
-        # Uncertainty bands
+    st.markdown("---")
+    st.subheader("📈 Forecast Projections with Prediction Intervals")
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.caption(f"P5–P95 bands from {BAND_DRAWS:,} simulated trajectories per series "
+                   "(trend posterior, event impacts and residual noise)")
+    with col2:
+        # A refresh re-simulates with fresh draws (and re-reads the store)
+        if st.button("🔄 Refresh bands", help="Re-run the Monte Carlo simulation"):
+            load_forecast_bands.clear()
+            st.session_state['band_seed'] = st.session_state.get('band_seed', 42) + 1
+    bands = load_forecast_bands(data_version, st.session_state.get('band_seed', 42))
+
+    # Published base forecast per year, where the file has one
+    published = {}
+    if forecasts is not None:
+        for name in BAND_SERIES:
+            published[name] = dict(zip(forecasts['Year'].astype(int), forecasts[f'{name}_Base']))
+
+    fig = go.Figure()
+    for name, (indicator, color, fill) in BAND_SERIES.items():
+        series = bands[bands['indicator_code'] == indicator]
+        if series.empty:
+            continue
+        years = series['year'].tolist()
         fig.add_trace(go.Scatter(
-            x=forecasts['Year'].tolist() + forecasts['Year'].tolist()[::-1],
-            y=forecasts['Access_Optimistic'].tolist() + forecasts['Access_Pessimistic'].tolist()[::-1],
+            x=years + years[::-1],
+            y=series['p95'].tolist() + series['p5'].tolist()[::-1],
             fill='toself',
-            fillcolor='rgba(0,0,255,0.2)',
+            fillcolor=fill,
             line=dict(color='rgba(255,255,255,0)'),
-            name='Access Uncertainty'
+            name=f'{name} P5–P95'
         ))
-
         fig.add_trace(go.Scatter(
-            x=forecasts['Year'].tolist() + forecasts['Year'].tolist()[::-1],
-            y=forecasts['Usage_Optimistic'].tolist() + forecasts['Usage_Pessimistic'].tolist()[::-1],
-            fill='toself',
-            fillcolor='rgba(0,255,0,0.2)',
-            line=dict(color='rgba(255,255,255,0)'),
-            name='Usage Uncertainty'
+            x=years, y=series['p50'], mode='lines+markers',
+            name=f'{name} - Median', line=dict(color=color, width=3)
         ))
+        if name in published:
+            fig.add_trace(go.Scatter(
+                x=list(published[name]), y=list(published[name].values()), mode='markers',
+                name=f'{name} - Published Base', marker=dict(color=color, symbol='diamond', size=10)
+            ))
 
-        fig.update_layout(
-            title='Financial Inclusion Forecasts with Uncertainty',
-            xaxis_title='Year',
-            yaxis_title='Rate (%)',
-            showlegend=True
-        )
-
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Key milestones
-        st.markdown("---")
-        st.subheader("🎯 Key Milestones")
+    fig.update_layout(
+        title='Financial Inclusion Forecasts with Uncertainty',
+        xaxis_title='Year',
+        yaxis_title='Rate (%)',
+        showlegend=True
+    )
 
-        col1, col2 = st.columns(2)
+    st.plotly_chart(fig, use_container_width=True)
 
-        with col1:
-            st.markdown("### Access Milestones")
-            for _, row in forecasts.iterrows():
-                st.markdown(f"**{int(row['Year'])}**: {row['Access_Base']:.1f}% (Range: {row['Access_Pessimistic']:.1f}% - {row['Access_Optimistic']:.1f}%)")
+    # Key milestones
+    st.markdown("---")
+    st.subheader("🎯 Key Milestones")
 
-        with col2:
-            st.markdown("### Usage Milestones")
-            for _, row in forecasts.iterrows():
-                st.markdown(f"**{int(row['Year'])}**: {row['Usage_Base']:.1f}% (Range: {row['Usage_Pessimistic']:.1f}% - {row['Usage_Optimistic']:.1f}%)")
+    for column, (name, (indicator, _, _)) in zip(st.columns(2), BAND_SERIES.items()):
+        with column:
+            st.markdown(f"### {name} Milestones")
+            for row in bands[bands['indicator_code'] == indicator].itertuples():
+                st.markdown(f"**{row.year}**: {row.p50:.1f}% (P5–P95: {row.p5:.1f}% - {row.p95:.1f}%)")
 
+    if forecasts is None:
+        st.info("Published forecast file not available; showing simulated forecasts only.")
+    else:
         # Forecast table
         st.markdown("---")
-        st.subheader("📊 Forecast Data Table")
+        st.subheader("📊 Published Forecast Data Table")
         st.dataframe(forecasts.style.format({
             'Access_Base': '{:.1f}%',
             'Access_Optimistic': '{:.1f}%',
@@ -352,14 +485,12 @@ elif page == "🔮 Forecasts":
             'Usage_Pessimistic': '{:.1f}%'
         }))
 
-        # Download forecasts
-        csv = forecasts.to_csv(index=False)
-        st.download_button(
-            label="Download Forecast Data as CSV",
-            data=csv,
+        # Download forecasts (the stamp covers outputs/, so it versions the published file too)
+        export_download(
+            lambda: iter_chunks(forecasts), {'table': 'forecasts'}, 'csv', data_version,
             file_name='financial_inclusion_forecasts.csv',
-            mime='text/csv',
-            help="Download the forecast data for further analysis"
+            label="Download Forecast Data as CSV",
+            key="forecasts_export"
         )
 
 elif page == "🎯 Inclusion Projections":
@@ -387,20 +518,38 @@ elif page == "🎯 Inclusion Projections":
             access_col = "Access_Pessimistic"
             usage_col = "Usage_Pessimistic"
 
-        # Progress toward 60% target
-        st.subheader("🎯 Progress Toward 60% Financial Inclusion Target")
+        col1, col2 = st.columns(2)
+        with col1:
+            target = st.slider("Target (%)", min_value=10, max_value=100, value=60, step=5)
+        with col2:
+            horizon_end = st.slider("Search horizon", min_value=2027, max_value=2050, value=2040)
+
+        # Progress toward target
+        st.subheader(f"🎯 Progress Toward {target}% Financial Inclusion Target")
 
         # Create progress visualization
-        target = 60
-        current_access = observations[observations['indicator_code'] == 'ACC_OWNERSHIP']['value_numeric'].max()
-        current_usage = observations[observations['indicator_code'] == 'ACC_MM_ACCOUNT']['value_numeric'].max()
+        current_access = queries.stat('ACC_OWNERSHIP', 'max', np.nan)
+        current_usage = queries.stat('ACC_MM_ACCOUNT', 'max', np.nan)
+
+        # Crossing-time distribution from simulated trajectories: the scenario
+        # picks the early (p10), median or late (p90) crossing
+        quantile = {"Base Case": "p50", "Optimistic": "p10", "Pessimistic": "p90"}[scenario]
+        attainment = load_target_solver(data_version).solve(
+            {'ACC_OWNERSHIP': target, 'ACC_MM_ACCOUNT': target}, horizon=range(2025, horizon_end + 1)
+        )
+        for col in ('gender', 'region'):
+            if col in attainment.columns:
+                attainment = attainment[attainment[col] == 'all']
 
-        # Project when target will be reached
-        access_years = forecasts[forecasts[access_col] >= target]['Year']
-        usage_years = forecasts[forecasts[usage_col] >= target]['Year']
+        def target_reach(indicator):
+            row = attainment[attainment['indicator_code'] == indicator]
+            if row.empty or np.isnan(row[f'first_year_{quantile}'].iloc[0]):
+                return f"Beyond {horizon_end}"
+            row = row.iloc[0]
+            return f"{int(row[f'first_year_{quantile}'])} ({row['probability']:.0%} chance by {horizon_end})"
 
-        access_target_year = access_years.min() if not access_years.empty else "Beyond 2027"
-        usage_target_year = usage_years.min() if not usage_years.empty else "Beyond 2027"
+        access_target_year = target_reach('ACC_OWNERSHIP')
+        usage_target_year = target_reach('ACC_MM_ACCOUNT')
 
         col1, col2 = st.columns(2)
 
@@ -515,10 +664,10 @@ elif page == "🎯 Inclusion Projections":
 
         # Add target line
         fig.add_hline(y=target, line_dash="dash", line_color="red",
-                     annotation_text="60% Target", annotation_position="bottom right")
+                     annotation_text=f"{target}% Target", annotation_position="bottom right")
 
         fig.update_layout(
-            title='Scenario Projections vs 60% Target',
+            title=f'Scenario Projections vs {target}% Target',
             xaxis_title='Year',
             yaxis_title='Inclusion Rate (%)',
             showlegend=True
@@ -549,7 +698,7 @@ elif page == "🎯 Inclusion Projections":
         st.markdown("**What will inclusion look like in 2025-2027?**")
         st.markdown(f"""
         - **Base Case**: Access reaches {forecasts[access_col].iloc[-1]:.1f}%, Usage reaches {forecasts[usage_col].iloc[-1]:.1f}%
-        - **60% Target**: Access target reached by {access_target_year}, Usage by {usage_target_year}
+        - **{target}% Target**: Access target reached by {access_target_year}, Usage by {usage_target_year}
         - **Key Risks**: Economic slowdowns, regulatory changes, technology adoption barriers
         - **Opportunities**: Continued mobile innovation, infrastructure expansion, policy reforms
         """)
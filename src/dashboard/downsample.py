@@ -0,0 +1,120 @@
+"""Server-side downsampling for large time-series plots.
+
+Monthly operator data (mobile-money transactions, agent counts) makes the
+Trends page send hundreds of thousands of points to `px.line`. Here each
+series is reduced before it leaves the server to roughly one point per
+horizontal pixel, using either:
+
+- `lttb`: Largest-Triangle-Three-Buckets, which keeps the visual shape;
+- `minmax`: the minimum and maximum of each bucket, which keeps every spike.
+
+`webgl_figure` draws the result with `go.Scattergl`. Zooming is handled by the
+caller re-querying the zoomed range and downsampling again, so short ranges
+are shown at full resolution.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+DEFAULT_VIEWPORT_PX = 1200
+METHODS = ("lttb", "minmax")
+
+
+def _as_float(x) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """Indices of the `n_out` points Largest-Triangle-Three-Buckets keeps (x must be sorted)."""
+
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), np.asarray(y, dtype=float)
+
+    # Interior points split into n_out - 2 buckets; first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    starts, stops = edges[:-1], edges[1:]
+    csum_x = np.concatenate([[0.0], np.cumsum(x)])
+    csum_y = np.concatenate([[0.0], np.cumsum(y)])
+    next_lo = np.append(starts[1:], n - 1)
+    next_hi = np.append(stops[1:], n)
+    avg_x = (csum_x[next_hi] - csum_x[next_lo]) / (next_hi - next_lo)
+    avg_y = (csum_y[next_hi] - csum_y[next_lo]) / (next_hi - next_lo)
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    # Each bucket's choice depends on the previous one, so only the bucket loop is sequential
+    for i, (lo, hi) in enumerate(zip(starts, stops)):
+        area = np.abs((x[prev] - avg_x[i]) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y[i] - y[prev]))
+        prev = lo + int(np.argmax(area))
+        keep[i + 1] = prev
+    return keep
+
+
+def minmax(y, n_out: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum, about `n_out` points in total."""
+
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    # Order rows by (bucket, value): the first and last row of each bucket are its min and max
+    order = np.lexsort((np.nan_to_num(y, nan=np.inf), bucket))
+    first = order[edges[:-1]]
+    last = order[np.maximum(edges[1:] - 1, edges[:-1])]
+    return np.unique(np.concatenate([first, last]))
+
+
+def downsample(frame: pd.DataFrame, x: str, y: str, n_out: int, method: str = "lttb") -> pd.DataFrame:
+    """Rows of one date-sorted series reduced to about `n_out` points."""
+
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    frame = frame.dropna(subset=[x, y])
+    if len(frame) <= n_out:
+        return frame
+    if method == "lttb":
+        keep = lttb(frame[x].to_numpy(), frame[y].to_numpy(), n_out)
+    else:
+        keep = minmax(frame[y].to_numpy(), n_out)
+    return frame.iloc[keep]
+
+
+def webgl_figure(
+    frame: pd.DataFrame,
+    x: str = "observation_date",
+    y: str = "value_numeric",
+    by: Sequence[str] = ("indicator_code", "source_name"),
+    viewport_px: int = DEFAULT_VIEWPORT_PX,
+    method: str = "lttb",
+    title: Optional[str] = None,
+) -> go.Figure:
+    """`Scattergl` figure with one downsampled trace per group in `by`."""
+
+    by = [col for col in by if col in frame.columns]
+    n_out = viewport_px if method == "lttb" else 2 * viewport_px
+    fig = go.Figure()
+    groups = frame.sort_values(x, kind="stable").groupby(by, sort=True) if by else [((), frame.sort_values(x))]
+    for key, series in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        reduced = downsample(series, x, y, n_out, method)
+        fig.add_trace(go.Scattergl(
+            x=reduced[x],
+            y=reduced[y],
+            mode="lines+markers" if len(reduced) < 200 else "lines",
+            name=" / ".join(map(str, key)) or y,
+        ))
+    fig.update_layout(title=title)
+    return fig
@@ -0,0 +1,192 @@
+"""Streaming, disk-cached exports for the dashboard download buttons.
+
+The download buttons used to call `to_csv()` on the whole filtered frame and
+keep the resulting string in the session. Here an export is written chunk by
+chunk (CSV, gzip-compressed CSV or Parquet) to a file named after a hash of
+its filters, format and data version, so the same slice requested again, by
+any session, is served straight from disk.
+
+File names start with a tag of the data version. Writing an export deletes
+the files of other versions, and the least recently used ones once the
+directory exceeds `max_bytes`, so the cache stays bounded across data
+refreshes and filter combinations.
+
+The dashboard keeps its exports under `STATIC_EXPORT_DIR`, inside the folder
+Streamlit serves as static files, and links to them with `static_url`, so a
+download streams the file from disk instead of loading it into the session.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config.settings import settings
+
+DEFAULT_CACHE_DIR = settings.processed_data_dir / "dashboard_cache" / "exports"
+# Streamlit serves <app dir>/static at app/static/ when server.enableStaticServing is on
+STATIC_DIR = Path(__file__).with_name("static")
+STATIC_EXPORT_DIR = STATIC_DIR / "exports"
+DEFAULT_CHUNK_ROWS = 50_000
+DEFAULT_MAX_BYTES = 1024 ** 3
+FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/octet-stream"),
+}
+
+PathLike = Union[str, os.PathLike]
+
+
+def export_key(filters: Dict, fmt: str, version=None) -> str:
+    """Stable hash of an export request."""
+
+    payload = json.dumps({"filters": filters, "format": fmt, "version": version}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def version_tag(version=None) -> str:
+    """Short hash of a data version, used as the export file name prefix."""
+
+    return hashlib.sha256(json.dumps(version, default=str).encode()).hexdigest()[:8]
+
+
+def iter_chunks(frame: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Slice an in-memory frame into row chunks (views, not copies)."""
+
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def write_chunks(chunks: Iterable[pd.DataFrame], path: PathLike, fmt: str = "csv") -> int:
+    """Write frames to `path` one at a time; returns the number of rows written."""
+
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {sorted(FORMATS)}")
+    path = Path(path)
+    rows = 0
+    if fmt == "parquet":
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pq.write_table(pa.table({}), path)
+        return rows
+
+    opener = gzip.open if fmt == "csv.gz" else open
+    with opener(path, "wt", newline="", encoding="utf-8") as handle:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(handle, index=False, header=i == 0)
+            rows += len(chunk)
+    return rows
+
+
+class ExportCache:
+    """Directory of finished exports keyed by `export_key` and bounded to `max_bytes`."""
+
+    def __init__(self, root: Optional[PathLike] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root) if root is not None else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def path(self, key: str, fmt: str, version=None) -> Path:
+        return self.root / f"{version_tag(version)}-{key}.{FORMATS[fmt][0]}"
+
+    def lookup(self, filters: Dict, fmt: str = "csv", version=None) -> Optional[Path]:
+        """Path of the finished export for `filters`, or None if it has not been written."""
+
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {sorted(FORMATS)}")
+        path = self.path(export_key(filters, fmt, version), fmt, version)
+        if not path.exists():
+            return None
+        self._touch(path)
+        return path
+
+    def get_or_create(
+        self,
+        chunks: Callable[[], Iterable[pd.DataFrame]],
+        filters: Dict,
+        fmt: str = "csv",
+        version=None,
+    ) -> Path:
+        """Path of the export for `filters`, writing it from `chunks()` only on a miss."""
+
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {sorted(FORMATS)}")
+        path = self.lookup(filters, fmt, version)
+        if path is not None:
+            return path
+        path = self.path(export_key(filters, fmt, version), fmt, version)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            write_chunks(chunks(), tmp, fmt)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._prune(path)
+        return path
+
+    @staticmethod
+    def _touch(path: Path):
+        # The modification time doubles as the last-use time for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _prune(self, keep: Path):
+        """Delete other data versions' exports, then the least recently used until under max_bytes."""
+
+        prefix = keep.name.split("-", 1)[0]
+        files = []
+        for path in self.root.glob("*-*"):
+            if path == keep or path.name.startswith(".") or not path.is_file():
+                continue
+            if not path.name.startswith(f"{prefix}-"):
+                _unlink(path)
+            else:
+                stat = path.stat()
+                files.append((stat.st_mtime_ns, stat.st_size, path))
+        total = keep.stat().st_size + sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if _unlink(path):
+                total -= size
+
+    def clear(self):
+        for path in self.root.glob("*"):
+            if path.is_file():
+                _unlink(path)
+
+
+def _unlink(path: Path) -> bool:
+    """Delete `path`; False if it is still open (Windows), in which case a later prune retries."""
+
+    try:
+        path.unlink(missing_ok=True)
+        return True
+    except OSError:
+        return False
+
+
+def static_url(path: PathLike) -> str:
+    """URL under which Streamlit's static file serving exposes `path` (which must live in `STATIC_DIR`)."""
+
+    return "app/static/" + Path(path).resolve().relative_to(STATIC_DIR.resolve()).as_posix()
@@ -0,0 +1,98 @@
+"""Live forecasts for the dashboard's Forecasts page.
+
+The page used to plot the static `outputs/financial_inclusion_forecasts_2025_2027.csv`.
+`LiveForecaster` fits a `ForecastEngine` per indicator on demand and memoizes
+the fit in an LRU cache keyed by (indicator, data version, model type), so
+moving a horizon or event-magnitude slider only re-runs the event overlay
+(`EventEffectModel.overlay`) on top of the cached trend.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.forecasting.engine import ALL_GROUPS, ForecastEngine
+from src.forecasting.events import DEFAULT_PROFILE, EventEffectModel, impact_table
+
+TREND_MODELS = {"linear": 1, "quadratic": 2}
+
+
+class LiveForecaster:
+    """On-demand per-indicator forecasts with memoized trend fits.
+
+    Args:
+        queries: `DashboardQueries` supplying the per-indicator series and data version
+        impacts: output of `impact_table`; None disables the event overlay
+        profile: event-effect kernel for the overlay
+        cache_size: number of fitted (indicator, version, model) entries kept
+    """
+
+    def __init__(self, queries, impacts: Optional[pd.DataFrame] = None, profile: str = DEFAULT_PROFILE, cache_size: int = 128):
+        self.queries = queries
+        self.impacts = impacts.reset_index(drop=True) if impacts is not None else pd.DataFrame()
+        self.effect_model = EventEffectModel(self.impacts, profile=profile) if len(self.impacts) else None
+        self._fit = lru_cache(maxsize=cache_size)(self._fit_uncached)
+
+    @classmethod
+    def from_store(cls, store, queries, **kwargs) -> "LiveForecaster":
+        impacts = impact_table(store.impact_links(arrow=False), store.events(arrow=False))
+        return cls(queries, impacts, **kwargs)
+
+    def _fit_uncached(self, indicator: str, version, model_type: str) -> ForecastEngine:
+        if model_type not in TREND_MODELS:
+            raise ValueError(f"model_type must be one of {sorted(TREND_MODELS)}")
+        series = self.queries.series(indicator)
+        if series.empty:
+            raise ValueError(f"no observations for indicator {indicator!r}")
+        return ForecastEngine(degree=TREND_MODELS[model_type]).fit(series)
+
+    def fit(self, indicator: str, model_type: str = "linear") -> ForecastEngine:
+        """Fitted engine for one indicator, served from the LRU cache when possible."""
+
+        return self._fit(indicator, self.queries.version, model_type)
+
+    def cache_info(self):
+        return self._fit.cache_info()
+
+    def events(self, indicator: str) -> pd.DataFrame:
+        """Events linked to an indicator, with their link estimates."""
+
+        if not len(self.impacts):
+            return pd.DataFrame(columns=["event_id", "event_name", "effective_date", "estimate"])
+        linked = self.impacts[self.impacts["indicator_code"].astype(str) == indicator]
+        return linked[["event_id", "event_name", "effective_date", "estimate"]].drop_duplicates("event_id")
+
+    def forecast(
+        self,
+        indicator: str,
+        years: Iterable[int],
+        model_type: str = "linear",
+        with_events: bool = True,
+        event_scale: Optional[Dict[str, float]] = None,
+    ) -> pd.DataFrame:
+        """National-level forecast for `years`, with `forecast` and, if requested, `forecast_events`.
+
+        `event_scale` maps event ids to magnitude multipliers (the page's sliders).
+        """
+
+        engine = self.fit(indicator, model_type)
+        tidy = engine.forecast(list(years))
+        # Keep the aggregate series when disaggregated ones exist
+        breakdown = [col for col in engine.group_cols_ if col != "indicator_code"]
+        if breakdown:
+            national = np.logical_and.reduce([tidy[col] == ALL_GROUPS for col in breakdown])
+            if national.any():
+                tidy = tidy[national].reset_index(drop=True)
+
+        if with_events and self.effect_model is not None:
+            scale = None
+            if event_scale:
+                scale = self.impacts["event_id"].map(event_scale).fillna(1.0).to_numpy(dtype=float)
+            tidy = self.effect_model.overlay(tidy, engine.params_, scale=scale)
+        else:
+            tidy["event_effect"] = 0.0
+            tidy["forecast_events"] = tidy["forecast"]
+        return tidy
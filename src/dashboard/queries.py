@@ -0,0 +1,161 @@
+"""Query layer for the Streamlit dashboard.
+
+`app.py` used to filter the full observations frame on every widget
+interaction: one boolean mask per KPI card, `str.contains` scans for the
+P2P/ATM ratio and a `groupby(['indicator_code', 'source_name'])` on the Trends
+page. `DashboardQueries` precomputes, once per data version:
+
+- one date-sorted series per (indicator, source), with a cumulative sum of
+  its values, so any date-range filter is two `searchsorted` calls and any
+  date-range mean is a difference of two cumulative sums;
+- per-indicator summary rows (latest, previous, max, growth) for the KPI cards.
+
+Every page render then becomes dictionary lookups and indexed slices.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN_SOURCE = "unknown"
+DATE_COL = "observation_date"
+VALUE_COL = "value_numeric"
+
+
+class DashboardQueries:
+    """Precomputed per-indicator series and aggregates over the observations."""
+
+    def __init__(self, observations: pd.DataFrame, version=None, prepared: bool = False):
+        obs = observations if prepared else self.prepare(observations)
+
+        self.version = version
+        self.observations = obs
+        self.indicators: List[str] = sorted(obs["indicator_code"].unique())
+        self.sources: List[str] = sorted(obs["source_name"].unique())
+        self.date_range: Tuple[pd.Timestamp, pd.Timestamp] = (obs[DATE_COL].min(), obs[DATE_COL].max())
+
+        # Row ranges per (indicator, source) and per indicator over the sorted frame
+        self._dates = obs[DATE_COL].to_numpy(dtype="datetime64[ns]")
+        values = obs[VALUE_COL].to_numpy(dtype=float, na_value=np.nan)
+        self._csum = np.concatenate([[0.0], np.cumsum(np.nan_to_num(values))])
+        self._ccount = np.concatenate([[0], np.cumsum(~np.isnan(values))])
+        self._ranges: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        bounds = obs.groupby(["indicator_code", "source_name"], sort=False).indices
+        for key, rows in bounds.items():
+            self._ranges[key] = (int(rows[0]), int(rows[-1]) + 1)
+
+        self._series = {code: obs.iloc[rows].sort_values(DATE_COL, kind="stable") for code, rows in obs.groupby("indicator_code", sort=False).indices.items()}
+        self.summary = self._summarize()
+
+    @staticmethod
+    def prepare(observations: pd.DataFrame) -> pd.DataFrame:
+        """Typed observations sorted by (indicator, source, date), the layout the queries index."""
+
+        obs = observations.copy()
+        obs[DATE_COL] = pd.to_datetime(obs[DATE_COL], errors="coerce")
+        obs[VALUE_COL] = pd.to_numeric(obs[VALUE_COL], errors="coerce")
+        if "source_name" not in obs.columns:
+            obs["source_name"] = UNKNOWN_SOURCE
+        obs["source_name"] = obs["source_name"].astype(object).where(obs["source_name"].notna(), UNKNOWN_SOURCE).astype(str)
+        obs = obs.dropna(subset=["indicator_code", DATE_COL])
+        obs["indicator_code"] = obs["indicator_code"].astype(str)
+        return obs.sort_values(["indicator_code", "source_name", DATE_COL], kind="stable").reset_index(drop=True)
+
+    @classmethod
+    def from_store(cls, store) -> "DashboardQueries":
+        return cls(store.observations(arrow=False), version=store.version)
+
+    @classmethod
+    def from_shared_cache(cls, store, cache, stamp: str) -> "DashboardQueries":
+        """Queries over the prepared observations published in a `SharedArrowCache` under `stamp`."""
+
+        prepared = cache.get_or_build("observations", lambda: cls.prepare(store.observations(arrow=False)), stamp)
+        return cls(prepared, version=stamp, prepared=True)
+
+    def _summarize(self) -> pd.DataFrame:
+        rows = []
+        for code, series in self._series.items():
+            values = series[VALUE_COL].dropna().to_numpy()
+            latest = values[-1] if len(values) else np.nan
+            previous = values[-2] if len(values) >= 2 else np.nan
+            growth = (latest - previous) / previous * 100 if len(values) >= 2 and previous else 0.0
+            rows.append({
+                "indicator_code": code,
+                "n_obs": len(values),
+                "latest": latest,
+                "previous": previous,
+                "max": values.max() if len(values) else np.nan,
+                "growth_pct": growth,
+                "last_date": series[DATE_COL].iloc[-1],
+            })
+        return pd.DataFrame(rows).set_index("indicator_code") if rows else pd.DataFrame(columns=["n_obs", "latest", "previous", "max", "growth_pct", "last_date"])
+
+    def series(self, indicator: str) -> pd.DataFrame:
+        """Date-sorted observations of one indicator (empty frame if unknown)."""
+
+        return self._series.get(indicator, self.observations.iloc[0:0])
+
+    def stat(self, indicator: str, field: str = "max", default: float = 0.0) -> float:
+        """One summary value (`latest`, `previous`, `max`, `growth_pct`, `n_obs`) for an indicator."""
+
+        if indicator not in self.summary.index:
+            return default
+        value = self.summary.at[indicator, field]
+        return default if pd.isna(value) else value
+
+    def matching(self, pattern: str) -> List[str]:
+        """Indicator codes containing `pattern` (a regex, as `str.contains`)."""
+
+        regex = re.compile(pattern)
+        return [code for code in self.indicators if regex.search(code)]
+
+    def max_matching(self, pattern: str) -> Optional[float]:
+        """Largest value over indicators matching `pattern`, None if none match."""
+
+        codes = self.matching(pattern)
+        if not codes:
+            return None
+        return float(self.summary.loc[codes, "max"].max())
+
+    def _slices(self, indicators: Optional[Iterable[str]], sources: Optional[Iterable[str]], start, end):
+        indicators = set(self.indicators if indicators is None else indicators)
+        sources = set(self.sources if sources is None else sources)
+        lo = np.datetime64(pd.Timestamp(start), "ns") if start is not None else None
+        hi = np.datetime64(pd.Timestamp(end), "ns") if end is not None else None
+        for (code, source), (first, last) in self._ranges.items():
+            if code not in indicators or source not in sources:
+                continue
+            dates = self._dates[first:last]
+            left = first + (np.searchsorted(dates, lo, side="left") if lo is not None else 0)
+            right = first + (np.searchsorted(dates, hi, side="right") if hi is not None else len(dates))
+            if right > left:
+                yield code, source, left, right
+
+    def _rows(self, indicators, sources, start, end) -> np.ndarray:
+        rows = [np.arange(left, right) for _, _, left, right in self._slices(indicators, sources, start, end)]
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+
+    def filtered(self, indicators=None, sources=None, start=None, end=None) -> pd.DataFrame:
+        """Observations for the given indicators/sources within [start, end]."""
+
+        return self.observations.iloc[self._rows(indicators, sources, start, end)]
+
+    def iter_filtered(self, indicators=None, sources=None, start=None, end=None, chunk_rows: int = 50_000):
+        """Yield the `filtered` rows in chunks of at most `chunk_rows`, for streaming exports."""
+
+        rows = self._rows(indicators, sources, start, end)
+        for lo in range(0, max(len(rows), 1), chunk_rows):
+            yield self.observations.iloc[rows[lo:lo + chunk_rows]]
+
+    def channel_means(self, indicators=None, sources=None, start=None, end=None) -> pd.DataFrame:
+        """Mean value per (indicator, source) within [start, end], from the cumulative sums."""
+
+        records = []
+        for code, source, left, right in self._slices(indicators, sources, start, end):
+            count = self._ccount[right] - self._ccount[left]
+            if count:
+                records.append((code, source, (self._csum[right] - self._csum[left]) / count))
+        return pd.DataFrame(records, columns=["indicator_code", "source_name", VALUE_COL])
@@ -0,0 +1,112 @@
+"""Disk-backed Arrow cache shared by every dashboard worker and session.
+
+`@st.cache_data` is per process, so each Streamlit replica parsed the CSVs and
+held its own copies. `SharedArrowCache` writes each prepared frame once as an
+Arrow IPC file named after a version stamp of the data files; every worker then
+memory-maps the same immutable file, so the operating system's page cache holds
+a single copy and a cold worker only pays for an `mmap`.
+
+`data_version_stamp` hashes the size and modification time of every file
+under `data/processed` and `outputs/` (skipping the caches themselves), so any
+change to the inputs gives a new stamp and a fresh set of cache files.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from src.config.settings import settings
+
+DEFAULT_CACHE_DIR = settings.processed_data_dir / "dashboard_cache" / "arrow"
+WATCHED_DIRS = (settings.processed_data_dir, settings.outputs_dir)
+# Derived caches inside the watched directories; they must not change the stamp
+IGNORED_DIRS = frozenset({"dashboard_cache", "matrix_cache", "text_cache"})
+
+PathLike = Union[str, os.PathLike]
+
+
+def data_version_stamp(paths: Iterable[PathLike] = WATCHED_DIRS, ignore: Iterable[str] = IGNORED_DIRS) -> str:
+    """Short hash of the (path, size, mtime) of every file under `paths`."""
+
+    ignore = set(ignore)
+    digest = hashlib.sha256()
+
+    def walk(directory: str):
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignore:
+                    walk(entry.path)
+            elif not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                digest.update(f"{entry.path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+
+    for path in paths:
+        walk(os.fspath(path))
+    return digest.hexdigest()[:16]
+
+
+class SharedArrowCache:
+    """Immutable Arrow IPC files, one per (name, stamp), read through memory maps."""
+
+    def __init__(self, root: Optional[PathLike] = None):
+        self.root = Path(root) if root is not None else DEFAULT_CACHE_DIR
+
+    def path(self, name: str, stamp: str) -> Path:
+        return self.root / f"{name}-{stamp}.arrow"
+
+    def read(self, name: str, stamp: str) -> Optional[pd.DataFrame]:
+        """The cached frame as Arrow-backed columns over the mapped file, or None on a miss."""
+
+        path = self.path(name, stamp)
+        if not path.exists():
+            return None
+        with pa.memory_map(str(path), "r") as source:
+            table = ipc.open_file(source).read_all()
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def write(self, name: str, stamp: str, frame: pd.DataFrame) -> Path:
+        path = self.path(name, stamp)
+        self.root.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        # Concurrent writers produce identical files, so the last rename wins harmlessly.
+        # Windows refuses to replace a file another worker has mapped; its copy is then as good as ours
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            tmp.unlink(missing_ok=True)
+            if not path.exists():
+                raise
+        self._prune(name, keep=path)
+        return path
+
+    def _prune(self, name: str, keep: Path):
+        """Delete older versions of `name`; files still mapped (Windows) are retried on the next write."""
+
+        for stale in self.root.glob(f"{name}-*.arrow"):
+            if stale != keep:
+                try:
+                    stale.unlink(missing_ok=True)
+                except OSError:
+                    pass
+
+    def get_or_build(self, name: str, build: Callable[[], pd.DataFrame], stamp: str) -> pd.DataFrame:
+        """Mapped frame for (name, stamp), building and publishing it first on a miss."""
+
+        frame = self.read(name, stamp)
+        if frame is None:
+            self.write(name, stamp, build())
+            frame = self.read(name, stamp)
+        return frame
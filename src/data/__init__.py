@@ -0,0 +1,3 @@
+"""Storage layer for the unified financial-inclusion dataset."""
+
+from .unified_store import UnifiedStore, read_unified_source, normalize_unified_frame
@@ -0,0 +1,588 @@
+"""Columnar, indexed store for the unified financial-inclusion dataset.
+
+The unified CSV/XLSX mixes observations, events, impact links and targets in a
+single sheet, so every consumer used to re-read the whole file and re-filter it
+with boolean masks. `UnifiedStore` converts the source once into one Arrow IPC
+file per `record_type`, sorted by its key column (`indicator_code`, or
+`related_indicator` for impact links) and `observation_date`, together with a
+JSON manifest holding the row range of every key.
+
+Reads are memory-mapped, so selecting an indicator is an offset lookup plus a
+binary search on the sorted dates, and the resulting frames are Arrow-backed
+views over the mapped buffers rather than fresh copies.
+
+New records are added with `upsert`, which validates them and writes a small
+delta file instead of rewriting the partitions. Every upsert bumps the store
+version; `changes_since(version)` lets downstream caches refresh only what
+changed, and `compact` folds the deltas back into the base partitions.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+from src.config.settings import settings
+
+DEFAULT_SOURCE = settings.processed_data_dir / "ethiopia_fi_unified_data_enriched.csv"
+DEFAULT_ROOT = settings.processed_data_dir / "unified_store"
+
+MANIFEST_FILE = "_manifest.json"
+DELTA_DIR = "deltas"
+ID_COL = "record_id"
+DATE_COL = "observation_date"
+DATE_COLUMNS = ("observation_date", "period_start", "period_end", "collection_date")
+NUMERIC_COLUMNS = ("value_numeric", "impact_estimate", "lag_months")
+
+# Key column each partition is sorted and indexed by
+INDEX_COLUMNS = {"impact_link": "related_indicator"}
+DEFAULT_INDEX_COLUMN = "indicator_code"
+
+PathLike = Union[str, os.PathLike]
+DateLike = Union[str, pd.Timestamp, np.datetime64, None]
+
+_NAT_SORT_KEY = np.iinfo(np.int64).max
+
+
+def normalize_unified_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce a raw unified frame to the dtypes the store persists."""
+
+    if "record_type" not in df.columns:
+        raise ValueError("unified data is missing the `record_type` column")
+
+    df = df.copy()
+    df["record_type"] = df["record_type"].astype("string").str.strip().str.lower()
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="mixed")
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    return df
+
+
+def read_unified_source(path: PathLike) -> pd.DataFrame:
+    """Read the unified dataset from CSV, Parquet or a multi-sheet XLSX workbook."""
+
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix in (".xlsx", ".xls"):
+        sheets = pd.read_excel(path, sheet_name=None)
+        frames = [frame for frame in sheets.values() if "record_type" in frame.columns]
+        if not frames:
+            raise ValueError(f"no sheet with a `record_type` column in {path}")
+        df = pd.concat(frames, ignore_index=True, sort=False)
+    elif suffix == ".parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    return normalize_unified_frame(df)
+
+
+def index_column(record_type: str) -> str:
+    """Return the key column a record-type partition is indexed by."""
+
+    return INDEX_COLUMNS.get(record_type, DEFAULT_INDEX_COLUMN)
+
+
+def _to_ns(value: DateLike) -> Optional[int]:
+    if value is None:
+        return None
+    return int(pd.Timestamp(value).value)
+
+
+def _key_index(codes) -> Dict[str, List[int]]:
+    """Row range of every key in an already sorted key column."""
+
+    codes = pd.Series(codes).astype(object).fillna("").to_numpy(dtype=object)
+    if not len(codes):
+        return {}
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], len(codes)]
+    return {str(codes[s]): [int(s), int(e)] for s, e in zip(starts, stops) if codes[s] != ""}
+
+
+def _write_ipc(table: pa.Table, path: Path):
+    # Write next to the target and swap in atomically so live memory maps keep the old inode
+    tmp = path.with_name(path.name + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _read_ipc(path: Path) -> pa.Table:
+    return ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+
+def _conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Cast `table` columns to the types of matching fields in `schema`."""
+
+    columns = []
+    for field in table.schema:
+        column = table.column(field.name)
+        idx = schema.get_field_index(field.name)
+        if idx >= 0 and schema.field(idx).type != field.type:
+            target = schema.field(idx).type
+            column = pa.nulls(len(column), target) if column.null_count == len(column) else pc.cast(column, target)
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
+
+
+class UnifiedStore:
+    """Partitioned Arrow IPC store over the unified financial-inclusion dataset."""
+
+    def __init__(self, root: Optional[PathLike] = None, max_deltas: int = 8):
+        self.root = Path(root) if root is not None else DEFAULT_ROOT
+        self.max_deltas = max_deltas
+        self._manifest: Optional[Dict] = None
+        self._lock = threading.RLock()
+        self._invalidate()
+
+    def _invalidate(self):
+        self._tables: Dict[str, Optional[pa.Table]] = {}
+        self._indexes: Dict[str, Dict[str, List[int]]] = {}
+        self._dates: Dict[str, np.ndarray] = {}
+        self._deltas: Optional[pd.DataFrame] = None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, source: PathLike = DEFAULT_SOURCE, root: Optional[PathLike] = None) -> "UnifiedStore":
+        """Convert `source` into a fresh store under `root` and return it."""
+
+        store = cls(root)
+        store.write(read_unified_source(source), source=source)
+        return store
+
+    @classmethod
+    def open_or_build(cls, source: PathLike = DEFAULT_SOURCE, root: Optional[PathLike] = None) -> "UnifiedStore":
+        """Open the store at `root`, rebuilding it when `source` changed since the last build.
+
+        A rebuild treats `source` as authoritative and discards pending deltas;
+        use `export` to write upserted records back to the source first.
+        """
+
+        store = cls(root)
+        if store.is_stale(source):
+            store.write(read_unified_source(source), source=source)
+        return store
+
+    def write(self, df: pd.DataFrame, source: Optional[PathLike] = None) -> Dict:
+        """Rebuild the store from a full unified frame, discarding pending deltas."""
+
+        with self._lock:
+            version = (self.version if self.exists() else 0) + 1
+            manifest = self._write_base(normalize_unified_frame(df))
+            manifest.update({"version": version, "rebuilt_version": version, "deltas": [], "changelog": []})
+            if source is not None:
+                stat = Path(source).stat()
+                manifest["source"] = {"path": str(source), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+            self._commit(manifest)
+            self._remove_stale_deltas()
+            return manifest
+
+    def _write_base(self, df: pd.DataFrame) -> Dict:
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        partitions = {}
+        for record_type, frame in df.groupby("record_type", sort=True):
+            partitions[record_type] = self._write_partition(record_type, frame)
+
+        # Drop partitions left over from a previous build
+        current = {meta["file"] for meta in partitions.values()}
+        for path in self.root.glob("record_type=*.arrow"):
+            if path.name not in current:
+                path.unlink()
+
+        return {"columns": list(df.columns), "rows": int(len(df)), "partitions": partitions}
+
+    def _write_partition(self, record_type: str, frame: pd.DataFrame) -> Dict:
+        key = index_column(record_type)
+        sort_cols = [col for col in (key, DATE_COL) if col in frame.columns]
+        if sort_cols:
+            frame = frame.sort_values(sort_cols, na_position="last", kind="mergesort")
+        frame = frame.reset_index(drop=True)
+
+        file_name = f"record_type={record_type}.arrow"
+        _write_ipc(pa.Table.from_pandas(frame, preserve_index=False), self.root / file_name)
+
+        index = _key_index(frame[key]) if key in frame.columns else {}
+        return {"file": file_name, "rows": int(len(frame)), "index_column": key, "index": index}
+
+    def _commit(self, manifest: Dict):
+        tmp = self.root / (MANIFEST_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.root / MANIFEST_FILE)
+        self._manifest = manifest
+        self._invalidate()
+
+    def _remove_stale_deltas(self):
+        live = {entry["file"] for entry in self.manifest.get("deltas", [])}
+        for path in (self.root / DELTA_DIR).glob("*.arrow"):
+            if f"{DELTA_DIR}/{path.name}" not in live:
+                path.unlink()
+
+    # ------------------------------------------------------------------
+    # Incremental ingestion
+    # ------------------------------------------------------------------
+    def upsert(self, records: pd.DataFrame) -> int:
+        """Add or replace records keyed on `record_id` and return the new store version.
+
+        Only a delta file holding `records` is written. Impact links must point
+        (via `parent_id`) at an event already in the store or in the same batch.
+        Once `max_deltas` deltas are pending a background compaction starts.
+        """
+
+        with self._lock:
+            records = normalize_unified_frame(records).reset_index(drop=True)
+            self._validate(records)
+
+            version = self.version + 1
+            file_name = f"{DELTA_DIR}/v{version:06d}.arrow"
+            (self.root / DELTA_DIR).mkdir(parents=True, exist_ok=True)
+            _write_ipc(pa.Table.from_pandas(records, preserve_index=False), self.root / file_name)
+
+            manifest = dict(self.manifest)
+            manifest["version"] = version
+            manifest["deltas"] = manifest.get("deltas", []) + [{
+                "version": version,
+                "file": file_name,
+                "rows": int(len(records)),
+                "record_types": sorted(records["record_type"].dropna().unique()),
+            }]
+            manifest["changelog"] = manifest.get("changelog", []) + [
+                {"version": version, "record_ids": records[ID_COL].astype(str).tolist()}
+            ]
+            self._commit(manifest)
+
+        if self.max_deltas and len(manifest["deltas"]) >= self.max_deltas:
+            self.compact(background=True)
+        return version
+
+    def _validate(self, records: pd.DataFrame):
+        if ID_COL not in records.columns or records[ID_COL].isna().any():
+            raise ValueError("every record needs a `record_id`")
+        duplicated = records.loc[records[ID_COL].duplicated(), ID_COL].unique()
+        if len(duplicated):
+            raise ValueError(f"duplicate record_id in batch: {sorted(duplicated)}")
+        if records["record_type"].isna().any():
+            raise ValueError("every record needs a `record_type`")
+
+        links = records[records["record_type"] == "impact_link"]
+        if len(links):
+            if "parent_id" not in links.columns or links["parent_id"].isna().any():
+                missing = links[ID_COL] if "parent_id" not in links.columns else links.loc[links["parent_id"].isna(), ID_COL]
+                raise ValueError(f"impact_link records without parent_id: {sorted(missing)}")
+            batch_events = set(records.loc[records["record_type"] == "event", ID_COL])
+            orphans = set(links["parent_id"]) - batch_events - self._ids("event")
+            if orphans:
+                raise ValueError(f"impact_link parent_id does not reference an event: {sorted(orphans)}")
+
+        # An event may not change type while impact links still point at it
+        retyped = set(records.loc[records["record_type"] != "event", ID_COL]) & self._ids("event")
+        if retyped:
+            current = self.table("impact_link")
+            linked = set(links["parent_id"]) if len(links) else set()
+            if current is not None:
+                kept = current.filter(pc.invert(pc.is_in(current.column(ID_COL), value_set=pa.array(list(records[ID_COL]), current.schema.field(ID_COL).type))))
+                linked |= set(kept.column("parent_id").to_pylist())
+            if retyped & linked:
+                raise ValueError(f"cannot change record_type of linked events: {sorted(retyped & linked)}")
+
+    def _ids(self, record_type: str) -> set:
+        table = self.table(record_type)
+        return set(table.column(ID_COL).to_pylist()) if table is not None else set()
+
+    def _delta_frame(self) -> pd.DataFrame:
+        """Pending delta rows, latest version of each `record_id` only."""
+
+        if self._deltas is None:
+            entries = self.manifest.get("deltas", [])
+            frames = [_read_ipc(self.root / entry["file"]).to_pandas() for entry in entries]
+            frames = [frame for frame in frames if len(frame)]
+            if frames:
+                deltas = pd.concat(frames, ignore_index=True, sort=False)
+                self._deltas = deltas.drop_duplicates(ID_COL, keep="last").reset_index(drop=True)
+            else:
+                self._deltas = pd.DataFrame()
+        return self._deltas
+
+    def compact(self, background: bool = False):
+        """Fold pending deltas into the base partitions.
+
+        With `background=True` the work runs on a daemon thread, which is returned.
+        The version number is unchanged since the visible data is the same.
+        """
+
+        if background:
+            thread = threading.Thread(target=self.compact, name="unified-store-compact", daemon=True)
+            thread.start()
+            return thread
+
+        with self._lock:
+            manifest = self.manifest
+            if not manifest.get("deltas"):
+                return manifest
+            merged = self._write_base(normalize_unified_frame(self.to_frame()))
+            manifest = {**manifest, **merged, "deltas": []}
+            self._commit(manifest)
+            self._remove_stale_deltas()
+            return manifest
+
+    def changes_since(self, version: int, arrow: bool = False) -> Optional[pd.DataFrame]:
+        """Current rows of every record added or updated after `version`.
+
+        Returns None when the store was rebuilt from source after `version`;
+        callers must then reload everything.
+        """
+
+        if version < self.manifest.get("rebuilt_version", 1):
+            return None
+        ids = [
+            record_id
+            for entry in self.manifest.get("changelog", [])
+            if entry["version"] > version
+            for record_id in entry["record_ids"]
+        ]
+        return self.lookup(ids, arrow=arrow)
+
+    def export(self, path: PathLike):
+        """Write the merged dataset back to a unified CSV (e.g. the enriched source file)."""
+
+        frame = self.to_frame()
+        frame.to_csv(path, index=False)
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+    @property
+    def manifest(self) -> Dict:
+        if self._manifest is None:
+            path = self.root / MANIFEST_FILE
+            if not path.exists():
+                raise FileNotFoundError(f"no unified store at {self.root}; call UnifiedStore.build first")
+            with open(path, encoding="utf-8") as f:
+                self._manifest = json.load(f)
+        return self._manifest
+
+    @property
+    def version(self) -> int:
+        return int(self.manifest.get("version", 1))
+
+    def refresh(self) -> bool:
+        """Reload the manifest from disk; True if another writer changed the store."""
+
+        with self._lock:
+            before = self._manifest
+            self._manifest = None
+            changed = before is None or before != self.manifest
+            if changed:
+                self._invalidate()
+            return changed
+
+    def exists(self) -> bool:
+        return (self.root / MANIFEST_FILE).exists()
+
+    def is_stale(self, source: PathLike) -> bool:
+        """True when the store is missing or was built from a different version of `source`."""
+
+        if not self.exists():
+            return True
+        recorded = self.manifest.get("source")
+        if not recorded:
+            return True
+        stat = Path(source).stat()
+        return recorded.get("mtime_ns") != stat.st_mtime_ns or recorded.get("size") != stat.st_size
+
+    @property
+    def record_types(self) -> List[str]:
+        pending = {rt for entry in self.manifest.get("deltas", []) for rt in entry.get("record_types", [])}
+        return sorted(set(self.manifest["partitions"]) | pending)
+
+    def keys(self, record_type: str = "observation") -> List[str]:
+        """List the indexed keys (indicator codes) present in a partition."""
+
+        with self._lock:
+            if self.table(record_type) is None:
+                return []
+            return sorted(self._indexes[record_type])
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def table(self, record_type: str) -> Optional[pa.Table]:
+        """Return the Arrow table for a record type, with pending deltas applied (None if absent)."""
+
+        # Table and index are built and replaced together; compaction swaps both under the same lock
+        with self._lock:
+            if record_type in self._tables:
+                return self._tables[record_type]
+
+            meta = self.manifest["partitions"].get(record_type)
+            table = _read_ipc(self.root / meta["file"]) if meta else None
+            index = meta["index"] if meta else {}
+
+            deltas = self._delta_frame()
+            if len(deltas):
+                key = index_column(record_type)
+                if table is not None:
+                    replaced = pa.array(deltas[ID_COL].astype(str).tolist(), table.schema.field(ID_COL).type)
+                    table = table.filter(pc.invert(pc.is_in(table.column(ID_COL), value_set=replaced)))
+                rows = deltas[deltas["record_type"] == record_type]
+                if len(rows):
+                    added = pa.Table.from_pandas(rows, preserve_index=False)
+                    if table is None:
+                        table = added
+                    else:
+                        table = pa.concat_tables([table, _conform(added, table.schema)], promote_options="permissive")
+                if table is not None:
+                    sort_keys = [(col, "ascending") for col in (key, DATE_COL) if col in table.column_names]
+                    if sort_keys:
+                        table = table.sort_by(sort_keys)
+                    index = _key_index(table.column(key).to_pandas()) if key in table.column_names else {}
+
+            self._tables[record_type] = table
+            self._indexes[record_type] = index
+            return table
+
+    def _sorted_dates(self, record_type: str) -> np.ndarray:
+        # int64 nanoseconds with NaT mapped past every real date, matching na_position='last'
+        with self._lock:
+            if record_type not in self._dates:
+                column = self.table(record_type).column(DATE_COL)
+                as_int = pc.cast(column, pa.int64()).fill_null(_NAT_SORT_KEY)
+                self._dates[record_type] = as_int.to_numpy()
+            return self._dates[record_type]
+
+    def _slices(self, record_type: str, keys: Optional[Iterable[str]], start: DateLike, end: DateLike) -> List[Tuple[int, int]]:
+        # Callers hold self._lock so the index matches the table they slice
+        index = self._indexes[record_type]
+        if isinstance(keys, str):
+            keys = [keys]
+        ranges = [tuple(index[k]) for k in dict.fromkeys(keys) if k in index]
+
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        if (start_ns is None and end_ns is None) or DATE_COL not in self.table(record_type).column_names:
+            return ranges
+
+        dates = self._sorted_dates(record_type)
+        bounded = []
+        for lo, hi in ranges:
+            window = dates[lo:hi]
+            left = lo + (int(np.searchsorted(window, start_ns, side="left")) if start_ns is not None else 0)
+            right = lo + int(np.searchsorted(window, end_ns if end_ns is not None else _NAT_SORT_KEY - 1, side="right"))
+            if right > left:
+                bounded.append((left, right))
+        return bounded
+
+    def select(
+        self,
+        record_type: str,
+        keys: Optional[Iterable[str]] = None,
+        start: DateLike = None,
+        end: DateLike = None,
+        columns: Optional[List[str]] = None,
+        arrow: bool = True,
+    ) -> pd.DataFrame:
+        """Select rows of one record type by key and inclusive date range.
+
+        With `keys` given the result is assembled from index slices of the
+        mapped table; otherwise the whole partition is filtered by date.
+        `arrow=True` returns `pd.ArrowDtype` columns backed by the mapped
+        buffers, `arrow=False` converts to regular NumPy-backed dtypes.
+        """
+
+        # Take the table and its index slices as one snapshot; a background
+        # compaction may replace both as soon as the lock is released
+        with self._lock:
+            table = self.table(record_type)
+            slices = self._slices(record_type, keys, start, end) if table is not None and keys is not None else None
+        if table is None:
+            return pd.DataFrame(columns=columns or self.manifest.get("columns", []))
+
+        if keys is not None:
+            pieces = [table.slice(lo, hi - lo) for lo, hi in slices]
+            result = pa.concat_tables(pieces) if pieces else table.slice(0, 0)
+        elif (start is not None or end is not None) and DATE_COL in table.column_names:
+            dates = table.column(DATE_COL)
+            mask = pc.is_valid(dates)
+            if start is not None:
+                mask = pc.and_(mask, pc.greater_equal(dates, pa.scalar(pd.Timestamp(start), dates.type)))
+            if end is not None:
+                mask = pc.and_(mask, pc.less_equal(dates, pa.scalar(pd.Timestamp(end), dates.type)))
+            result = table.filter(mask)
+        else:
+            result = table
+
+        if columns:
+            result = result.select(columns)
+        if arrow:
+            return result.to_pandas(types_mapper=pd.ArrowDtype)
+        return result.to_pandas()
+
+    def observations(
+        self,
+        indicators: Optional[Iterable[str]] = None,
+        start: DateLike = None,
+        end: DateLike = None,
+        columns: Optional[List[str]] = None,
+        arrow: bool = True,
+    ) -> pd.DataFrame:
+        """Observation rows for the given indicator codes within [start, end]."""
+
+        return self.select("observation", indicators, start, end, columns, arrow)
+
+    def events(self, start: DateLike = None, end: DateLike = None, arrow: bool = True) -> pd.DataFrame:
+        """Event rows, optionally restricted to an inclusive date range."""
+
+        return self.select("event", None, start, end, arrow=arrow)
+
+    def impact_links(self, indicators: Optional[Iterable[str]] = None, arrow: bool = True) -> pd.DataFrame:
+        """Impact-link rows, optionally restricted to the given related indicators."""
+
+        return self.select("impact_link", indicators, arrow=arrow)
+
+    def targets(self, indicators: Optional[Iterable[str]] = None, arrow: bool = True) -> pd.DataFrame:
+        """Target rows, optionally restricted to the given indicator codes."""
+
+        return self.select("target", indicators, arrow=arrow)
+
+    def lookup(self, record_ids: Iterable[str], arrow: bool = False) -> pd.DataFrame:
+        """Current rows for the given record ids, across every record type."""
+
+        record_ids = [str(record_id) for record_id in dict.fromkeys(record_ids)]
+        pieces = []
+        for record_type in self.record_types:
+            table = self.table(record_type)
+            if table is None or not record_ids:
+                continue
+            value_set = pa.array(record_ids, table.schema.field(ID_COL).type)
+            pieces.append(table.filter(pc.is_in(table.column(ID_COL), value_set=value_set)))
+        pieces = [piece for piece in pieces if piece.num_rows]
+        if not pieces:
+            return pd.DataFrame(columns=self.manifest.get("columns", []))
+        combined = pa.concat_tables(pieces, promote_options="permissive")
+        return combined.to_pandas(types_mapper=pd.ArrowDtype) if arrow else combined.to_pandas()
+
+    def to_frame(self, arrow: bool = False) -> pd.DataFrame:
+        """Reassemble the full unified dataset across every partition."""
+
+        tables = [table for table in (self.table(rt) for rt in self.record_types) if table is not None]
+        if not tables:
+            return pd.DataFrame(columns=self.manifest.get("columns", []))
+        combined = pa.concat_tables(tables, promote_options="permissive")
+        return combined.to_pandas(types_mapper=pd.ArrowDtype) if arrow else combined.to_pandas()
@@ -0,0 +1,7 @@
+"""Forecasting engine for financial-inclusion indicators."""
+
+from .engine import ForecastEngine, apply_event_impacts, create_scenarios
+from .events import EventEffectModel, impact_table
+from .scenarios import Scenario, ScenarioBatch
+from .simulation import MonteCarloForecaster
+from .targets import TargetSolver
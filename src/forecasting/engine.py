@@ -0,0 +1,213 @@
+"""Batched trend forecasting for every indicator series in the unified dataset.
+
+Extracted from `notebooks/04_forecasting_access_usage.ipynb`, where
+`fit_trend_model` fitted one sklearn `LinearRegression` per indicator. Here
+every series (indicator × gender × region) is fitted at once: the per-series
+normal equations are accumulated with `np.bincount` over a stacked polynomial
+design matrix and solved as one batched pseudo-inverse, so refreshing hundreds
+of series costs a handful of vectorized NumPy calls.
+
+`apply_event_impacts` and `create_scenarios` keep the notebook's event overlay
+and scenario conventions so outputs stay comparable with the published CSVs;
+`events.EventEffectModel.overlay` is the dated replacement for the former.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_GROUP_COLS = ("indicator_code", "gender", "region")
+DEFAULT_HORIZON = (2025, 2026, 2027)
+ALL_GROUPS = "all"
+
+
+class ForecastEngine:
+    """Polynomial trend models fitted jointly over many indicator series."""
+
+    def __init__(
+        self,
+        degree: int = 1,
+        group_cols: Sequence[str] = DEFAULT_GROUP_COLS,
+        value_col: str = "value_numeric",
+        date_col: str = "observation_date",
+    ):
+        if degree < 0:
+            raise ValueError("degree must be non-negative")
+        self.degree = degree
+        self.group_cols = tuple(group_cols)
+        self.value_col = value_col
+        self.date_col = date_col
+        self.params_: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_store(cls, store, indicators: Optional[Iterable[str]] = None, **kwargs) -> "ForecastEngine":
+        """Fit an engine on the observations of a `UnifiedStore`."""
+
+        return cls(**kwargs).fit(store.observations(indicators, arrow=False))
+
+    @property
+    def n_coef(self) -> int:
+        return self.degree + 1
+
+    def _prepare(self, observations: pd.DataFrame) -> pd.DataFrame:
+        if self.value_col not in observations.columns or self.date_col not in observations.columns:
+            raise ValueError(f"observations need `{self.value_col}` and `{self.date_col}` columns")
+
+        group_cols = [col for col in self.group_cols if col in observations.columns]
+        if not group_cols:
+            raise ValueError(f"observations need at least one of {self.group_cols}")
+
+        extra_cols = [col for col in ("unit",) if col in observations.columns and col not in group_cols]
+        obs = observations[group_cols + [self.value_col, self.date_col] + extra_cols].copy()
+        obs[self.value_col] = pd.to_numeric(obs[self.value_col], errors="coerce")
+        obs[self.date_col] = pd.to_datetime(obs[self.date_col], errors="coerce")
+        obs = obs.dropna(subset=[self.value_col, self.date_col])
+        for col in group_cols:
+            obs[col] = obs[col].astype(object).where(obs[col].notna(), ALL_GROUPS).astype(str)
+        obs["year"] = obs[self.date_col].dt.year.astype(float)
+        self.group_cols_ = group_cols
+        return obs.reset_index(drop=True)
+
+    def _design(self, x: np.ndarray) -> np.ndarray:
+        # (..., n_coef) powers of the centred year
+        return x[..., None] ** np.arange(self.n_coef)
+
+    def fit(self, observations: pd.DataFrame) -> "ForecastEngine":
+        """Fit one trend per series in a single batched least-squares solve."""
+
+        obs = self._prepare(observations)
+        series = obs.groupby(self.group_cols_, sort=True).ngroup().to_numpy()
+        keys = obs.groupby(self.group_cols_, sort=True).size().reset_index()[self.group_cols_]
+        n_series, k = len(keys), self.n_coef
+
+        y = obs[self.value_col].to_numpy(dtype=float)
+        year = obs["year"].to_numpy()
+        n_obs = np.bincount(series, minlength=n_series).astype(float)
+        center = np.bincount(series, weights=year, minlength=n_series) / n_obs
+        design = self._design(year - center[series])
+
+        # Stacked normal equations: XtX[s] = sum over the series' rows of x x^T
+        xtx = np.empty((n_series, k, k))
+        for i in range(k):
+            for j in range(i, k):
+                xtx[:, i, j] = xtx[:, j, i] = np.bincount(series, weights=design[:, i] * design[:, j], minlength=n_series)
+        xty = np.stack([np.bincount(series, weights=design[:, i] * y, minlength=n_series) for i in range(k)], axis=1)
+
+        # pinv keeps under-determined series (e.g. a single survey point) flat instead of failing
+        xtx_inv = np.linalg.pinv(xtx)
+        coef = np.einsum("sij,sj->si", xtx_inv, xty)
+
+        fitted = np.einsum("nk,nk->n", design, coef[series])
+        resid = y - fitted
+        sse = np.bincount(series, weights=resid ** 2, minlength=n_series)
+        mean_y = np.bincount(series, weights=y, minlength=n_series) / n_obs
+        sst = np.bincount(series, weights=(y - mean_y[series]) ** 2, minlength=n_series)
+        dof = n_obs - k
+
+        params = keys.copy()
+        params["n_obs"] = n_obs.astype(int)
+        params["center_year"] = center
+        for i in range(k):
+            params[f"coef_{i}"] = coef[:, i]
+        if k > 1:
+            params["slope"] = coef[:, 1]
+        params["mse"] = sse / n_obs
+        with np.errstate(divide="ignore", invalid="ignore"):
+            params["r2"] = np.where(sst > 0, 1 - sse / sst, np.nan)
+            params["sigma"] = np.where(dof > 0, np.sqrt(sse / np.maximum(dof, 1)), np.nan)
+        by_series = obs.sort_values("year").groupby(self.group_cols_, sort=True)
+        params["first_year"] = by_series["year"].min().to_numpy().astype(int)
+        params["last_year"] = by_series["year"].max().to_numpy().astype(int)
+        params["last_value"] = by_series[self.value_col].last().to_numpy()
+        if "unit" in obs.columns:
+            params["unit"] = by_series["unit"].first().to_numpy()
+
+        self.params_ = params
+        self.coef_ = coef
+        self.xtx_inv_ = xtx_inv
+        self.series_ = series
+        self.observations_ = obs.assign(fitted=fitted, residual=resid)
+        return self
+
+    def _check_fitted(self):
+        if self.params_ is None:
+            raise RuntimeError("ForecastEngine is not fitted; call fit() first")
+
+    def predict_matrix(self, years: Iterable[float] = DEFAULT_HORIZON) -> np.ndarray:
+        """Trend values as a (series × year) array, rows aligned with `params_`."""
+
+        self._check_fitted()
+        years = np.asarray(list(years), dtype=float)
+        x = years[None, :] - self.params_["center_year"].to_numpy()[:, None]
+        return np.einsum("sty,sy->st", self._design(x), self.coef_)
+
+    def forecast(self, years: Iterable[float] = DEFAULT_HORIZON) -> pd.DataFrame:
+        """Tidy forecast frame: one row per series and year with a `forecast` column."""
+
+        years = np.asarray(list(years), dtype=int)
+        values = self.predict_matrix(years)
+        keys = self.params_[self.group_cols_]
+        tidy = keys.loc[keys.index.repeat(len(years))].reset_index(drop=True)
+        tidy["year"] = np.tile(years, len(keys))
+        tidy["forecast"] = values.ravel()
+        tidy["model"] = "trend"
+        return tidy
+
+    def fitted(self) -> pd.DataFrame:
+        """Historical observations with in-sample `fitted` and `residual` columns."""
+
+        self._check_fitted()
+        return self.observations_.copy()
+
+
+def apply_event_impacts(
+    forecast: pd.DataFrame,
+    matrix: pd.DataFrame,
+    spread_years: int = 3,
+    value_col: str = "forecast",
+    out_col: str = "forecast_events",
+) -> pd.DataFrame:
+    """Add the notebook's event overlay: each indicator's total matrix impact spread evenly over `spread_years`."""
+
+    totals = matrix.sum(axis=0) if not matrix.empty else pd.Series(dtype=float)
+    out = forecast.copy()
+    out[out_col] = out[value_col] + out["indicator_code"].map(totals).fillna(0.0).to_numpy() / spread_years
+    return out
+
+
+def create_scenarios(
+    forecast: pd.DataFrame,
+    value_col: str = "forecast_events",
+    upside: float = 0.2,
+    downside: float = 0.2,
+) -> pd.DataFrame:
+    """Add base/optimistic/pessimistic columns as proportional bands around `value_col`."""
+
+    out = forecast.copy()
+    out["base"] = out[value_col]
+    out["optimistic"] = out[value_col] * (1 + upside)
+    out["pessimistic"] = out[value_col] * (1 - downside)
+    return out
+
+
+if __name__ == "__main__":
+    from src.analysis.event_matrix import build_event_indicator_matrix
+    from src.config.settings import settings
+    from src.data.unified_store import UnifiedStore
+
+    from .events import EventEffectModel, impact_table
+
+    store = UnifiedStore.open_or_build()
+    engine = ForecastEngine.from_store(store)
+    forecasts = engine.forecast()
+    impacts = impact_table(store.impact_links(arrow=False), store.events(arrow=False))
+    if len(impacts):
+        forecasts = EventEffectModel(impacts).overlay(forecasts, engine.params_)
+    matrix = build_event_indicator_matrix(store)
+    matrix_overlay = apply_event_impacts(forecasts, matrix, out_col="forecast_matrix")
+    forecasts = create_scenarios(matrix_overlay, value_col="forecast_events" if len(impacts) else "forecast_matrix")
+    settings.outputs_dir.mkdir(parents=True, exist_ok=True)
+    forecasts.to_csv(settings.outputs_dir / "indicator_forecasts.csv", index=False)
+    print(f"Forecast {len(engine.params_)} series -> {settings.outputs_dir / 'indicator_forecasts.csv'}")
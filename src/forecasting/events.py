@@ -0,0 +1,283 @@
+"""Event and impact-link helpers for the forecasting engine.
+
+`impact_table` joins each `impact_link` record to its parent `event` and
+normalizes the loosely typed enrichment columns into one row per link with a
+signed effect estimate, an uncertainty spread and the date the effect starts.
+
+`EventEffectModel` turns those links into dated step/ramp/decay/impulse
+kernels on a yearly or monthly grid, replacing the notebook's "sum the matrix
+column and spread it over three years" overlay.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Relative spread of an impact estimate by the link's stated confidence
+CONFIDENCE_CV = {"high": 0.25, "medium": 0.5, "low": 0.75}
+DEFAULT_CV = 0.5
+DAYS_PER_MONTH = 30.4375
+PERCENT_UNITS = ("%", "percent", "percentage", "pp")
+
+IMPACT_COLUMNS = [
+    "link_id",
+    "event_id",
+    "event_name",
+    "indicator_code",
+    "event_date",
+    "lag_months",
+    "effective_date",
+    "estimate",
+    "sd",
+]
+
+
+def link_estimates(impact_links: pd.DataFrame) -> np.ndarray:
+    """Signed effect estimate per impact link.
+
+    `impact_estimate` when numeric, else a numeric `impact_magnitude` (text
+    levels such as "high" count as missing); `impact_direction` fixes the sign.
+    """
+
+    n = len(impact_links)
+
+    def column(name, default=np.nan):
+        return impact_links[name].reset_index(drop=True) if name in impact_links.columns else pd.Series([default] * n)
+
+    estimate = pd.to_numeric(column("impact_estimate"), errors="coerce")
+    estimate = estimate.fillna(pd.to_numeric(column("impact_magnitude"), errors="coerce")).to_numpy(dtype=float)
+    direction = column("impact_direction", "").astype(str).str.lower().to_numpy()
+    return np.where(direction == "decrease", -np.abs(estimate), np.where(direction == "increase", np.abs(estimate), estimate))
+
+
+def impact_table(impact_links: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
+    """One row per usable impact link: event, indicator, signed estimate, spread and effective date.
+
+    The estimate comes from `impact_estimate`, falling back to a numeric
+    `impact_magnitude`; `impact_direction` fixes its sign. Links without an
+    indicator, an estimate or a resolvable event date are dropped.
+    """
+
+    if impact_links is None or impact_links.empty:
+        return pd.DataFrame(columns=IMPACT_COLUMNS)
+
+    links = impact_links.reset_index(drop=True)
+    n = len(links)
+
+    def column(name, default=np.nan):
+        return links[name] if name in links.columns else pd.Series([default] * n)
+
+    estimate = link_estimates(links)
+
+    confidence = column("confidence", "").astype(str).str.lower()
+    cv = confidence.map(CONFIDENCE_CV).fillna(DEFAULT_CV).to_numpy(dtype=float)
+
+    event_dates = pd.Series(dtype="datetime64[ns]")
+    event_names = pd.Series(dtype=object)
+    if events is not None and not events.empty and "record_id" in events.columns:
+        by_id = events.drop_duplicates("record_id").set_index("record_id")
+        event_dates = pd.to_datetime(by_id.get("observation_date"), errors="coerce")
+        event_names = by_id.get("indicator", by_id.index.to_series())
+
+    parent = column("parent_id")
+    event_date = pd.to_datetime(parent.map(event_dates), errors="coerce")
+    event_date = event_date.fillna(pd.to_datetime(column("observation_date"), errors="coerce"))
+    lag = pd.to_numeric(column("lag_months"), errors="coerce").fillna(0.0)
+
+    table = pd.DataFrame({
+        "link_id": column("record_id"),
+        "event_id": parent,
+        "event_name": parent.map(event_names).fillna(parent),
+        "indicator_code": column("related_indicator"),
+        "event_date": event_date,
+        "lag_months": lag,
+        "effective_date": event_date + pd.to_timedelta(lag * DAYS_PER_MONTH, unit="D"),
+        "estimate": estimate,
+        "sd": cv * np.abs(estimate),
+    })
+    return table.dropna(subset=["indicator_code", "estimate", "event_date"]).reset_index(drop=True)
+
+
+def impact_scale(params: pd.DataFrame) -> np.ndarray:
+    """Per-series multiplier turning an impact estimate into the series' units.
+
+    Impacts are percentage points for percentage series and % of the last
+    level otherwise; without a `unit` column they are taken as-is.
+    """
+
+    if "unit" not in params.columns:
+        return np.ones(len(params))
+    is_percent = params["unit"].astype(str).str.strip().str.lower().isin(PERCENT_UNITS).to_numpy()
+    return np.where(is_percent, 1.0, params["last_value"].abs().to_numpy() / 100.0)
+
+
+PROFILES = ("step", "ramp", "decay", "impulse")
+# Kernel used by every overlay and simulator unless a caller asks otherwise
+DEFAULT_PROFILE = "ramp"
+
+
+def year_grid(years: Iterable[int]) -> pd.DatetimeIndex:
+    """Year-end timestamps for a yearly forecast grid."""
+
+    return pd.DatetimeIndex([pd.Timestamp(int(year), 12, 31) for year in years])
+
+
+def month_grid(start, end) -> pd.DatetimeIndex:
+    """Month-end timestamps covering [start, end]."""
+
+    return pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq="ME")
+
+
+def _months_between(times: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    return (times - starts) / np.timedelta64(1, "D") / DAYS_PER_MONTH
+
+
+class EventEffectModel:
+    """Dated event-effect kernels for every impact link.
+
+    Each link contributes `estimate × kernel(t - effective_date)` to its
+    indicator, where the kernel is one of:
+
+    - `step`: the full effect from the effective date on;
+    - `ramp`: builds up linearly over `ramp_months`, then stays;
+    - `decay`: the full effect at the effective date, halving every `half_life_months`;
+    - `impulse`: the full effect only in the grid period containing the effective date.
+
+    A `profile` column on the impacts overrides the default per link. The
+    cumulative effect on every indicator is `B · diag(m) · K`, with `K` the
+    sparse link × time kernel matrix, `m` the link magnitudes and `B` the
+    sparse indicator × link incidence matrix.
+    """
+
+    def __init__(
+        self,
+        impacts: pd.DataFrame,
+        profile: str = DEFAULT_PROFILE,
+        ramp_months: float = 12.0,
+        half_life_months: float = 24.0,
+    ):
+        if profile not in PROFILES:
+            raise ValueError(f"profile must be one of {PROFILES}")
+        self.impacts = impacts.reset_index(drop=True) if impacts is not None else pd.DataFrame(columns=IMPACT_COLUMNS)
+        self.profile = profile
+        self.ramp_months = float(ramp_months)
+        self.half_life_months = float(half_life_months)
+
+        profiles = self.impacts["profile"] if "profile" in self.impacts.columns else pd.Series([None] * len(self.impacts))
+        profiles = profiles.fillna(profile).astype(str).str.lower()
+        unknown = set(profiles) - set(PROFILES)
+        if unknown:
+            raise ValueError(f"unknown effect profiles: {sorted(unknown)}")
+        self.link_profiles = profiles.to_numpy()
+
+        codes = self.impacts["indicator_code"].astype(str)
+        self.indicators = sorted(codes.unique())
+        rows = pd.Index(self.indicators).get_indexer(codes)
+        self.incidence = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, np.arange(len(rows)))), shape=(len(self.indicators), len(rows))
+        )
+        self.estimates = self.impacts["estimate"].to_numpy(dtype=float)
+        self.effective_dates = pd.to_datetime(self.impacts["effective_date"]).to_numpy(dtype="datetime64[ns]")
+
+    @property
+    def n_links(self) -> int:
+        return len(self.impacts)
+
+    def kernel_values(self, times, shift_months=None, period_months: Optional[float] = None) -> np.ndarray:
+        """Dense kernel values, (links × times), or (schedules × links × times) for 2-D shifts."""
+
+        times = pd.DatetimeIndex(times).to_numpy(dtype="datetime64[ns]")
+        if period_months is None:
+            period_months = float(np.median(np.diff(times)) / np.timedelta64(1, "D") / DAYS_PER_MONTH) if len(times) > 1 else 12.0
+
+        tau = _months_between(times[None, :], self.effective_dates[:, None])
+        if shift_months is not None:
+            tau = tau - np.asarray(shift_months, dtype=float)[..., None]
+
+        started = tau >= 0
+        profiles = np.broadcast_to(self.link_profiles[:, None], tau.shape[-2:])
+        ramp = np.clip(tau / self.ramp_months, 0.0, 1.0) if self.ramp_months > 0 else started
+        decay = np.where(started, 0.5 ** (np.maximum(tau, 0.0) / self.half_life_months), 0.0)
+        impulse = started & (tau < period_months)
+        return np.select(
+            [profiles == "step", profiles == "ramp", profiles == "decay"],
+            [started, ramp, decay],
+            default=impulse,
+        ).astype(float)
+
+    def kernel_matrix(self, times, shift_months=None) -> sparse.csr_matrix:
+        """Sparse kernel matrix; schedules are stacked row-wise when `shift_months` is 2-D."""
+
+        values = self.kernel_values(times, shift_months)
+        return sparse.csr_matrix(values.reshape(-1, values.shape[-1]))
+
+    def _magnitudes(self, active=None, scale=None) -> np.ndarray:
+        magnitudes = self.estimates
+        if active is not None:
+            magnitudes = magnitudes * np.asarray(active, dtype=float)
+        if scale is not None:
+            magnitudes = magnitudes * np.asarray(scale, dtype=float)
+        return magnitudes
+
+    def effects(self, times, active=None, scale=None, shift_months=None) -> pd.DataFrame:
+        """Cumulative effect per indicator (rows) at each time (columns).
+
+        `active`, `scale` and `shift_months` are per-link arrays switching links
+        off, multiplying their magnitude, and moving their dates.
+        """
+
+        times = pd.DatetimeIndex(times)
+        kernels = self.kernel_matrix(times, shift_months)
+        weighted = self.incidence @ sparse.diags(self._magnitudes(active, scale))
+        values = (weighted @ kernels).toarray()
+        return pd.DataFrame(values, index=pd.Index(self.indicators, name="indicator_code"), columns=times)
+
+    def effects_batch(self, times, active=None, scale=None, shift_months=None) -> np.ndarray:
+        """Effects for many schedules at once, shaped (schedules × indicators × times).
+
+        Each argument is a (schedules × links) array (or None). All schedules are
+        evaluated as one block-diagonal sparse product.
+        """
+
+        arrays = [np.asarray(a, dtype=float) for a in (active, scale, shift_months) if a is not None]
+        n_schedules = arrays[0].shape[0] if arrays else 1
+        shape = (n_schedules, self.n_links)
+        active = np.ones(shape) if active is None else np.broadcast_to(active, shape)
+        scale = np.ones(shape) if scale is None else np.broadcast_to(scale, shape)
+        shift_months = np.zeros(shape) if shift_months is None else np.broadcast_to(shift_months, shape)
+
+        times = pd.DatetimeIndex(times)
+        kernels = self.kernel_matrix(times, shift_months)
+        magnitudes = (self.estimates[None, :] * active * scale).ravel()
+        incidence = sparse.kron(sparse.identity(n_schedules, format="csr"), self.incidence, format="csr")
+        values = (incidence @ sparse.diags(magnitudes) @ kernels).toarray()
+        return values.reshape(n_schedules, len(self.indicators), len(times))
+
+    def overlay(self, forecast: pd.DataFrame, params: pd.DataFrame, value_col: str = "forecast", **effect_kwargs) -> pd.DataFrame:
+        """Add event effects still to come after each series' last observation to a tidy forecast.
+
+        Adds `event_effect` (effect at the forecast year minus the effect already
+        realised at the series' last observed year) and `forecast_events`.
+        """
+
+        keys = [col for col in params.columns if col in forecast.columns and col != "year"]
+        extra = [col for col in ("last_year", "last_value", "unit") if col in params.columns]
+        keyed = forecast.drop(columns=[col for col in extra if col in forecast.columns]).merge(params[keys + extra], on=keys, how="left")
+        years = np.union1d(keyed["year"].to_numpy(dtype=int), keyed["last_year"].dropna().to_numpy(dtype=int))
+        effects = self.effects(year_grid(years), **effect_kwargs)
+
+        out = forecast.copy()
+        if effects.empty:
+            out["event_effect"] = 0.0
+        else:
+            row = effects.index.get_indexer(keyed["indicator_code"].astype(str))
+            col_now = np.searchsorted(years, keyed["year"].to_numpy(dtype=int))
+            col_last = np.searchsorted(years, keyed["last_year"].fillna(keyed["year"]).to_numpy(dtype=int))
+            values = effects.to_numpy()
+            effect = np.where(row >= 0, values[row, col_now] - values[row, col_last], 0.0)
+            out["event_effect"] = effect * impact_scale(keyed)
+        out["forecast_events"] = out[value_col] + out["event_effect"]
+        return out
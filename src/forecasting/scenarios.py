@@ -0,0 +1,181 @@
+"""Batch what-if evaluation of alternative event calendars.
+
+In notebook 04 every scenario meant editing the event list and re-running the
+whole notebook. A `ScenarioBatch` takes N `Scenario` definitions (events
+switched off, moved to a new date or by a number of months, or scaled) and
+evaluates them together:
+
+- the trend part comes once from the fitted `ForecastEngine`;
+- the event part for all scenarios is one block-diagonal sparse product per
+  chunk of scenarios (see `EventEffectModel.effects_batch`);
+- large batches are split across worker processes.
+
+The result is a (scenario × series × year) array with series aligned to
+`engine.params_`.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .engine import DEFAULT_HORIZON, ForecastEngine
+from .events import DAYS_PER_MONTH, DEFAULT_PROFILE, EventEffectModel, impact_scale, year_grid
+
+
+@dataclass
+class Scenario:
+    """One alternative event calendar.
+
+    Events are referred to by `event_id` or `event_name` from `impact_table`.
+    """
+
+    name: str
+    disabled: Sequence[str] = ()
+    only: Optional[Sequence[str]] = None
+    shift_months: Dict[str, float] = field(default_factory=dict)
+    dates: Dict[str, str] = field(default_factory=dict)
+    scale: Dict[str, float] = field(default_factory=dict)
+
+    def schedule(self, impacts: pd.DataFrame):
+        """Per-link `active`, `scale` and `shift_months` arrays for this scenario."""
+
+        n_links = len(impacts)
+        active, scale, shift = np.ones(n_links), np.ones(n_links), np.zeros(n_links)
+        if self.only is not None:
+            active = _event_mask(impacts, self.only).astype(float)
+        active[_event_mask(impacts, self.disabled)] = 0.0
+        for ref, months in self.shift_months.items():
+            shift[_event_mask(impacts, [ref])] = float(months)
+        for ref, date in self.dates.items():
+            mask = _event_mask(impacts, [ref])
+            moved = (pd.Timestamp(date) - pd.to_datetime(impacts["event_date"][mask])) / pd.Timedelta(days=1) / DAYS_PER_MONTH
+            shift[mask] = moved.to_numpy(dtype=float)
+        for ref, factor in self.scale.items():
+            scale[_event_mask(impacts, [ref])] *= float(factor)
+        return active, scale, shift
+
+    def apply(self, impacts: pd.DataFrame) -> pd.DataFrame:
+        """Impact links rewritten for this scenario: estimates scaled or zeroed, dates moved."""
+
+        active, scale, shift = self.schedule(impacts)
+        out = impacts.reset_index(drop=True).copy()
+        out["estimate"] = out["estimate"] * active * scale
+        out["sd"] = out["sd"] * active * np.abs(scale)
+        out["effective_date"] = pd.to_datetime(out["effective_date"]) + pd.to_timedelta(shift * DAYS_PER_MONTH, unit="D")
+        return out
+
+
+def _event_mask(impacts: pd.DataFrame, refs: Iterable[str]) -> np.ndarray:
+    ids = impacts["event_id"].astype(str)
+    names = impacts["event_name"].astype(str)
+    refs = list(refs)
+    unknown = sorted(set(refs) - set(ids) - set(names))
+    if unknown:
+        raise ValueError(f"unknown events in scenario: {unknown}")
+    return (ids.isin(refs) | names.isin(refs)).to_numpy()
+
+
+def _evaluate_chunk(model: EventEffectModel, grid, active, scale, shift_months) -> np.ndarray:
+    return model.effects_batch(grid, active=active, scale=scale, shift_months=shift_months)
+
+
+class ScenarioBatch:
+    """Evaluate many `Scenario`s against one fitted engine.
+
+    Args:
+        engine: fitted engine; its trend forecast is shared by every scenario
+        impacts: output of `impact_table`
+        scenarios: scenario definitions, evaluated in order
+        profile: event-effect kernel (see `EventEffectModel`)
+        n_jobs: worker processes for large batches (default: CPU count)
+        parallel_threshold: batches smaller than this run in-process
+        chunk_size: scenarios per sparse product / worker task
+    """
+
+    def __init__(
+        self,
+        engine: ForecastEngine,
+        impacts: pd.DataFrame,
+        scenarios: Iterable[Scenario],
+        profile: str = DEFAULT_PROFILE,
+        n_jobs: Optional[int] = None,
+        parallel_threshold: int = 256,
+        chunk_size: int = 64,
+        **kernel_kwargs,
+    ):
+        engine._check_fitted()
+        self.engine = engine
+        self.scenarios: List[Scenario] = list(scenarios)
+        if not self.scenarios:
+            raise ValueError("at least one scenario is required")
+        names = [scenario.name for scenario in self.scenarios]
+        if len(set(names)) != len(names):
+            raise ValueError("scenario names must be unique")
+        self.model = EventEffectModel(impacts, profile=profile, **kernel_kwargs)
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = max(1, int(chunk_size))
+
+    @property
+    def names(self) -> List[str]:
+        return [scenario.name for scenario in self.scenarios]
+
+    def schedules(self):
+        """(scenario × link) `active`, `scale` and `shift_months` arrays."""
+
+        rows = [scenario.schedule(self.model.impacts) for scenario in self.scenarios]
+        return tuple(np.stack(arrays) for arrays in zip(*rows))
+
+    def _effects(self, grid, active, scale, shift) -> np.ndarray:
+        chunks = [slice(lo, lo + self.chunk_size) for lo in range(0, len(active), self.chunk_size)]
+        args = [(self.model, grid, active[c], scale[c], shift[c]) for c in chunks]
+        if len(active) >= self.parallel_threshold and self.n_jobs > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(chunks))) as pool:
+                parts = list(pool.map(_evaluate_chunk, *zip(*args)))
+        else:
+            parts = [_evaluate_chunk(*arg) for arg in args]
+        return np.concatenate(parts, axis=0)
+
+    def evaluate(self, years: Sequence[int] = DEFAULT_HORIZON) -> np.ndarray:
+        """Scenario forecasts shaped (scenario × series × year).
+
+        Each series gets its cached trend plus, per scenario, the part of its
+        events' effect still to come after its last observation.
+        """
+
+        params = self.engine.params_
+        years = np.asarray(list(years), dtype=int)
+        trend = self.engine.predict_matrix(years)
+        values = np.broadcast_to(trend, (len(self.scenarios),) + trend.shape).copy()
+        if not self.model.n_links or "indicator_code" not in params.columns:
+            return values
+
+        last_years = params["last_year"].to_numpy(dtype=int)
+        grid = np.union1d(years, last_years)
+        effects = self._effects(year_grid(grid), *self.schedules())
+
+        row = pd.Index(self.model.indicators).get_indexer(params["indicator_code"].astype(str))
+        has_events = row >= 0
+        now = effects[:, row[has_events]][:, :, np.searchsorted(grid, years)]
+        realised = effects[:, row[has_events], np.searchsorted(grid, last_years[has_events])]
+        scale = impact_scale(params)[has_events]
+        values[:, has_events] += scale[None, :, None] * (now - realised[:, :, None])
+        return values
+
+    def frame(self, years: Sequence[int] = DEFAULT_HORIZON) -> pd.DataFrame:
+        """Tidy frame with one row per scenario, series and year."""
+
+        years = np.asarray(list(years), dtype=int)
+        values = self.evaluate(years)
+        keys = self.engine.params_[self.engine.group_cols_]
+        n_series = len(keys)
+        tidy = keys.loc[np.tile(np.repeat(keys.index, len(years)), len(self.scenarios))].reset_index(drop=True)
+        tidy.insert(0, "scenario", np.repeat(self.names, n_series * len(years)))
+        tidy["year"] = np.tile(years, n_series * len(self.scenarios))
+        tidy["forecast"] = values.ravel()
+        return tidy
@@ -0,0 +1,196 @@
+"""Monte Carlo prediction intervals for `ForecastEngine` trends.
+
+The notebook's scenarios were the base forecast × 1.2 / × 0.8. Here each
+trajectory draws, in one vectorized pass per chunk of series:
+
+- trend coefficients from their Gaussian posterior, `N(coef, sigma^2 (X'X)^-1)`;
+- event-impact magnitudes from the `impact_link` records (see `impact_table`),
+  spread over time by their `EventEffectModel` kernels;
+- residual noise with the series' fitted residual scale.
+
+Series are processed in chunks sized so that the draw arrays stay under
+`max_chunk_bytes`; quantiles are per series, so chunking does not change them.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .engine import DEFAULT_HORIZON, ForecastEngine
+from .events import DEFAULT_PROFILE, EventEffectModel, impact_scale, year_grid
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def quantile_label(q: float) -> str:
+    return f"p{round(q * 100):d}"
+
+
+def _year_times(years: np.ndarray) -> pd.DatetimeIndex:
+    """Timestamps for (possibly fractional) forecast years; whole years map to year end like `year_grid`."""
+
+    whole = np.floor(years).astype(int)
+    return year_grid(whole) + pd.to_timedelta((years - whole) * 365.25, unit="D")
+
+
+class MonteCarloForecaster:
+    """Simulate many trajectories per series around a fitted `ForecastEngine`.
+
+    Args:
+        engine: fitted engine whose trends are perturbed
+        impacts: output of `impact_table`; the part of each link's effect still
+            to come after a series' last observation is added on top of its trend
+        profile: effect kernel for the links (see `EventEffectModel`)
+        n_draws: trajectories per series
+        seed: seed for the NumPy generator
+        max_chunk_bytes: memory budget for one chunk of draws
+        fallback_cv: residual scale, relative to the last value, for series
+            too short to estimate one
+    """
+
+    def __init__(
+        self,
+        engine: ForecastEngine,
+        impacts: Optional[pd.DataFrame] = None,
+        n_draws: int = 10_000,
+        seed: Optional[int] = None,
+        max_chunk_bytes: int = 256 * 2 ** 20,
+        fallback_cv: float = 0.1,
+        profile: str = DEFAULT_PROFILE,
+        **kernel_kwargs,
+    ):
+        engine._check_fitted()
+        self.engine = engine
+        self.impacts = impacts.reset_index(drop=True) if impacts is not None else pd.DataFrame()
+        self.effect_model = EventEffectModel(self.impacts, profile=profile, **kernel_kwargs) if len(self.impacts) else None
+        self.n_draws = int(n_draws)
+        self.seed = seed
+        self.max_chunk_bytes = max_chunk_bytes
+        self.fallback_cv = fallback_cv
+
+    def _sigma(self) -> np.ndarray:
+        params = self.engine.params_
+        fallback = self.fallback_cv * params["last_value"].abs().to_numpy()
+        return np.where(np.isnan(params["sigma"]), fallback, params["sigma"].to_numpy())
+
+    def impact_loadings(self, years: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Series × link scale matrix, link × year kernels and series × link kernel already realised.
+
+        A link moves a series by `scale × (kernel(year) - kernel(last_year))`, so
+        only the part of its effect still to come after the last observation is
+        added to the trend.
+        """
+
+        params = self.engine.params_
+        years = np.asarray(list(years), dtype=float)
+        n_links = len(self.impacts)
+        weights = np.zeros((len(params), n_links))
+        kernels = np.zeros((n_links, len(years)))
+        realised = np.zeros((len(params), n_links))
+        if not n_links or "indicator_code" not in params.columns:
+            return weights, kernels, realised
+
+        last_years = params["last_year"].to_numpy(dtype=float)
+        grid = np.union1d(years, last_years)
+        # Yearly periods whatever the grid spacing, so fine grids see the same impulse kernels
+        values = self.effect_model.kernel_values(_year_times(grid), period_months=12.0)
+        kernels = values[:, np.searchsorted(grid, years)]
+
+        series = params[["indicator_code"]].reset_index(names="series")
+        links = self.impacts[["indicator_code"]].reset_index(names="link")
+        pairs = series.merge(links, on="indicator_code")
+        rows, cols = pairs["series"].to_numpy(), pairs["link"].to_numpy()
+        weights[rows, cols] = impact_scale(params)[rows]
+        realised[rows, cols] = values[cols, np.searchsorted(grid, last_years[rows])]
+        return weights, kernels, realised
+
+    def expected_paths(self, years: Sequence[float] = DEFAULT_HORIZON) -> np.ndarray:
+        """Mean trajectory per series, (series × years): the trend plus the mean event effects still to come.
+
+        This is the path the simulated trajectories are centred on; `years` may be fractional.
+        """
+
+        years = np.asarray(list(years), dtype=float)
+        paths = self.engine.predict_matrix(years)
+        if len(self.impacts):
+            estimate = self.impacts["estimate"].to_numpy(dtype=float)
+            weights, kernels, realised = self.impact_loadings(years)
+            paths = paths + (weights * estimate) @ kernels - ((weights * realised) @ estimate)[:, None]
+        return paths
+
+    def _chunk_rows(self, n_years: int) -> int:
+        per_series = self.n_draws * (self.engine.n_coef + 2 * n_years) * 8
+        return max(1, int(self.max_chunk_bytes // max(per_series, 1)))
+
+    def iter_paths(self, years: Sequence[float] = DEFAULT_HORIZON) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """Yield `(start, stop, paths)` chunks with `paths` shaped (draws × series × years)."""
+
+        engine = self.engine
+        years = np.asarray(list(years), dtype=float)
+        # Separate streams so adding impact links does not reshuffle the trend draws
+        trend_seed, impact_seed = np.random.SeedSequence(self.seed).spawn(2)
+        rng, impact_rng = np.random.default_rng(trend_seed), np.random.default_rng(impact_seed)
+        n_series, k, n_draws = len(engine.params_), engine.n_coef, self.n_draws
+
+        sigma = self._sigma()
+        center = engine.params_["center_year"].to_numpy()
+        # Matrix square root of each coefficient covariance; eigh tolerates the singular ones
+        cov = sigma[:, None, None] ** 2 * engine.xtx_inv_
+        eigval, eigvec = np.linalg.eigh(cov)
+        cov_sqrt = eigvec * np.sqrt(np.clip(eigval, 0.0, None))[:, None, :]
+
+        weights, kernels, realised = self.impact_loadings(years)
+        if len(self.impacts):
+            mean = self.impacts["estimate"].to_numpy(dtype=float)
+            sd = self.impacts["sd"].to_numpy(dtype=float)
+            effects = mean + sd * impact_rng.standard_normal((n_draws, len(mean)))
+        else:
+            effects = np.zeros((n_draws, 0))
+
+        step = self._chunk_rows(len(years))
+        for lo in range(0, n_series, step):
+            hi = min(lo + step, n_series)
+            design = engine._design(years[None, :] - center[lo:hi, None])
+            coef = engine.coef_[lo:hi] + np.einsum("dsk,sjk->dsj", rng.standard_normal((n_draws, hi - lo, k)), cov_sqrt[lo:hi])
+            paths = np.einsum("dsk,stk->dst", coef, design)
+            paths += sigma[None, lo:hi, None] * rng.standard_normal((n_draws, hi - lo, len(years)))
+            if effects.shape[1]:
+                loading = weights[lo:hi, :, None] * (kernels[None, :, :] - realised[lo:hi, :, None])
+                paths += (effects @ loading.transpose(1, 0, 2).reshape(effects.shape[1], -1)).reshape(paths.shape)
+            yield lo, hi, paths
+
+    def bands(self, years: Sequence[float] = DEFAULT_HORIZON, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> pd.DataFrame:
+        """Tidy frame of simulated mean and quantile bands per series and year."""
+
+        years = np.asarray(list(years), dtype=int)
+        n_series = len(self.engine.params_)
+        means = np.empty((n_series, len(years)))
+        qs = np.empty((len(quantiles), n_series, len(years)))
+        for lo, hi, paths in self.iter_paths(years):
+            means[lo:hi] = paths.mean(axis=0)
+            qs[:, lo:hi] = np.quantile(paths, quantiles, axis=0)
+
+        keys = self.engine.params_[self.engine.group_cols_]
+        tidy = keys.loc[keys.index.repeat(len(years))].reset_index(drop=True)
+        tidy["year"] = np.tile(years, n_series)
+        tidy["mean"] = means.ravel()
+        for q, values in zip(quantiles, qs):
+            tidy[quantile_label(q)] = values.ravel()
+        return tidy
+
+
+if __name__ == "__main__":
+    from src.config.settings import settings
+    from src.data.unified_store import UnifiedStore
+
+    from .events import impact_table
+
+    store = UnifiedStore.open_or_build()
+    engine = ForecastEngine.from_store(store)
+    impacts = impact_table(store.impact_links(arrow=False), store.events(arrow=False))
+    bands = MonteCarloForecaster(engine, impacts, seed=42).bands()
+    settings.outputs_dir.mkdir(parents=True, exist_ok=True)
+    bands.to_csv(settings.outputs_dir / "forecast_bands.csv", index=False)
+    print(f"Simulated {len(engine.params_)} series -> {settings.outputs_dir / 'forecast_bands.csv'}")
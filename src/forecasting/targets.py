@@ -0,0 +1,178 @@
+"""When does an indicator reach a target?
+
+The Inclusion Projections page took the first year in the published CSV
+whose value was at least 60%, so it could only ever answer "Beyond 2027".
+`TargetSolver` answers the question for any indicator, threshold, scenario
+and horizon:
+
+- the expected crossing is found by vectorized root-finding on a fine year
+  grid (first sign change of `value - target`, refined by linear
+  interpolation) of the trend plus the mean event effects;
+- the crossing-time distribution applies the same root-finding to every
+  trajectory simulated by `MonteCarloForecaster`.
+
+All series × all targets are answered in one call; paths are consumed chunk
+by chunk, so memory stays bounded by the simulator's chunk budget.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .engine import ForecastEngine
+from .simulation import MonteCarloForecaster
+
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+
+def crossing_times(values: np.ndarray, times: np.ndarray, targets: np.ndarray, direction: str = "up") -> np.ndarray:
+    """First time each trajectory reaches each target, interpolated between grid points.
+
+    Args:
+        values: (..., time) trajectories
+        times: (time,) grid
+        targets: (n_targets,) thresholds
+        direction: "up" for reaching at least the target, "down" for at most
+
+    Returns:
+        (n_targets, ...) crossing times; `times[0]` if already reached at the
+        first grid point, `inf` if never reached within the grid.
+    """
+
+    if direction not in ("up", "down"):
+        raise ValueError("direction must be 'up' or 'down'")
+    sign = 1.0 if direction == "up" else -1.0
+    gap = sign * (values[None, ...] - targets.reshape((-1,) + (1,) * values.ndim))
+    reached = gap >= 0
+    hit = reached.any(axis=-1)
+    first = np.argmax(reached, axis=-1)
+
+    prev = np.maximum(first - 1, 0)
+    gap_hit = np.take_along_axis(gap, first[..., None], axis=-1)[..., 0]
+    gap_prev = np.take_along_axis(gap, prev[..., None], axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(first > 0, -gap_prev / (gap_hit - gap_prev), 0.0)
+    out = times[prev] + np.nan_to_num(frac) * (times[first] - times[prev])
+    return np.where(hit, out, np.inf)
+
+
+class TargetSolver:
+    """Target-attainment times for every series of a fitted engine.
+
+    Args:
+        forecaster: simulator supplying the trajectories (and the engine)
+        resolution: spacing, in years, of the grid the trend crossing is solved on
+    """
+
+    def __init__(self, forecaster: MonteCarloForecaster, resolution: float = 0.05):
+        self.forecaster = forecaster
+        self.engine: ForecastEngine = forecaster.engine
+        self.resolution = resolution
+
+    @classmethod
+    def from_engine(cls, engine: ForecastEngine, impacts: Optional[pd.DataFrame] = None, scenario=None, **kwargs) -> "TargetSolver":
+        """Solver over `engine` with `impacts` rewritten by an optional `Scenario`."""
+
+        resolution = kwargs.pop("resolution", 0.05)
+        if scenario is not None and impacts is not None and len(impacts):
+            impacts = scenario.apply(impacts)
+        return cls(MonteCarloForecaster(engine, impacts, **kwargs), resolution=resolution)
+
+    def _targets(self, targets) -> pd.DataFrame:
+        """Normalize targets to (series row, target) pairs."""
+
+        params = self.engine.params_
+        if isinstance(targets, pd.DataFrame):
+            keys = [col for col in self.engine.group_cols_ if col in targets.columns]
+            pairs = params[self.engine.group_cols_].reset_index(names="series").merge(targets, on=keys)
+            return pairs[["series", "target"]]
+        if isinstance(targets, dict):
+            codes = params["indicator_code"].astype(str)
+            rows = [(s, float(t)) for code, values in targets.items() for t in np.atleast_1d(values) for s in np.flatnonzero(codes == code)]
+            return pd.DataFrame(rows, columns=["series", "target"])
+        values = np.atleast_1d(np.asarray(targets, dtype=float))
+        return pd.DataFrame({
+            "series": np.repeat(np.arange(len(params)), len(values)),
+            "target": np.tile(values, len(params)),
+        })
+
+    def solve(
+        self,
+        targets: Union[float, Sequence[float], dict, pd.DataFrame],
+        horizon: Iterable[int],
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        direction: str = "up",
+    ) -> pd.DataFrame:
+        """Crossing-time summary per (series, target).
+
+        `targets` is one threshold or a list for every series, a dict
+        `{indicator_code: threshold(s)}`, or a frame with group columns and a
+        `target` column. `horizon` is the range of years searched.
+
+        Columns: `trend_year` (crossing of the expected path, i.e. the trend
+        plus mean event effects the trajectories are centred on), `probability` (share of
+        trajectories reaching the target within the horizon), one `year_pXX`
+        per quantile of the crossing time (inf when fewer than that share
+        reach it) and `first_year_pXX`, the calendar year the crossing falls in.
+        """
+
+        pairs = self._targets(targets)
+        years = np.asarray(list(horizon), dtype=float)
+        if not len(years):
+            raise ValueError("horizon must contain at least one year")
+        params = self.engine.params_
+        out = params.loc[pairs["series"], self.engine.group_cols_].reset_index(drop=True)
+        out["target"] = pairs["target"].to_numpy()
+        if pairs.empty:
+            return out
+
+        unique_targets, target_idx = np.unique(pairs["target"].to_numpy(), return_inverse=True)
+        series_idx = pairs["series"].to_numpy()
+
+        # Expected-path crossing on a fine grid: every series × every distinct target at once
+        fine = np.arange(years[0], years[-1] + self.resolution / 2, self.resolution)
+        trend = crossing_times(self.forecaster.expected_paths(fine), fine, unique_targets, direction)
+        out["trend_year"] = trend[target_idx, series_idx]
+
+        # Crossing-time distribution from the simulated trajectories; each series
+        # lives in exactly one chunk, so its summary is final once that chunk is done
+        probability = np.zeros(len(pairs))
+        summary = np.full((len(quantiles), len(pairs)), np.inf)
+        for lo, hi, paths in self.forecaster.iter_paths(years):
+            in_chunk = (series_idx >= lo) & (series_idx < hi)
+            if not in_chunk.any():
+                continue
+            times = crossing_times(paths, years, unique_targets, direction)  # (targets, draws, series)
+            picked = times[target_idx[in_chunk], :, series_idx[in_chunk] - lo]
+            probability[in_chunk] = np.isfinite(picked).mean(axis=1)
+            # No interpolation: draws that never cross are +inf and must not be averaged
+            summary[:, in_chunk] = np.quantile(picked, quantiles, axis=1, method="inverted_cdf")
+
+        out["probability"] = probability
+        for q, value in zip(quantiles, summary):
+            label = f"p{round(q * 100):d}"
+            out[f"year_{label}"] = value
+            out[f"first_year_{label}"] = np.where(np.isfinite(value), np.ceil(value), np.nan)
+        return out
+
+    def probability_by_year(self, targets, horizon: Iterable[int], direction: str = "up") -> pd.DataFrame:
+        """Cumulative probability of having reached each target by each horizon year."""
+
+        years = np.asarray(list(horizon), dtype=int)
+        pairs = self._targets(targets)
+        series_idx = pairs["series"].to_numpy()
+        unique_targets, target_idx = np.unique(pairs["target"].to_numpy(), return_inverse=True)
+        probs = np.zeros((len(pairs), len(years)))
+        for lo, hi, paths in self.forecaster.iter_paths(years):
+            in_chunk = (series_idx >= lo) & (series_idx < hi)
+            if not in_chunk.any():
+                continue
+            times = crossing_times(paths, years.astype(float), unique_targets, direction)
+            picked = times[target_idx[in_chunk], :, series_idx[in_chunk] - lo]
+            probs[in_chunk] = (picked[:, :, None] <= years[None, None, :]).mean(axis=1)
+
+        out = self.engine.params_.loc[series_idx, self.engine.group_cols_].reset_index(drop=True)
+        out["target"] = pairs["target"].to_numpy()
+        return pd.concat([out, pd.DataFrame(probs, columns=years.tolist())], axis=1)
@@ -9,6 +9,8 @@ from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from src.pipeline.text_cache import default_text_cache, resolve_vectors
+
 # 1. SETUP & CONFIGURATION
 ROOT = Path(".").resolve() # Adjusted to current directory for standard script use
 PROCESSED_DATA_PATH = ROOT / "data" / "processed" / "filtered_complaints.csv"
@@ -40,7 +42,7 @@ def create_chunks(df, text_splitter, text_col='cleaned_narrative'):
                 'chunk_index': i,
                 'original_index': idx
             })
-    return pd.DataFrame(chunks)
+    return pd.DataFrame(chunks, columns=['chunk_id', 'complaint_id', 'product', 'text', 'chunk_index', 'original_index'])
 
 def main():
     # --- STEP 1: LOAD & SAMPLE ---
@@ -75,7 +77,14 @@ def main():
     
     texts = df_chunks['text'].tolist()
     print("Generating embeddings (this may take a few minutes)...")
-    embeddings = embedding_model.encode(texts, batch_size=32, show_progress_bar=True)
+    # Duplicate chunks are embedded once; earlier runs' vectors come from the shared text cache
+    embeddings = resolve_vectors(
+        texts,
+        lambda unique: list(embedding_model.encode(unique, batch_size=32, show_progress_bar=True)),
+        namespace=f"embedding/{MODEL_NAME}",
+        dim=embedding_model.get_sentence_embedding_dimension(),
+        cache=default_text_cache(),
+    )
 
     # --- STEP 4: INDEXING IN CHROMADB ---
     print(f"Initializing ChromaDB at: {VECTOR_STORE_DIR}")
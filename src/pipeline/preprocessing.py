@@ -3,13 +3,28 @@
 Provides functions to preprocess single texts or a DataFrame column and
 produce a cleaned, lemmatized string suitable for vectorizers or sentiment
 analysis. Uses NLTK and performs lazy resource downloads when needed.
+
+`TextNormalizer` holds the stop-word set, tagger and lemmatizer, tags tokens
+a batch of texts at a time and memoizes lemmas per (token, POS); the
+module-level functions delegate to a cached instance.
 """
-from typing import List, Callable, Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Callable, Optional
 import nltk
 import re
+import pandas as pd
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from nltk import word_tokenize, pos_tag
+from nltk.tag.perceptron import PerceptronTagger
+from nltk import word_tokenize
+
+from .text_cache import TextCache, resolve_texts
+
+# Bump when TextNormalizer output changes, so cached results are not reused
+NORMALIZER_VERSION = '1'
+_URL_RE = re.compile(r"http\S+|www\S+")
+_PUNCT_RE = re.compile(r"[^\w\s'-]")
 
 _nlp_setup_done = False
 
@@ -40,6 +55,87 @@ def _pos_tag_to_wordnet(tag: str) -> str:
     return 'n'
 
 
+class TextNormalizer:
+    """Tokenize, remove stopwords/punctuation and lemmatize many texts.
+
+    Resources are loaded once per instance. Part-of-speech tagging runs over a
+    batch of token lists at a time and lemmas are memoized per (token, POS) in
+    a bounded LRU. Instances pickle as their settings only, so worker
+    processes rebuild their own resources once.
+
+    Args:
+        min_token_len: minimum token length to keep
+        extra_stopwords: additional stopwords to remove
+        cache_size: maximum number of (token, POS) lemmas memoized
+    """
+
+    def __init__(self, min_token_len: int = 2, extra_stopwords: Optional[Iterable[str]] = None, cache_size: int = 200_000):
+        setup_nlp_resources()
+        self.min_token_len = min_token_len
+        self.extra_stopwords = tuple(extra_stopwords or ())
+        self.cache_size = cache_size
+        self.stop_words = frozenset(stopwords.words('english')).union(self.extra_stopwords)
+        self._tagger = PerceptronTagger()
+        self._lemmatizer = WordNetLemmatizer()
+        self._lemma = lru_cache(maxsize=cache_size)(self._lemmatizer.lemmatize)
+
+    def __getstate__(self):
+        return {'min_token_len': self.min_token_len, 'extra_stopwords': self.extra_stopwords, 'cache_size': self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def cache_info(self):
+        return self._lemma.cache_info()
+
+    def tokens(self, text) -> List[str]:
+        """Lowercased alphabetic tokens of `text` that are neither stopwords nor too short."""
+        if text is None:
+            return []
+        text = _PUNCT_RE.sub(' ', _URL_RE.sub(' ', str(text)))
+        tokens = (t.lower() for t in word_tokenize(text) if t.isalpha())
+        return [t for t in tokens if t not in self.stop_words and len(t) >= self.min_token_len]
+
+    def normalize_batch(self, texts: Iterable[str]) -> List[str]:
+        """Cleaned, lemmatized string for each text, tagging the whole batch in one call."""
+        token_lists = [self.tokens(text) for text in texts]
+        tagged = self._tagger.tag_sents(token_lists)
+        return [' '.join(self._lemma(tok, _pos_tag_to_wordnet(tag)) for tok, tag in sent) for sent in tagged]
+
+    def normalize(self, text: str) -> str:
+        return self.normalize_batch([text])[0]
+
+    def normalize_series(self, texts: pd.Series, n_jobs: int = 1, chunk_size: int = 5000) -> pd.Series:
+        """Normalize a column; with n_jobs > 1 chunks of `chunk_size` texts run across processes."""
+        values = texts.fillna('').astype(str).tolist()
+        chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+        if n_jobs > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks)), initializer=_init_worker, initargs=(self,)) as pool:
+                parts = list(pool.map(_normalize_chunk, chunks))
+        else:
+            parts = [self.normalize_batch(chunk) for chunk in chunks]
+        return pd.Series([text for part in parts for text in part], index=texts.index, dtype=object)
+
+
+_worker_normalizer = None
+
+
+def _init_worker(normalizer: TextNormalizer):
+    # The normalizer arrives as its settings and rebuilds its resources once per worker
+    global _worker_normalizer
+    _worker_normalizer = normalizer
+
+
+def _normalize_chunk(texts: List[str]) -> List[str]:
+    return _worker_normalizer.normalize_batch(texts)
+
+
+@lru_cache(maxsize=8)
+def get_normalizer(min_token_len: int = 2, extra_stopwords: tuple = ()) -> TextNormalizer:
+    """Shared `TextNormalizer` per settings, so repeated calls reuse loaded resources and lemma cache."""
+    return TextNormalizer(min_token_len=min_token_len, extra_stopwords=extra_stopwords)
+
+
 def preprocess_text(text: str, min_token_len: int = 2, extra_stopwords: Optional[List[str]] = None) -> str:
     """Tokenize, remove stopwords/punctuation, lemmatize and return cleaned string.
 
@@ -53,36 +149,26 @@ def preprocess_text(text: str, min_token_len: int = 2, extra_stopwords: Optional
     """
     if text is None:
         return ''
-    setup_nlp_resources()
-
-    text = str(text)
-    # Basic cleanup
-    text = re.sub(r"http\S+|www\S+", " ", text)
-    text = re.sub(r"[^\w\s'-]", ' ', text)
-    tokens = word_tokenize(text)
-    tokens = [t.lower() for t in tokens if t.isalpha()]
-
-    stop_words = set(stopwords.words('english'))
-    if extra_stopwords:
-        stop_words.update(extra_stopwords)
-
-    tokens = [t for t in tokens if t not in stop_words and len(t) >= min_token_len]
+    return get_normalizer(min_token_len, tuple(extra_stopwords or ())).normalize(text)
 
-    # Lemmatize with POS
-    lemmatizer = WordNetLemmatizer()
-    tagged = pos_tag(tokens)
-    lemmas = [lemmatizer.lemmatize(tok, _pos_tag_to_wordnet(tag)) for tok, tag in tagged]
 
-    return ' '.join(lemmas)
-
-
-def preprocess_dataframe(df, text_col: str = 'review_text', out_col: str = 'review_text_preprocessed', inplace: bool = False, **kwargs):
+def preprocess_dataframe(df, text_col: str = 'review_text', out_col: str = 'review_text_preprocessed', inplace: bool = False,
+                         n_jobs: int = 1, chunk_size: int = 5000, cache: Optional[TextCache] = None, **kwargs):
     """Preprocess a DataFrame column and add an output column with cleaned text.
 
+    `kwargs` go to `preprocess_text`; `n_jobs > 1` spreads chunks of
+    `chunk_size` rows over worker processes. Each distinct text is processed
+    once; pass a `TextCache` to reuse results across calls and runs.
     Returns the modified DataFrame (copy unless inplace=True).
     """
     if text_col not in df.columns:
         raise ValueError(f"Text column '{text_col}' not found in DataFrame")
     target_df = df if inplace else df.copy()
-    target_df[out_col] = target_df[text_col].fillna('').astype(str).apply(lambda t: preprocess_text(t, **kwargs))
+    normalizer = get_normalizer(kwargs.get('min_token_len', 2), tuple(kwargs.get('extra_stopwords') or ()))
+
+    def compute(texts):
+        return normalizer.normalize_series(pd.Series(texts, dtype=object), n_jobs=n_jobs, chunk_size=chunk_size).tolist()
+
+    namespace = f"normalize/{normalizer.min_token_len}/{','.join(sorted(normalizer.extra_stopwords))}"
+    target_df[out_col] = resolve_texts(target_df[text_col], compute, namespace, NORMALIZER_VERSION, cache)
     return target_df
@@ -5,22 +5,28 @@ This module provides functions for analyzing sentiment in financial news headlin
 using NLTK's VADER (Valence Aware Dictionary and sEntiment Reasoner).
 """
 
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 import warnings
 
+from .text_cache import TextCache, resolve_texts
+from .transformer_sentiment import DEFAULT_MODEL, get_transformer_sentiment, transformer_available
+
 warnings.filterwarnings('ignore')
 
 # Optional heavy imports (transformers / textblob) are lazy-initialized below
-_transformer_pipeline = None
-_transformer_model_name = 'distilbert-base-uncased-finetuned-sst-2-english'
-try:
-    from transformers import pipeline as _hf_pipeline
-except Exception:
-    _hf_pipeline = None
-
+_transformer_model_name = DEFAULT_MODEL
+# Bump when compute_sentiment output changes, so cached results are not reused
+SENTIMENT_VERSION = '3'
+# Compound score beyond which a text counts as positive/negative
+LABEL_THRESHOLD = 0.05
+VADER_FIELDS = ('neg', 'neu', 'pos', 'compound')
+# One analyzer per process; building it reloads the whole lexicon
+_vader = None
 try:
     from textblob import TextBlob
 except Exception:
@@ -38,6 +44,53 @@ def setup_nltk_resources():
             nltk.download(package, quiet=True)
 
 
+def get_vader() -> SentimentIntensityAnalyzer:
+    """The process's shared VADER analyzer, built on first use."""
+    global _vader
+    if _vader is None:
+        _vader = SentimentIntensityAnalyzer()
+    return _vader
+
+
+def _vader_chunk(texts: List[str]) -> np.ndarray:
+    sia = get_vader()
+    out = np.empty((len(texts), len(VADER_FIELDS)))
+    for i, text in enumerate(texts):
+        scores = sia.polarity_scores(text)
+        out[i] = [scores[field] for field in VADER_FIELDS]
+    return out
+
+
+def vader_scores(texts: Iterable, n_jobs: int = 1, chunk_size: int = 2000) -> Dict[str, np.ndarray]:
+    """VADER neg/neu/pos/compound arrays for many texts.
+
+    Missing texts score as neutral (0, 1, 0, 0). With n_jobs > 1 chunks of
+    `chunk_size` texts are scored in worker processes, each holding its own
+    analyzer.
+    """
+    values = pd.Series(list(texts), dtype=object)
+    present = values.notna().to_numpy()
+    strings = values[present].astype(str).tolist()
+
+    chunks = [strings[i:i + chunk_size] for i in range(0, len(strings), chunk_size)]
+    if n_jobs > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks))) as pool:
+            parts = list(pool.map(_vader_chunk, chunks))
+    else:
+        parts = [_vader_chunk(chunk) for chunk in chunks]
+
+    matrix = np.tile([0.0, 1.0, 0.0, 0.0], (len(values), 1))
+    if parts:
+        matrix[present] = np.concatenate(parts)
+    return {field: matrix[:, i] for i, field in enumerate(VADER_FIELDS)}
+
+
+def sentiment_labels(compound: np.ndarray, threshold: float = LABEL_THRESHOLD) -> np.ndarray:
+    """'positive' / 'negative' / 'neutral' per compound score."""
+    compound = np.asarray(compound, dtype=float)
+    return np.select([compound >= threshold, compound <= -threshold], ['positive', 'negative'], default='neutral')
+
+
 def analyze_headline_sentiment(headline: str) -> Dict[str, float]:
     """
     Analyze sentiment of a single headline using NLTK VADER.
@@ -52,36 +105,24 @@ def analyze_headline_sentiment(headline: str) -> Dict[str, float]:
         - pos: Positive sentiment (0-1)
         - compound: Overall sentiment (-1 to 1)
     """
-    sia = SentimentIntensityAnalyzer()
-    scores = sia.polarity_scores(headline)
-    return scores
+    return get_vader().polarity_scores(headline)
 
 
-def batch_sentiment_analysis(headlines: pd.Series) -> pd.DataFrame:
+def batch_sentiment_analysis(headlines: pd.Series, n_jobs: int = 1) -> pd.DataFrame:
     """
     Process multiple headlines efficiently.
     
     Args:
         headlines: Pandas Series of headline texts
+        n_jobs: worker processes for large inputs
         
     Returns:
         DataFrame with columns: neg, neu, pos, compound, sentiment_label
     """
-    sia = SentimentIntensityAnalyzer()
-    
-    results = []
-    for headline in headlines:
-        if pd.isna(headline):
-            results.append({'neg': 0, 'neu': 1, 'pos': 0, 'compound': 0})
-        else:
-            results.append(sia.polarity_scores(str(headline)))
-    
-    df = pd.DataFrame(results)
+    df = pd.DataFrame(vader_scores(headlines, n_jobs=n_jobs))
     
     # Add sentiment label based on compound score
-    df['sentiment_label'] = df['compound'].apply(
-        lambda x: 'positive' if x >= 0.05 else ('negative' if x <= -0.05 else 'neutral')
-    )
+    df['sentiment_label'] = sentiment_labels(df['compound'].to_numpy())
     
     return df
 
@@ -135,8 +176,7 @@ def extract_sentiment_features(headline: str) -> Dict[str, any]:
     Returns:
         Dictionary with sentiment scores and text features
     """
-    sia = SentimentIntensityAnalyzer()
-    sentiment = sia.polarity_scores(headline)
+    sentiment = get_vader().polarity_scores(headline)
     
     # Add text-based features
     features = sentiment.copy()
@@ -150,21 +190,19 @@ def extract_sentiment_features(headline: str) -> Dict[str, any]:
 
 
 def _init_transformer_pipeline(model_name: str = None):
-    """Lazily initialize a Hugging Face sentiment pipeline.
+    """Lazily load the shared batched transformer classifier.
 
-    Returns None if transformers is not installed.
+    Returns None if transformers/torch are not installed or the model cannot be loaded.
     """
-    global _transformer_pipeline, _transformer_model_name
+    global _transformer_model_name
     if model_name:
         _transformer_model_name = model_name
-    if _hf_pipeline is None:
+    if not transformer_available():
+        return None
+    try:
+        return get_transformer_sentiment(_transformer_model_name)
+    except Exception:
         return None
-    if _transformer_pipeline is None:
-        try:
-            _transformer_pipeline = _hf_pipeline('sentiment-analysis', model=_transformer_model_name)
-        except Exception:
-            _transformer_pipeline = None
-    return _transformer_pipeline
 
 
 def compute_sentiment(text: str, method: str = 'vader', transformer_model: str = None) -> Dict[str, any]:
@@ -186,42 +224,42 @@ def compute_sentiment(text: str, method: str = 'vader', transformer_model: str =
         return {'score': float(polarity), 'label': label, 'method': 'textblob'}
 
     if method == 'transformer':
-        pipe = _init_transformer_pipeline(transformer_model)
-        if pipe is None:
-            # fallback to vader
-            return compute_sentiment(text, method='vader')
-        try:
-            out = pipe(text[:512])[0]
-            # HF returns labels like 'POSITIVE' or 'NEGATIVE' and a score
-            score_raw = float(out.get('score', 0.0))
-            label_raw = out.get('label', '').lower()
-            # Normalize label to positive/negative/neutral (no neutral in many models)
-            label = 'positive' if 'pos' in label_raw else ('negative' if 'neg' in label_raw else 'neutral')
-            # Map score to signed score where positive is >0
-            score = score_raw if label == 'positive' else -score_raw if label == 'negative' else 0.0
-            return {'score': score, 'label': label, 'method': 'transformer', 'raw': out}
-        except Exception:
-            return compute_sentiment(text, method='vader')
+        return _transformer_results([text], transformer_model)[0]
 
     # default: vader
-    sia = SentimentIntensityAnalyzer()
-    scores = sia.polarity_scores(text)
+    scores = get_vader().polarity_scores(text)
     compound = float(scores.get('compound', 0.0))
     label = 'positive' if compound >= 0.05 else ('negative' if compound <= -0.05 else 'neutral')
     return {'score': compound, 'label': label, 'method': 'vader', 'details': scores}
 
 
-def batch_sentiment(df: pd.DataFrame, text_col: str = 'review_text', out_score_col: str = 'sentiment_score', out_label_col: str = 'sentiment_label', method: str = 'vader', transformer_model: str = None) -> pd.DataFrame:
+def batch_sentiment(df: pd.DataFrame, text_col: str = 'review_text', out_score_col: str = 'sentiment_score', out_label_col: str = 'sentiment_label', method: str = 'vader', transformer_model: str = None, cache: Optional[TextCache] = None, n_jobs: int = 1, service=None) -> pd.DataFrame:
     """Compute sentiment for a DataFrame column and attach score/label columns.
 
+    Each distinct text is scored once; pass a `TextCache` to reuse scores
+    across calls and runs. VADER scoring is vectorized and, with n_jobs > 1,
+    spread over worker processes; transformer scoring runs in length-sorted
+    batches on one shared model, or on `service` (a running `SentimentService`
+    or a `sentiment_service.connect()` proxy) so workers share one model.
     Returns a copy of the DataFrame with new columns added.
     """
     if text_col not in df.columns:
         raise ValueError(f"Text column '{text_col}' not found in DataFrame")
 
-    texts = df[text_col].fillna('').astype(str)
+    # Key the cache on the method that really runs, so VADER fallbacks are never served as transformer scores
+    used = _resolved_method(method, transformer_model, service)
 
-    results = [compute_sentiment(t, method=method, transformer_model=transformer_model) for t in texts]
+    def compute(texts):
+        if used == 'vader':
+            return _vader_results(texts, n_jobs)
+        if used == 'transformer':
+            if service is not None:
+                return service.predict(texts)
+            return _transformer_results(texts, transformer_model)
+        return [compute_sentiment(t, method=used) for t in texts]
+
+    namespace = f"sentiment/{used}" + (f"/{transformer_model or _transformer_model_name}" if used == 'transformer' else '')
+    results = resolve_texts(df[text_col], compute, namespace, SENTIMENT_VERSION, cache)
     scores = [r.get('score', 0.0) for r in results]
     labels = [r.get('label', 'neutral') for r in results]
 
@@ -229,3 +267,32 @@ def batch_sentiment(df: pd.DataFrame, text_col: str = 'review_text', out_score_c
     out[out_score_col] = scores
     out[out_label_col] = labels
     return out
+
+
+def _vader_results(texts: List[str], n_jobs: int = 1) -> List[Dict[str, any]]:
+    """`compute_sentiment(text, 'vader')` results for many texts from one vectorized pass."""
+    scores = vader_scores(texts, n_jobs=n_jobs)
+    labels = sentiment_labels(scores['compound'])
+    rows = zip(*(scores[field].tolist() for field in VADER_FIELDS))
+    return [
+        {'score': details[3], 'label': str(label), 'method': 'vader', 'details': dict(zip(VADER_FIELDS, details))}
+        for details, label in zip(rows, labels)
+    ]
+
+
+def _transformer_results(texts: List[str], transformer_model: str = None) -> List[Dict[str, any]]:
+    """Transformer results for many texts in batched passes, falling back to VADER when no model is available."""
+    model = _init_transformer_pipeline(transformer_model)
+    if model is None:
+        return _vader_results(texts)
+    return model.predict(texts)
+
+
+def _resolved_method(method: str, transformer_model: str = None, service=None) -> str:
+    """The method that will actually score texts, after falling back to VADER for missing backends."""
+    method = (method or 'vader').lower()
+    if method == 'textblob' and TextBlob is not None:
+        return method
+    if method == 'transformer' and (service is not None or _init_transformer_pipeline(transformer_model) is not None):
+        return method
+    return 'vader'
@@ -0,0 +1,299 @@
+"""Shared sentiment inference service with request coalescing.
+
+Loading the transformer costs every script and worker process its own
+~250 MB model copy. `SentimentService` holds one warm model (by default the
+int8-quantized ONNX export from `transformer_sentiment`) and serves many
+callers:
+
+- callers submit micro-batches of texts from any thread;
+- a single inference thread coalesces queued requests into one model batch,
+  waiting at most `max_wait_ms` after the oldest request and taking at most
+  `max_batch_texts` texts (splitting requests that do not fit);
+- cancelled requests are dropped before they reach the model;
+- `stats()` reports request/text/batch counts, throughput and latency
+  percentiles.
+
+Other processes reach the same model through a local multiprocessing manager:
+`start_server()` launches it in a child process and `connect()` returns a
+proxy exposing `predict()` and `stats()`.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .transformer_sentiment import DEFAULT_MODEL, get_transformer_sentiment, transformer_available
+
+DEFAULT_ADDRESS = ('127.0.0.1', 50871)
+# Hex-encoded manager authkey shared with worker processes through the environment
+AUTHKEY_ENV = 'SENTIMENT_SERVICE_AUTHKEY'
+# Recent request latencies kept for the percentile counters
+LATENCY_WINDOW = 10_000
+_STOP = object()
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+    enqueued: float = field(default_factory=time.perf_counter)
+    # Next text to schedule, and results gathered so far (requests may span batches)
+    offset: int = 0
+    done: int = 0
+    results: List[Any] = field(default_factory=list)
+    failed: bool = False
+
+    def __post_init__(self):
+        self.results = [None] * len(self.texts)
+
+
+class SentimentService:
+    """One warm sentiment model answering micro-batches from many callers.
+
+    Args:
+        model: object with `predict(texts) -> list of result dicts`; default loads
+            the shared `TransformerSentiment` for `model_name`/`backend`/`quantize`
+        max_batch_texts: most texts per coalesced model batch; larger requests are
+            split across batches
+        max_wait_ms: latency budget for gathering a batch after the oldest request
+        model_name, backend, quantize: model to load when `model` is None; the ONNX
+            backend falls back to torch when optimum/onnxruntime are missing
+    """
+
+    def __init__(
+        self,
+        model: Any = None,
+        max_batch_texts: int = 256,
+        max_wait_ms: float = 10.0,
+        model_name: str = DEFAULT_MODEL,
+        backend: str = 'onnx',
+        quantize: bool = True,
+    ):
+        if max_batch_texts < 1:
+            raise ValueError("max_batch_texts must be at least 1")
+        self.model = model
+        self.max_batch_texts = max_batch_texts
+        self.max_wait = max_wait_ms / 1000
+        self.model_name = model_name
+        self.backend = backend
+        self.quantize = quantize
+        self._queue: "queue.Queue" = queue.Queue()
+        self._carry: Optional[_Request] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {'requests': 0, 'texts': 0, 'batches': 0, 'errors': 0, 'busy_seconds': 0.0}
+        self._started_at: Optional[float] = None
+
+    def start(self) -> 'SentimentService':
+        """Load and warm the model, then start the inference thread."""
+        if self._thread is not None:
+            return self
+        if self.model is None:
+            backend = self.backend if transformer_available(self.backend) else 'torch'
+            self.model = get_transformer_sentiment(self.model_name, backend, self.quantize)
+        self.model.predict(['warm up'])
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sentiment-service', daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Queue texts for scoring; the future resolves to one result per text."""
+        if self._thread is None:
+            raise RuntimeError("SentimentService is not running; call start() first")
+        request = _Request(['' if text is None else str(text) for text in texts])
+        if not request.texts:
+            request.future.set_result([])
+        else:
+            self._queue.put(request)
+        return request.future
+
+    def predict(self, texts: Sequence[str], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.submit(texts).result(timeout)
+
+    def _next_request(self, timeout: Optional[float]) -> Any:
+        """Next live request (or _STOP) from the queue, skipping cancelled ones; None on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            try:
+                item = self._queue.get(timeout=remaining) if remaining != 0 else self._queue.get_nowait()
+            except queue.Empty:
+                return None
+            if item is _STOP or item.future.set_running_or_notify_cancel():
+                return item
+
+    def _gather(self, first: _Request) -> Tuple[List[Tuple[_Request, int, int]], bool]:
+        """(request, start, end) slices for one batch of at most max_batch_texts texts, and whether a stop was seen.
+
+        A request that does not fit is split; its remainder is carried into the next batch.
+        """
+        slices, size = [], 0
+        deadline = first.enqueued + self.max_wait
+        request = first
+        while True:
+            take = min(len(request.texts) - request.offset, self.max_batch_texts - size)
+            slices.append((request, request.offset, request.offset + take))
+            request.offset += take
+            size += take
+            if request.offset < len(request.texts):
+                self._carry = request
+                return slices, False
+            if size >= self.max_batch_texts:
+                return slices, False
+            item = self._next_request(max(deadline - time.perf_counter(), 0))
+            if item is None:
+                return slices, False
+            if item is _STOP:
+                return slices, True
+            request = item
+
+    @staticmethod
+    def _settle(future: Future, result: Any = None, error: Optional[BaseException] = None):
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _run(self):
+        stopping = False
+        while self._carry is not None or not stopping:
+            if self._carry is not None:
+                item, self._carry = self._carry, None
+            else:
+                item = self._next_request(None)
+                if item is _STOP:
+                    break
+            batch, stop = self._gather(item)
+            stopping = stopping or stop
+            texts = [text for request, lo, hi in batch for text in request.texts[lo:hi]]
+            started = time.perf_counter()
+            try:
+                results = list(self.model.predict(texts))
+                if len(results) != len(texts):
+                    raise ValueError(f"model returned {len(results)} results for {len(texts)} texts")
+            except Exception as exc:
+                failed = {id(request): request for request, _, _ in batch}.values()
+                for request in failed:
+                    request.failed = True
+                    self._settle(request.future, error=exc)
+                if self._carry is not None and self._carry.failed:
+                    self._carry = None
+                with self._lock:
+                    self._counters['errors'] += len(failed)
+                continue
+            finished = time.perf_counter()
+
+            completed = []
+            offset = 0
+            for request, lo, hi in batch:
+                request.results[lo:hi] = results[offset:offset + hi - lo]
+                request.done += hi - lo
+                offset += hi - lo
+                if request.done == len(request.texts):
+                    self._settle(request.future, request.results)
+                    completed.append(request)
+            with self._lock:
+                self._counters['requests'] += len(completed)
+                self._counters['texts'] += len(texts)
+                self._counters['batches'] += 1
+                self._counters['busy_seconds'] += finished - started
+                self._latencies.extend(finished - request.enqueued for request in completed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since start: volume, batching, throughput and latency (ms)."""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = np.array(self._latencies) * 1000
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        busy = counters.pop('busy_seconds')
+        counters.update({
+            'queue_depth': self._queue.qsize(),
+            'mean_batch_texts': counters['texts'] / counters['batches'] if counters['batches'] else 0.0,
+            'texts_per_s': counters['texts'] / uptime if uptime else 0.0,
+            'model_texts_per_s': counters['texts'] / busy if busy else 0.0,
+            'uptime_s': uptime,
+        })
+        for name, q in (('p50', 50), ('p95', 95), ('p99', 99)):
+            counters[f'latency_{name}_ms'] = float(np.percentile(latencies, q)) if latencies.size else 0.0
+        counters['latency_max_ms'] = float(latencies.max()) if latencies.size else 0.0
+        return counters
+
+
+_served: Optional[SentimentService] = None
+
+
+def _init_server(service_kwargs: Dict[str, Any]):
+    global _served
+    _served = SentimentService(**service_kwargs).start()
+
+
+def _get_served() -> SentimentService:
+    return _served
+
+
+class SentimentServiceManager(BaseManager):
+    """Multiprocessing manager exposing the served `SentimentService`."""
+
+
+SentimentServiceManager.register('service', callable=_get_served, exposed=('predict', 'stats'))
+
+
+def _authkey(authkey: Optional[bytes]) -> bytes:
+    if authkey is not None:
+        return authkey
+    if not os.environ.get(AUTHKEY_ENV):
+        raise ValueError(f"no authkey given and {AUTHKEY_ENV} is not set; start the server first or pass its authkey")
+    return bytes.fromhex(os.environ[AUTHKEY_ENV])
+
+
+def start_server(address=DEFAULT_ADDRESS, authkey: Optional[bytes] = None, **service_kwargs) -> SentimentServiceManager:
+    """Run a `SentimentService` in a child process; call `.shutdown()` on the result to stop it.
+
+    Use port 0 to pick a free port; the bound address is on `.address`. The
+    manager unpickles what clients send, so it only accepts clients holding its
+    authkey: `authkey`, else the one in $SENTIMENT_SERVICE_AUTHKEY, else a fresh
+    random key. The key is exported to $SENTIMENT_SERVICE_AUTHKEY so worker
+    processes started afterwards can `connect()` without passing it.
+    """
+    if authkey is None:
+        authkey = bytes.fromhex(os.environ[AUTHKEY_ENV]) if os.environ.get(AUTHKEY_ENV) else os.urandom(32)
+    os.environ[AUTHKEY_ENV] = authkey.hex()
+    manager = SentimentServiceManager(address=address, authkey=authkey)
+    manager.start(_init_server, (service_kwargs,))
+    return manager
+
+
+def connect(address=DEFAULT_ADDRESS, authkey: Optional[bytes] = None):
+    """Proxy to a running server's service, with `predict(texts)` and `stats()`.
+
+    `authkey` defaults to the one in $SENTIMENT_SERVICE_AUTHKEY.
+    """
+    manager = SentimentServiceManager(address=address, authkey=_authkey(authkey))
+    manager.connect()
+    return manager.service()
@@ -0,0 +1,208 @@
+"""Content-addressed result cache for text pipelines.
+
+Review and message corpora are full of exact duplicates ("good app", emoji,
+forwarded promos). `resolve_texts` runs a text processor once per distinct
+normalized text and broadcasts the results back to every row. With a
+`TextCache`, results are also reused across calls and runs:
+
+- the key is a hash of the processor namespace, its version and the
+  normalized text (Unicode NFC, whitespace collapsed, ends stripped);
+- lookups go to an in-memory LRU first, then to a SQLite file shared by
+  every process and script that opens the same path.
+
+Bump the version passed by a processor whenever its output changes, so stale
+entries are simply never looked up again.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config.settings import settings
+
+DEFAULT_CACHE_PATH = settings.processed_data_dir / "text_cache" / "results.sqlite"
+# SQLite allows at most 999 bound parameters per statement in older builds
+_SQL_BATCH = 900
+_WHITESPACE = re.compile(r"\s+")
+
+PathLike = Union[str, os.PathLike]
+
+
+def normalize_text(text) -> str:
+    """Canonical form used for cache keys and as the processor input."""
+
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", str(text))).strip()
+
+
+def text_key(text: str, namespace: str, version: str = "") -> str:
+    """Hash of (namespace, version, normalized text)."""
+
+    payload = f"{namespace}\0{version}\0{text}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class TextCache:
+    """In-memory LRU in front of an optional SQLite table of pickled results.
+
+    Args:
+        path: SQLite file (created on first use); None keeps results in memory only
+        memory_items: size of the in-memory LRU
+    """
+
+    def __init__(self, path: Optional[PathLike] = None, memory_items: int = 100_000):
+        self.path = Path(path) if path is not None else None
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._conn = None
+        self._conn_pid = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def __getstate__(self):
+        # Connections and the memory front stay with the process that made them
+        return {"path": self.path, "memory_items": self.memory_items}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["memory_items"])
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Cached values for whichever of `keys` are present."""
+
+        found: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[key] = self._memory[key]
+            else:
+                missing.append(key)
+        self.counters["memory_hits"] += len(found)
+
+        conn = self._connection()
+        if conn is not None and missing:
+            for lo in range(0, len(missing), _SQL_BATCH):
+                batch = missing[lo:lo + _SQL_BATCH]
+                rows = conn.execute(f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(batch))})", batch)
+                for key, blob in rows:
+                    value = pickle.loads(blob)
+                    found[key] = value
+                    self._remember(key, value)
+                    self.counters["disk_hits"] += 1
+        self.counters["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Any]):
+        for key, value in items.items():
+            self._remember(key, value)
+        conn = self._connection()
+        if conn is not None and items:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                    [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for key, value in items.items()],
+                )
+
+    def clear(self):
+        self._memory.clear()
+        conn = self._connection()
+        if conn is not None:
+            with conn:
+                conn.execute("DELETE FROM results")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_default_cache: Optional[TextCache] = None
+
+
+def default_text_cache() -> TextCache:
+    """Process-wide cache backed by the shared SQLite file under data/processed."""
+
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TextCache(DEFAULT_CACHE_PATH)
+    return _default_cache
+
+
+def resolve_texts(
+    texts: Iterable,
+    compute: Callable[[List[str]], Sequence[Any]],
+    namespace: str,
+    version: str = "",
+    cache: Optional[TextCache] = None,
+) -> List[Any]:
+    """Results of `compute` for every text, computing each distinct normalized text once.
+
+    `compute` receives a list of distinct normalized texts and must return one
+    result per input, in order. With a `cache`, results found there are reused
+    and new ones are stored.
+    """
+
+    normalized = [normalize_text(text) for text in texts]
+    codes, uniques = pd.factorize(pd.Series(normalized, dtype=object), sort=False)
+    uniques = list(uniques)
+    keys = [text_key(text, namespace, version) for text in uniques]
+
+    found = cache.get_many(keys) if cache is not None else {}
+    todo = [i for i, key in enumerate(keys) if key not in found]
+    if todo:
+        computed = list(compute([uniques[i] for i in todo]))
+        if len(computed) != len(todo):
+            raise ValueError(f"compute returned {len(computed)} results for {len(todo)} texts")
+        fresh = {keys[i]: value for i, value in zip(todo, computed)}
+        if cache is not None:
+            cache.put_many(fresh)
+        found.update(fresh)
+
+    results = [found[key] for key in keys]
+    return [results[code] for code in codes]
+
+
+def resolve_vectors(
+    texts: Iterable,
+    compute: Callable[[List[str]], Sequence[Any]],
+    namespace: str,
+    dim: int,
+    version: str = "",
+    cache: Optional[TextCache] = None,
+) -> np.ndarray:
+    """`resolve_texts` for vector results, stacked into an (n_texts, dim) array.
+
+    Empty input gives an empty (0, dim) array without calling `compute`.
+    """
+
+    vectors = resolve_texts(texts, compute, namespace, version=version, cache=cache)
+    if not vectors:
+        return np.empty((0, dim))
+    return np.vstack(vectors)
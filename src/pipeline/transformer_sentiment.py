@@ -0,0 +1,199 @@
+"""Batched transformer sentiment inference on CPU.
+
+The 'transformer' method of `compute_sentiment` used to call the Hugging Face
+pipeline once per text, truncating by characters. `TransformerSentiment`
+instead:
+
+- tokenizes every text once, truncating to `max_length` tokens;
+- sorts texts by token length and cuts them into dynamic batches whose padded
+  size (longest text x batch size) stays under `max_batch_tokens`, so short
+  reviews are not padded to the length of long ones;
+- streams results back in input order, one window of texts at a time, so
+  memory stays bounded on arbitrarily long inputs;
+- runs on PyTorch with tuned intra-op threads, optionally int8 dynamic
+  quantized, or on ONNX Runtime through an exported (optionally int8
+  quantized) copy of the model.
+
+`torch`/`transformers` (and `optimum[onnxruntime]` for the ONNX backend) are
+optional; `transformer_available()` says whether the default backend can run.
+"""
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+except ImportError:
+    torch = None
+    AutoModelForSequenceClassification = AutoTokenizer = None
+
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:
+    ORTModelForSequenceClassification = ORTQuantizer = AutoQuantizationConfig = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_MODEL = 'distilbert-base-uncased-finetuned-sst-2-english'
+DEFAULT_ONNX_DIR = Path.home() / '.cache' / 'fin_sentiment_onnx'
+BACKENDS = ('torch', 'onnx')
+
+
+def transformer_available(backend: str = 'torch') -> bool:
+    if backend == 'onnx':
+        return torch is not None and ORTModelForSequenceClassification is not None
+    return torch is not None
+
+
+def physical_cores() -> int:
+    """Physical core count; hyper-threads rarely help dense matmuls."""
+    cores = psutil.cpu_count(logical=False) if psutil is not None else None
+    return cores or os.cpu_count() or 1
+
+
+def plan_batches(lengths: Sequence[int], max_batch_tokens: int = 8192, max_batch_size: int = 64) -> List[np.ndarray]:
+    """Group indices into length-sorted batches under a padded-token budget.
+
+    A batch costs (longest length x batch size) tokens once padded; a new batch
+    starts when adding the next text would exceed `max_batch_tokens` or
+    `max_batch_size`. A single text longer than the budget gets a batch of its own.
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    order = np.argsort(lengths, kind='stable')
+    batches, current, longest = [], [], 0
+    for idx in order:
+        longest_with = max(longest, int(lengths[idx]))
+        if current and (len(current) + 1 > max_batch_size or longest_with * (len(current) + 1) > max_batch_tokens):
+            batches.append(np.array(current))
+            current, longest_with = [], int(lengths[idx])
+        current.append(idx)
+        longest = longest_with
+    if current:
+        batches.append(np.array(current))
+    return batches
+
+
+class TransformerSentiment:
+    """Length-bucketed batched sentiment classifier.
+
+    Args:
+        model_name: Hugging Face sequence-classification checkpoint
+        backend: 'torch' or 'onnx' (exported once to `onnx_dir`)
+        quantize: int8 dynamic quantization (torch.quantization or ONNX Runtime)
+        max_length: truncation length in tokens
+        max_batch_tokens: padded-token budget per batch
+        max_batch_size: upper bound on texts per batch
+        num_threads: intra-op threads (default: physical cores)
+        window: texts sorted and batched together before results are emitted
+        onnx_dir: where exported/quantized ONNX models are kept
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        backend: str = 'torch',
+        quantize: bool = False,
+        max_length: int = 512,
+        max_batch_tokens: int = 8192,
+        max_batch_size: int = 64,
+        num_threads: Optional[int] = None,
+        window: int = 2048,
+        onnx_dir: Optional[os.PathLike] = None,
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}")
+        if not transformer_available(backend):
+            raise ImportError(f"the '{backend}' backend needs torch and transformers" + (" and optimum[onnxruntime]" if backend == 'onnx' else ''))
+        self.model_name = model_name
+        self.backend = backend
+        self.quantize = quantize
+        self.max_length = max_length
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.num_threads = num_threads or physical_cores()
+
+        torch.set_num_threads(self.num_threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        if backend == 'onnx':
+            self.model = self._load_onnx(Path(onnx_dir) if onnx_dir else DEFAULT_ONNX_DIR)
+        else:
+            model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+            if quantize:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = model
+        self.id2label = {int(i): str(label).lower() for i, label in self.model.config.id2label.items()}
+
+    def _load_onnx(self, root: Path):
+        """Export the checkpoint to ONNX once (and quantize it to int8 if asked), then load it."""
+        import onnxruntime
+
+        export_dir = root / self.model_name.replace('/', '--')
+        if not (export_dir / 'model.onnx').exists():
+            ORTModelForSequenceClassification.from_pretrained(self.model_name, export=True).save_pretrained(export_dir)
+        file_name = 'model.onnx'
+        if self.quantize:
+            file_name = 'model_quantized.onnx'
+            if not (export_dir / file_name).exists():
+                config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+                ORTQuantizer.from_pretrained(export_dir).quantize(save_dir=export_dir, quantization_config=config)
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        return ORTModelForSequenceClassification.from_pretrained(export_dir, file_name=file_name, session_options=options)
+
+    def _forward(self, input_ids: List[List[int]]) -> np.ndarray:
+        """Class probabilities for one batch of token-id lists."""
+        features = [{'input_ids': ids} for ids in input_ids]
+        batch = self.tokenizer.pad(features, padding='longest', return_tensors='pt')
+        with torch.inference_mode():
+            logits = self.model(**batch).logits
+        logits = logits.detach().cpu().numpy() if hasattr(logits, 'detach') else np.asarray(logits)
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def _result(self, probs: np.ndarray) -> Dict[str, any]:
+        best = int(probs.argmax())
+        label_raw, score_raw = self.id2label.get(best, ''), float(probs[best])
+        label = 'positive' if 'pos' in label_raw else ('negative' if 'neg' in label_raw else 'neutral')
+        score = score_raw if label == 'positive' else -score_raw if label == 'negative' else 0.0
+        return {'score': score, 'label': label, 'method': 'transformer', 'raw': {'label': label_raw.upper(), 'score': score_raw}}
+
+    def _predict_window(self, texts: List[str]) -> List[Dict[str, any]]:
+        encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)['input_ids']
+        results: List[Optional[Dict]] = [None] * len(texts)
+        for batch in plan_batches([len(ids) for ids in encoded], self.max_batch_tokens, self.max_batch_size):
+            probs = self._forward([encoded[i] for i in batch])
+            for i, row in zip(batch, probs):
+                results[i] = self._result(row)
+        return results
+
+    def stream(self, texts: Iterable[str]) -> Iterator[Dict[str, any]]:
+        """Results in input order, computed one `window` of texts at a time."""
+        window: List[str] = []
+        for text in texts:
+            window.append('' if text is None else str(text))
+            if len(window) >= self.window:
+                yield from self._predict_window(window)
+                window = []
+        if window:
+            yield from self._predict_window(window)
+
+    def predict(self, texts: Iterable[str]) -> List[Dict[str, any]]:
+        return list(self.stream(texts))
+
+
+@lru_cache(maxsize=4)
+def get_transformer_sentiment(model_name: str = DEFAULT_MODEL, backend: str = 'torch', quantize: bool = False) -> TransformerSentiment:
+    """Shared classifier per (model, backend, quantize) so the model is loaded once per process."""
+    return TransformerSentiment(model_name, backend=backend, quantize=quantize)
@@ -8,12 +8,51 @@ This class cleans and preprocesses the scraped reviews data.
 
 import sys
 import os
-import re
-from dataclasses import dataclass
+import warnings
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 import pandas as pd
 import numpy as np
 
 from src.config.settings import DATA_PATHS
+from src.utils.metrics import save_metrics, save_trace
+from src.preprocessing.rules import Range, RuleSet, SeenKeys
+from src.preprocessing.streaming import (
+    ChunkWriter,
+    DEFAULT_BLOCK_ROWS,
+    imap_bounded,
+    is_parquet,
+    iter_input_chunks,
+    merge_sorted_runs,
+    sort_frame,
+    write_run,
+)
+
+
+# Row-wise steps that can run independently on chunks of the dataset
+ROW_STEPS = ('check_missing_data', 'handle_missing_values', 'normalize_dates', 'clean_text', 'validate_rows')
+DEFAULT_CHUNK_SIZE = 100_000
+# Per-step metrics that merge by max across chunks instead of by sum
+MAX_STATS = {'peak_rss_delta_mb'}
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage; memory metrics are then omitted
+    resource = None
+# Status recorded in the incremental manifest for rows each step drops
+DROP_STATUS = {
+    'handle_missing_values': 'missing',
+    'clean_text': 'empty_text',
+    'validate_rows': 'rejected',
+}
+STATUS_STATS = {
+    'missing': 'rows_removed_missing',
+    'empty_text': 'empty_reviews_removed',
+    'rejected': 'rows_rejected',
+}
 
 
 @dataclass
@@ -34,6 +73,47 @@ class PreprocessSchema:
     month_col: str = 'review_month'
     text_length_col: str = 'text_length'
     sort_cols: tuple = (('bank_code', True), ('review_date', False))
+    # Output dtype per column name; None uses default_dtypes() for the columns above
+    dtypes: dict = None
+    # Row-validation rules (see src.preprocessing.rules); None uses default_rules()
+    rules: tuple = None
+    # Fill value per optional column for missing entries; None uses default_fill_values()
+    fill_values: dict = None
+
+    def __post_init__(self):
+        if self.dtypes is None:
+            self.dtypes = self.default_dtypes()
+        if self.rules is None:
+            self.rules = self.default_rules()
+        if self.fill_values is None:
+            self.fill_values = self.default_fill_values()
+
+    def default_rules(self):
+        """Ratings on the 1-5 star scale"""
+        return (Range(self.rating_col, 1, 5, name='rating_range'),) if self.rating_col else ()
+
+    def default_fill_values(self):
+        declared = {self.user_col: 'Anonymous', self.thumbs_up_col: 0, self.reply_col: ''}
+        return {col: value for col, value in declared.items() if col}
+
+    def default_dtypes(self):
+        """Compact output types: categoricals for low-cardinality labels, Arrow strings for text,
+        Arrow dates and small nullable integers"""
+        declared = {
+            self.id_col: 'string[pyarrow]',
+            self.text_col: 'string[pyarrow]',
+            self.rating_col: 'Int8',
+            self.date_col: 'date32[pyarrow]',
+            self.year_col: 'Int16',
+            self.month_col: 'Int8',
+            self.bank_code_col: 'category',
+            self.bank_name_col: 'category',
+            self.user_col: 'string[pyarrow]',
+            self.thumbs_up_col: 'Int32',
+            self.text_length_col: 'Int32',
+            self.source_col: 'category',
+        }
+        return {col: dtype for col, dtype in declared.items() if col}
 
     def output_columns(self):
         return [
@@ -61,8 +141,8 @@ class DatasetPreprocessor:
 
     def __init__(self, input_path=None, output_path=None, schema=None, critical_cols=None, verbose=True):
         """Initialize preprocessor with optional paths, schema, and verbosity."""
-        self.input_path = input_path or DATA_PATHS['raw_reviews']
-        self.output_path = output_path or DATA_PATHS['processed_reviews']
+        self.input_path = input_path or DATA_PATHS.get('raw_reviews')
+        self.output_path = output_path or DATA_PATHS.get('processed_reviews')
         self.schema = self._init_schema(schema)
         self.schema.sort_cols = self._normalize_sort_cols(self.schema.sort_cols)
         self.critical_cols = critical_cols or [
@@ -71,6 +151,9 @@ class DatasetPreprocessor:
         self.verbose = verbose
         self.df = None
         self.stats = {}
+        self.output_summary = None
+        self.delta_stats = {}
+        self.spans = []
 
     def _log(self, message):
         """Print helper that can be silenced for reuse/testing"""
@@ -102,6 +185,38 @@ class DatasetPreprocessor:
     def reset_stats(self):
         """Clear cached stats before a fresh run"""
         self.stats = {}
+        self.output_summary = None
+        self.spans = []
+
+    @contextmanager
+    def measure(self, name, rows_in=None):
+        """Record wall time, peak-RSS growth, rows in/out and throughput of the enclosed block.
+
+        Results go to self.stats['steps'][name] and a trace span to self.spans.
+        Rows default to len(self.df) before/after; callers without a frame can
+        pass rows_in and set 'rows_out' on the yielded dict.
+        """
+        step = {'rows_in': rows_in if rows_in is not None else (len(self.df) if self.df is not None else 0)}
+        peak_before = _peak_rss_mb()
+        start = time.perf_counter_ns()
+        yield step
+        elapsed = time.perf_counter_ns() - start
+        if 'rows_out' not in step:
+            step['rows_out'] = len(self.df) if self.df is not None else step['rows_in']
+        step['seconds'] = elapsed / 1e9
+        if peak_before is not None:
+            step['peak_rss_delta_mb'] = _peak_rss_mb() - peak_before
+        self.stats.setdefault('steps', {})[name] = add_throughput(step)
+        self.spans.append({
+            'name': name, 'start_us': start // 1000, 'dur_us': elapsed // 1000, 'pid': os.getpid(),
+            'args': {'rows_in': step['rows_in'], 'rows_out': step['rows_out']},
+        })
+
+    def export_metrics(self, path, trace_path=None):
+        """Write self.stats (with per-step metrics) as JSON and, optionally, the spans as a Chrome trace"""
+        save_metrics(self.stats, path)
+        if trace_path:
+            save_trace(self.spans, trace_path)
 
     def load_data(self):
         """Load raw reviews data"""
@@ -180,13 +295,10 @@ class DatasetPreprocessor:
         if removed > 0:
             self._log(f"Removed {removed} rows with missing critical values")
 
-        # For the optional user-related columns, fill with sensible defaults when present
-        if self.schema.user_col in self.df.columns:
-            self.df[self.schema.user_col] = self.df[self.schema.user_col].fillna('Anonymous')
-        if self.schema.thumbs_up_col in self.df.columns:
-            self.df[self.schema.thumbs_up_col] = self.df[self.schema.thumbs_up_col].fillna(0)
-        if self.schema.reply_col in self.df.columns:
-            self.df[self.schema.reply_col] = self.df[self.schema.reply_col].fillna('')
+        # For the optional columns, fill with the schema's defaults when present
+        fills = {col: value for col, value in self.schema.fill_values.items() if col in self.df.columns}
+        if fills:
+            self.df = self.df.fillna(fills)
 
         # Record the number of rows removed due to missing critical data
         self.stats['rows_removed_missing'] = removed
@@ -203,17 +315,15 @@ class DatasetPreprocessor:
             return
 
         try:
-            # Convert the 'review_date' column to pandas datetime objects
-            # This handles various string formats automatically
-            self.df[self.schema.date_col] = pd.to_datetime(self.df[self.schema.date_col])
+            # Parse the date column once; this handles various string formats automatically
+            parsed = pd.to_datetime(self.df[self.schema.date_col])
 
-            # Convert the datetime objects to just date objects (YYYY-MM-DD), removing time info
-            self.df[self.schema.date_col] = self.df[self.schema.date_col].dt.date
+            # Extract the year and month from the parsed dates
+            self.df[self.schema.year_col] = parsed.dt.year
+            self.df[self.schema.month_col] = parsed.dt.month
 
-            # Extract the year from the date and create a new 'review_year' column
-            self.df[self.schema.year_col] = pd.to_datetime(self.df[self.schema.date_col]).dt.year
-            # Extract the month from the date and create a new 'review_month' column
-            self.df[self.schema.month_col] = pd.to_datetime(self.df[self.schema.date_col]).dt.month
+            # Keep just the date part (YYYY-MM-DD), removing time info
+            self.df[self.schema.date_col] = parsed.dt.date
 
             # Print the range of dates found in the data (minimum and maximum)
             self._log(f"Date range: {self.df[self.schema.date_col].min()} to {self.df[self.schema.date_col].max()}")
@@ -231,26 +341,11 @@ class DatasetPreprocessor:
             self._log("WARNING: Text column not found; skipping text cleaning")
             return
 
-        def clean_review_text(text):
-            """Inner function to clean individual review text strings"""
-            # If the text is NaN (missing) or empty string, return empty string
-            if pd.isna(text) or text == '':
-                return ''
-
-            # Convert the input to a string type (safety check)
-            text = str(text)
-
-            # Use regex to replace multiple whitespace characters (spaces, tabs, newlines) with a single space
-            text = re.sub(r'\s+', ' ', text)
-
-            # Remove leading and trailing whitespace from the string
-            text = text.strip()
-
-            # Return the cleaned text
-            return text
-
-        # Apply the 'clean_review_text' function to every element in the 'review_text' column
-        self.df[self.schema.text_col] = self.df[self.schema.text_col].apply(clean_review_text)
+        # Missing text becomes '', everything else a string with whitespace runs collapsed and ends stripped
+        # (vectorized .str operations instead of a Python re.sub per row)
+        text = self.df[self.schema.text_col]
+        text = text.where(text.notna(), '').astype(str)
+        self.df[self.schema.text_col] = text.str.replace(r'\s+', ' ', regex=True).str.strip()
 
         # Store the count before removing empty reviews
         before_count = len(self.df)
@@ -270,41 +365,44 @@ class DatasetPreprocessor:
         self.stats['empty_reviews_removed'] = removed
         self.stats['count_after_cleaning'] = len(self.df)
 
-    def validate_ratings(self):
-        """Validate rating values (should be 1-5)"""
+    def validate_rows(self):
+        """Apply the schema's validation rules (ranges, allowed values, patterns, cross-column, dedup)"""
         # Print a header for this step [5/6]
-        self._log("\n[5/6] Validating ratings...")
-
-        if self.schema.rating_col not in self.df.columns:
-            self._log("WARNING: Rating column not found; skipping rating validation")
-            return
+        self._log("\n[5/6] Validating rows...")
 
-        # Find rows where 'rating' is less than 1 OR greater than 5
-        invalid = self.df[(self.df[self.schema.rating_col] < 1) | (self.df[self.schema.rating_col] > 5)]
+        # One combined mask for every rule, plus how many rows each rule rejects
+        keep, counts = RuleSet(self.schema.rules).evaluate(self.df)
+        rejected = int((~keep).sum())
+        for name, count in counts.items():
+            if count > 0:
+                self._log(f"WARNING: Rule '{name}' rejected {count} rows")
 
-        # If there are any invalid ratings
-        if len(invalid) > 0:
-            # Print a warning with the count of invalid ratings
-            self._log(f"WARNING: Found {len(invalid)} reviews with invalid ratings")
-            # Filter the DataFrame to keep only rows where rating is between 1 and 5 (inclusive)
-            self.df = self.df[(self.df[self.schema.rating_col] >= 1) & (self.df[self.schema.rating_col] <= 5)]
+        if rejected > 0:
+            self.df = self.df[keep]
         else:
-            # If all ratings are valid, print a confirmation
-            self._log("All ratings are valid (1-5)")
+            self._log("All rows pass validation")
+
+        # Record total and per-rule rejections
+        self.stats['rows_rejected'] = rejected
+        self.stats['rule_rejections'] = counts
+        # Pre-rules stat name, still read by older reports and notebooks
+        self.stats['invalid_ratings_removed'] = sum(
+            counts.get(rule.name, 0) for rule in self.schema.rules
+            if isinstance(rule, Range) and rule.column == self.schema.rating_col
+        )
 
-        # Record the number of invalid ratings removed
-        self.stats['invalid_ratings_removed'] = len(invalid)
+    def validate_ratings(self):
+        """Deprecated: use validate_rows, which applies the rating range along with the other rules"""
+        warnings.warn("validate_ratings() is deprecated; use validate_rows()", DeprecationWarning, stacklevel=2)
+        self.validate_rows()
 
     def prepare_final_output(self):
         """Prepare final output format"""
         # Print a header for this step [6/6]
         self._log("\n[6/6] Preparing final output...")
 
-        output_columns = [col for col in self.schema.output_columns() if col in self.df.columns]
-        if output_columns:
-            self.df = self.df[output_columns]
-
-        sort_cols = [(col, asc) for col, asc in self.schema.sort_cols if col in self.df.columns]
+        self.df = apply_dtypes(self._select_output(self.df), self.schema.dtypes)
+        sort_cols = self._sort_spec(self.df)
         if sort_cols:
             cols, ascending = zip(*sort_cols)
             self.df = self.df.sort_values(list(cols), ascending=list(ascending))
@@ -317,23 +415,75 @@ class DatasetPreprocessor:
         self._log(f"Final dataset: {len(self.df)} reviews")
         self.stats['final_count'] = len(self.df)
 
-    def process_dataframe(self, df, *, output_path=None, save=False, report=False):
-        """Run preprocessing on a provided DataFrame and optionally persist results."""
+    def _select_output(self, frame):
+        """Keep the schema's output columns that are present"""
+        output_columns = [col for col in self.schema.output_columns() if col in frame.columns]
+        return frame[output_columns] if output_columns else frame
+
+    def _sort_spec(self, frame):
+        return [(col, asc) for col, asc in self.schema.sort_cols if col in frame.columns]
+
+    def run_row_steps(self):
+        """Run the row-wise steps [1/6]-[5/6] on self.df"""
+        for step in ROW_STEPS:
+            with self.measure(step):
+                getattr(self, step)()
+
+    def _chunk_schema(self):
+        """Schema for per-chunk workers: the dedup rules run afterwards, over all chunks in input order"""
+        return replace(self.schema, rules=tuple(RuleSet(self.schema.rules).row_rules))
+
+    def _process_parallel(self, df, n_jobs, chunk_size):
+        """Fan the row-wise steps out over worker processes, one chunk of rows per task"""
+        bounds = range(0, len(df), chunk_size)
+        schema = self._chunk_schema()
+        tasks = [(schema, self.critical_cols, df.iloc[start:start + chunk_size]) for start in bounds]
+        self._log(f"\n[1-5/6] Processing {len(df)} rows in {len(tasks)} chunks on {n_jobs} workers...")
+
+        seen = SeenKeys(self.schema.rules)
+        with self.measure('parallel_row_steps') as step:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+                results = list(pool.map(_preprocess_chunk, tasks))
+            frames = [frame for frame, _, _ in results]
+            dropped = [{} for _ in results]
+            if seen.rules:
+                for i, frame in enumerate(frames):
+                    frames[i], dropped[i] = seen.filter(frame)
+            self.df = pd.concat(frames, ignore_index=True)
+            step['rows_in'] = len(df)
+
+        # Worker step times add up to CPU seconds; parallel_row_steps holds the wall time
+        wall = self.stats['steps']['parallel_row_steps']
+        self.stats = merge_stats([_with_cross_chunk_dedup(stats, counts) for (_, stats, _), counts in zip(results, dropped)])
+        self.stats['steps']['parallel_row_steps'] = wall
+        self.spans = [span for _, _, spans in results for span in spans] + self.spans
+        for key in ('rows_removed_missing', 'empty_reviews_removed', 'rows_rejected'):
+            self._log(f"  {key}: {self.stats.get(key, 0)}")
+
+    def process_dataframe(self, df, *, output_path=None, save=False, report=False, n_jobs=1, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Run preprocessing on a provided DataFrame and optionally persist results.
+
+        With n_jobs > 1 (None for all CPUs) and more than chunk_size rows, the
+        row-wise steps run on chunks in worker processes and their stats are
+        merged; the final sort still runs once over the combined frame.
+        """
         self.reset_stats()
-        self.df = df.copy()
-        self.stats['original_count'] = len(self.df)
-
-        self.check_missing_data()
-        self.handle_missing_values()
-        self.normalize_dates()
-        self.clean_text()
-        self.validate_ratings()
-        self.prepare_final_output()
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if n_jobs > 1 and len(df) > chunk_size:
+            self._process_parallel(df, n_jobs, chunk_size)
+        else:
+            self.df = df.copy()
+            self.stats['original_count'] = len(self.df)
+            self.run_row_steps()
+        with self.measure('prepare_final_output'):
+            self.prepare_final_output()
 
         if save:
             if output_path:
                 self.output_path = output_path
-            if not self.save_data():
+            with self.measure('save_data'):
+                saved = self.save_data()
+            if not saved:
                 return None
 
         if report:
@@ -341,6 +491,205 @@ class DatasetPreprocessor:
 
         return self.df
 
+    def _iter_processed_chunks(self, input_path, chunk_rows, n_jobs):
+        """(chunk, stats, spans) for each raw chunk after the row-wise steps, in input order"""
+        schema = self._chunk_schema()
+        tasks = ((schema, self.critical_cols, chunk) for chunk in iter_input_chunks(input_path, chunk_rows))
+        if n_jobs == 1:
+            yield from map(_preprocess_chunk, tasks)
+            return
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            # Bounded so only a few chunks are in memory, however large the input
+            yield from imap_bounded(pool, _preprocess_chunk, tasks, max_pending=2 * n_jobs)
+
+    def process_stream(self, input_path=None, output_path=None, chunk_rows=DEFAULT_CHUNK_SIZE, n_jobs=1,
+                       block_rows=DEFAULT_BLOCK_ROWS, tmp_dir=None, report=True):
+        """Out-of-core run for inputs larger than memory.
+
+        Reads the raw CSV/Parquet in chunks and runs the row-wise steps per chunk
+        (n_jobs > 1 spreads chunks over worker processes). Each chunk is sorted
+        and spilled to a run file under tmp_dir, and the runs are merged straight
+        into output_path (.parquet for Parquet, CSV otherwise). Only the running
+        stats and report summary are kept in memory; self.df stays None.
+        """
+        input_path = input_path or self.input_path
+        output_path = output_path or self.output_path
+        n_jobs = n_jobs or os.cpu_count() or 1
+        self.reset_stats()
+        self.df = None
+
+        self._log("=" * 60)
+        self._log("STARTING STREAMING PREPROCESSING")
+        self._log("=" * 60)
+
+        sort_cols = None
+        spill_steps = []
+        try:
+            with tempfile.TemporaryDirectory(dir=tmp_dir) as spill_dir:
+                runs = []
+                seen = SeenKeys(self.schema.rules)
+                for i, (chunk, stats, spans) in enumerate(self._iter_processed_chunks(input_path, chunk_rows, n_jobs)):
+                    if seen.rules:
+                        chunk, counts = seen.filter(chunk)
+                        stats = _with_cross_chunk_dedup(stats, counts)
+                    self.stats = merge_stats([self.stats, stats])
+                    self.spans.extend(spans)
+                    with self.measure('spill_run', rows_in=len(chunk)):
+                        chunk = apply_dtypes(self._select_output(chunk), self.schema.dtypes)
+                        self.output_summary = merge_summaries(self.output_summary, summarize_output(chunk, self.schema))
+                        if sort_cols is None:
+                            sort_cols = self._sort_spec(chunk)
+                        if len(chunk):
+                            runs.append(write_run(sort_frame(chunk, sort_cols), os.path.join(spill_dir, f'run-{i:06d}.parquet')))
+                    spill_steps.append(self.stats['steps'].pop('spill_run'))
+                    self._log(f"Chunk {i + 1}: {self.stats.get('original_count', 0)} rows read, {len(runs)} runs spilled")
+
+                self._log(f"\n[6/6] Merging {len(runs)} sorted runs into {output_path}...")
+                if spill_steps:
+                    self.stats['steps']['spill_run'] = merge_stats(spill_steps)
+                with self.measure('merge_runs', rows_in=self.stats.get('steps', {}).get('spill_run', {}).get('rows_out', 0)) as step:
+                    with ChunkWriter(output_path) as writer:
+                        for block in merge_sorted_runs(runs, sort_cols or [], block_rows):
+                            # Categoricals from different runs come back as object after the merge
+                            writer.write(apply_dtypes(block, self.schema.dtypes))
+                    step['rows_out'] = writer.rows
+        except FileNotFoundError:
+            self._log(f"ERROR: File not found: {input_path}")
+            return False
+
+        self.output_path = output_path
+        self.stats['final_count'] = writer.rows
+        self._log(f"Final dataset: {writer.rows} reviews")
+        if report:
+            self.generate_report()
+        return True
+
+    def _read_output(self, path):
+        """Load a previously processed dataset with the schema's dtypes"""
+        frame = pd.read_parquet(path) if is_parquet(path) else pd.read_csv(path)
+        return apply_dtypes(frame, self.schema.dtypes)
+
+    def _run_tracked(self, frame):
+        """Run the row-wise steps on frame and return each input id's outcome ('kept' or the dropping step's status)"""
+        id_col = self.schema.id_col
+        status = pd.Series('kept', index=frame[id_col].to_numpy(), dtype=object)
+        self.df = frame.copy()
+        for step in ROW_STEPS:
+            before = self.df[id_col].to_numpy()
+            with self.measure(step):
+                getattr(self, step)()
+            if step in DROP_STATUS:
+                dropped = np.setdiff1d(before, self.df[id_col].to_numpy())
+                status[dropped] = DROP_STATUS[step]
+        return status
+
+    def process_incremental(self, input_path=None, output_path=None, manifest_path=None, report=True):
+        """Only clean raw rows that are new or changed since the last run and merge them into the output.
+
+        The manifest (Parquet, default: <output_path>.manifest.parquet) holds one row
+        per review_id with the hash of its raw row, the hash of its cleaned output
+        row and its status. Raw hashes decide what to reprocess; the output hash
+        tells rows whose cleaned content actually changed from ones that only
+        changed in the raw dump. Reviews are keyed by id_col, the last duplicate
+        wins, and ids absent from a later raw file are kept. Dedup rules check
+        reprocessed rows against the rows already kept, so a new row repeating
+        an existing key is rejected as in a full run.
+
+        self.delta_stats holds the usual stats for the reprocessed rows and
+        self.stats the totals for the whole dataset, derived from the manifest.
+        """
+        input_path = input_path or self.input_path
+        output_path = output_path or self.output_path
+        manifest_path = manifest_path or f"{output_path}.manifest.parquet"
+        id_col = self.schema.id_col
+
+        self._log("=" * 60)
+        self._log("STARTING INCREMENTAL PREPROCESSING")
+        self._log("=" * 60)
+        self.input_path = input_path
+        if not self.load_data():
+            return False
+        raw = self.df.drop_duplicates(subset=[id_col], keep='last').reset_index(drop=True)
+        raw_hash = pd.util.hash_pandas_object(raw[sorted(raw.columns)], index=False).to_numpy()
+
+        if os.path.exists(manifest_path) and os.path.exists(output_path):
+            manifest = pd.read_parquet(manifest_path).set_index(id_col)
+            existing = self._read_output(output_path)
+        else:
+            manifest = pd.DataFrame(columns=['raw_hash', 'content_hash', 'status'], index=pd.Index([], name=id_col))
+            existing = None
+        # Nullable so that ids missing from either side do not turn the hashes into floats
+        manifest = manifest.astype({'raw_hash': 'UInt64', 'content_hash': 'UInt64', 'status': object})
+
+        previous_hash = manifest['raw_hash'].reindex(raw[id_col].to_numpy())
+        is_new = previous_hash.isna().to_numpy()
+        is_changed = ~is_new & (previous_hash.fillna(0).to_numpy(dtype=np.uint64) != raw_hash)
+        delta = raw[is_new | is_changed]
+        self._log(f"New rows: {is_new.sum()}, changed rows: {is_changed.sum()}, unchanged: {len(raw) - len(delta)}")
+
+        # Clean only the delta; dedup rules run afterwards so they also see the rows already in the output
+        self.reset_stats()
+        self.stats['original_count'] = len(delta)
+        schema, self.schema = self.schema, self._chunk_schema()
+        try:
+            status = self._run_tracked(delta)
+        finally:
+            self.schema = schema
+        seen = SeenKeys(self.schema.rules)
+        if seen.rules:
+            if existing is not None:
+                seen.update(existing[~existing[id_col].isin(delta[id_col])])
+            unique, counts = seen.filter(apply_dtypes(self._select_output(self.df), self.schema.dtypes))
+            duplicate = ~self.df[id_col].isin(unique[id_col])
+            status[self.df.loc[duplicate, id_col].to_numpy()] = DROP_STATUS['validate_rows']
+            self.df = self.df[~duplicate]
+            self.stats = _with_cross_chunk_dedup(self.stats, counts)
+        self.prepare_final_output()
+        cleaned = self.df
+        content_hash = pd.util.hash_pandas_object(cleaned, index=False).astype('UInt64')
+        content_hash.index = cleaned[id_col].to_numpy()
+
+        delta_manifest = pd.DataFrame({
+            'raw_hash': pd.array(raw_hash[is_new | is_changed], dtype='UInt64'),
+            'content_hash': content_hash.reindex(status.index).array,
+            'status': status.to_numpy(),
+        }, index=pd.Index(status.index, name=id_col))
+        previous_content = manifest['content_hash'].reindex(delta_manifest.index)
+        same_content = (delta_manifest['content_hash'] == previous_content).fillna(False)
+        same_content |= delta_manifest['content_hash'].isna() & previous_content.isna()
+        rewritten = ~same_content & delta_manifest.index.isin(manifest.index)
+
+        self.delta_stats = dict(self.stats)
+        self.delta_stats.update({
+            'new_rows': int(is_new.sum()),
+            'changed_rows': int(is_changed.sum()),
+            'content_changed_rows': int(rewritten.sum()),
+        })
+
+        # Merge: replace reprocessed ids in the existing output, then re-sort the whole dataset
+        if existing is not None:
+            existing = existing[~existing[id_col].isin(delta_manifest.index)]
+            cleaned = pd.concat([frame for frame in (existing, cleaned) if len(frame)], ignore_index=True) if len(existing) else cleaned
+        kept = manifest[~manifest.index.isin(delta_manifest.index)]
+        manifest = pd.concat([kept, delta_manifest]) if len(kept) else delta_manifest
+        self.df = cleaned
+        self.prepare_final_output()
+        self.output_path = output_path
+        if not self.save_data():
+            return False
+        manifest.reset_index().to_parquet(manifest_path, index=False)
+
+        # Totals for the whole dataset come from the manifest statuses
+        counts = manifest['status'].value_counts()
+        self.stats = {'original_count': len(manifest), 'final_count': len(self.df)}
+        for status_name, key in STATUS_STATS.items():
+            self.stats[key] = int(counts.get(status_name, 0))
+        self.stats.update({key: self.delta_stats[key] for key in ('new_rows', 'changed_rows', 'content_changed_rows')})
+
+        if report:
+            self.generate_report()
+        return True
+
     def save_data(self):
         """Save processed data"""
         # Print a message indicating saving has started
@@ -351,9 +700,12 @@ class DatasetPreprocessor:
             # os.path.dirname gets the folder part of the file path
             os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
 
-            # Write the DataFrame to a CSV file at self.output_path
+            # Write the DataFrame to Parquet (keeps the typed schema) or CSV at self.output_path
             # index=False prevents writing the row numbers (0, 1, 2...) to the file
-            self.df.to_csv(self.output_path, index=False)
+            if is_parquet(self.output_path):
+                self.df.to_parquet(self.output_path, index=False)
+            else:
+                self.df.to_csv(self.output_path, index=False)
             # Print a confirmation message with the path
             self._log(f"Data saved to: {self.output_path}")
 
@@ -381,7 +733,9 @@ class DatasetPreprocessor:
         self._log(f"\nOriginal records: {self.stats.get('original_count', 0)}")
         self._log(f"Records with missing critical data: {self.stats.get('rows_removed_missing', 0)}")
         self._log(f"Empty reviews removed: {self.stats.get('empty_reviews_removed', 0)}")
-        self._log(f"Invalid ratings removed: {self.stats.get('invalid_ratings_removed', 0)}")
+        self._log(f"Rows rejected by validation rules: {self.stats.get('rows_rejected', 0)}")
+        for name, count in self.stats.get('rule_rejections', {}).items():
+            self._log(f"  {name}: {count}")
         self._log(f"Final records: {self.stats.get('final_count', 0)}")
 
         # Calculate data quality percentage metrics
@@ -402,34 +756,46 @@ class DatasetPreprocessor:
             else:
                 self._log("⚠ Data quality: NEEDS ATTENTION (>10% errors)")
 
-        # Print statistics about the reviews per bank
-        if self.df is not None:
-            if self.schema.bank_name_col in self.df.columns:
+        # Print statistics about the reviews per bank, from the in-memory frame or,
+        # after a streaming run, from the running summary
+        summary = summarize_output(self.df, self.schema) if self.df is not None else self.output_summary
+        if summary:
+            if summary.get('category_counts'):
                 self._log("\nRecords per category:")
-                bank_counts = self.df[self.schema.bank_name_col].value_counts()
+                bank_counts = pd.Series(summary['category_counts']).sort_values(ascending=False, kind='stable')
                 for bank, count in bank_counts.items():
                     self._log(f"  {bank}: {count}")
 
-            if self.schema.rating_col in self.df.columns:
+            if summary.get('rating_counts'):
                 self._log("\nRating distribution:")
-                rating_counts = self.df[self.schema.rating_col].value_counts().sort_index(ascending=False)
+                rating_counts = pd.Series(summary['rating_counts']).sort_index(ascending=False)
+                total = rating_counts.sum()
                 for rating, count in rating_counts.items():
-                    pct = (count / len(self.df)) * 100
+                    pct = (count / total) * 100
                     self._log(f"  {'⭐' * int(rating)}: {count} ({pct:.1f}%)")
 
-            if self.schema.date_col in self.df.columns:
-                self._log(
-                    f"\nDate range: {self.df[self.schema.date_col].min()} to {self.df[self.schema.date_col].max()}"
-                )
+            if summary.get('date_min') is not None:
+                self._log(f"\nDate range: {summary['date_min']} to {summary['date_max']}")
 
-            if self.schema.text_length_col in self.df.columns:
+            if summary.get('text_length_counts'):
+                lengths = pd.Series(summary['text_length_counts']).sort_index()
                 self._log(f"\nText statistics:")
-                self._log(f"  Average length: {self.df[self.schema.text_length_col].mean():.0f} characters")
-                self._log(f"  Median length: {self.df[self.schema.text_length_col].median():.0f} characters")
-                self._log(f"  Min length: {self.df[self.schema.text_length_col].min()}")
-                self._log(f"  Max length: {self.df[self.schema.text_length_col].max()}")
+                self._log(f"  Average length: {(lengths.index * lengths).sum() / lengths.sum():.0f} characters")
+                self._log(f"  Median length: {_counts_median(lengths):.0f} characters")
+                self._log(f"  Min length: {lengths.index.min()}")
+                self._log(f"  Max length: {lengths.index.max()}")
+
+        # Print where the time went
+        if self.stats.get('steps'):
+            self._log("\nStep timings:")
+            for name, step in self.stats['steps'].items():
+                memory = f", peak RSS +{step['peak_rss_delta_mb']:.1f} MB" if 'peak_rss_delta_mb' in step else ''
+                self._log(
+                    f"  {name}: {step['seconds']:.3f}s, {step['rows_in']} -> {step['rows_out']} rows, "
+                    f"{step['rows_per_s']:,.0f} rows/s{memory}"
+                )
 
-    def process(self):
+    def process(self, n_jobs=1, chunk_size=DEFAULT_CHUNK_SIZE):
         """Run complete preprocessing pipeline"""
         # Print start header
         self._log("=" * 60)
@@ -440,10 +806,119 @@ class DatasetPreprocessor:
         if not self.load_data():
             return False
 
-        result = self.process_dataframe(self.df, save=True, report=True)
+        result = self.process_dataframe(self.df, save=True, report=True, n_jobs=n_jobs, chunk_size=chunk_size)
         return result is not None
 
 
+def merge_stats(parts):
+    """Combine per-chunk stats: numbers are summed (MAX_STATS take the max), dicts merge
+    recursively, anything else keeps the last value. Step throughput is recomputed."""
+    merged = {}
+    for stats in parts:
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                merged[key] = merge_stats([merged.get(key, {}), value])
+            elif isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+                merged[key] = max(merged.get(key, value), value) if key in MAX_STATS else merged.get(key, 0) + value
+            else:
+                merged[key] = value
+    if 'rows_in' in merged and 'seconds' in merged:
+        add_throughput(merged)
+    return merged
+
+
+def add_throughput(step):
+    """Set rows_per_s from a step's rows_in and seconds"""
+    step['rows_per_s'] = step['rows_in'] / step['seconds'] if step['seconds'] > 0 else 0.0
+    return step
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None without the resource module)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def apply_dtypes(frame, dtypes):
+    """Cast the columns of frame named in dtypes; dates are parsed first whatever their current form"""
+    frame = frame.copy()
+    for col, dtype in dtypes.items():
+        if col not in frame.columns or frame[col].dtype == dtype:
+            continue
+        values = frame[col]
+        if 'date' in str(dtype) and not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(values.astype(object))
+        frame[col] = values.astype(dtype)
+    return frame
+
+
+def summarize_output(frame, schema):
+    """Mergeable report summary of processed rows: value counts and date range"""
+    summary = {}
+    if schema.bank_name_col in frame.columns:
+        summary['category_counts'] = frame[schema.bank_name_col].value_counts().to_dict()
+    if schema.rating_col in frame.columns:
+        summary['rating_counts'] = frame[schema.rating_col].value_counts().to_dict()
+    if schema.date_col in frame.columns and len(frame):
+        summary['date_min'] = frame[schema.date_col].min()
+        summary['date_max'] = frame[schema.date_col].max()
+    if schema.text_length_col in frame.columns:
+        # Lengths are integers, so a histogram keeps the median exact across chunks
+        summary['text_length_counts'] = frame[schema.text_length_col].value_counts().to_dict()
+    return summary
+
+
+def merge_summaries(left, right):
+    """Combine two summarize_output results"""
+    if not left:
+        return dict(right)
+    merged = dict(left)
+    for key, value in right.items():
+        if key == 'date_min':
+            merged[key] = value if merged.get(key) is None else min(merged[key], value)
+        elif key == 'date_max':
+            merged[key] = value if merged.get(key) is None else max(merged[key], value)
+        else:
+            bucket = dict(merged.get(key, {}))
+            for item, count in value.items():
+                bucket[item] = bucket.get(item, 0) + count
+            merged[key] = bucket
+    return merged
+
+
+def _counts_median(counts):
+    """Median of the values in a sorted value -> count Series (mean of the middle two for even totals)"""
+    cumulative = counts.cumsum().to_numpy()
+    total = cumulative[-1]
+    low = counts.index[np.searchsorted(cumulative, (total - 1) // 2 + 1)]
+    high = counts.index[np.searchsorted(cumulative, total // 2 + 1)]
+    return (low + high) / 2
+
+
+def _with_cross_chunk_dedup(stats, counts):
+    """A chunk's stats after SeenKeys applied the dedup rules"""
+    if not counts:
+        return stats
+    removed = sum(counts.values())
+    stats = dict(stats)
+    stats['rows_rejected'] = stats.get('rows_rejected', 0) + removed
+    stats['rule_rejections'] = merge_stats([stats.get('rule_rejections', {}), counts])
+    return stats
+
+
+def _preprocess_chunk(task):
+    """Worker entry point: run the row-wise steps on one chunk and return it with its stats"""
+    schema, critical_cols, chunk = task
+    worker = DatasetPreprocessor(schema=schema, critical_cols=critical_cols, verbose=False)
+    worker.df = chunk.copy()
+    worker.stats['original_count'] = len(chunk)
+    worker.run_row_steps()
+    return worker.df, worker.stats, worker.spans
+
+
 if __name__ == "__main__":
     preprocessor = DatasetPreprocessor()
     preprocessor.process()
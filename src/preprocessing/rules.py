@@ -0,0 +1,236 @@
+"""
+Declarative row-validation rules for DatasetPreprocessor
+
+Each rule returns a boolean "row is valid" mask for a whole DataFrame. A
+RuleSet evaluates all of its rules into one (rules x rows) matrix, so a chunk
+is filtered with a single combined mask and every rule's rejection count comes
+from the same pass. Rules referring to a column the frame does not have are
+skipped, and missing values pass (dropping them is handle_missing_values' job).
+
+Rules must be picklable to run in the parallel/streaming modes, so use
+Expression with a module-level function rather than a lambda there.
+"""
+
+import operator
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+def _all_valid(frame):
+    return np.ones(len(frame), dtype=bool)
+
+
+@dataclass
+class Range:
+    """column within [min, max] (either bound optional)"""
+
+    column: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+    name: Optional[str] = None
+
+    def __post_init__(self):
+        self.name = self.name or f"{self.column}_range"
+
+    def mask(self, frame):
+        if self.column not in frame.columns:
+            return _all_valid(frame)
+        values = pd.to_numeric(frame[self.column], errors='coerce')
+        valid = values.isna().to_numpy()
+        inside = np.ones(len(frame), dtype=bool)
+        if self.min is not None:
+            inside &= (values >= self.min).fillna(False).to_numpy(dtype=bool)
+        if self.max is not None:
+            inside &= (values <= self.max).fillna(False).to_numpy(dtype=bool)
+        return valid | inside
+
+
+@dataclass
+class AllowedValues:
+    """column takes one of values"""
+
+    column: str
+    values: tuple = ()
+    name: Optional[str] = None
+
+    def __post_init__(self):
+        self.name = self.name or f"{self.column}_allowed"
+
+    def mask(self, frame):
+        if self.column not in frame.columns:
+            return _all_valid(frame)
+        column = frame[self.column]
+        return (column.isna() | column.isin(list(self.values))).to_numpy(dtype=bool)
+
+
+@dataclass
+class Pattern:
+    """column matches regex (re.search semantics; anchor with ^...$ for a full match)"""
+
+    column: str
+    regex: str = ''
+    name: Optional[str] = None
+
+    def __post_init__(self):
+        self.name = self.name or f"{self.column}_pattern"
+
+    def mask(self, frame):
+        if self.column not in frame.columns:
+            return _all_valid(frame)
+        column = frame[self.column]
+        matched = column.astype(object).where(column.notna(), '').astype(str).str.contains(self.regex, regex=True)
+        return (column.isna() | matched).to_numpy(dtype=bool)
+
+
+@dataclass
+class Compare:
+    """Cross-column constraint: left <op> right, e.g. Compare('resolved_date', '>=', 'created_date')"""
+
+    left: str
+    op: str
+    right: str
+    name: Optional[str] = None
+
+    def __post_init__(self):
+        if self.op not in COMPARISONS:
+            raise ValueError(f"op must be one of {sorted(COMPARISONS)}")
+        self.name = self.name or f"{self.left}_{self.op}_{self.right}"
+
+    def mask(self, frame):
+        if self.left not in frame.columns or self.right not in frame.columns:
+            return _all_valid(frame)
+        left, right = frame[self.left], frame[self.right]
+        compared = COMPARISONS[self.op](left, right).fillna(False).to_numpy(dtype=bool)
+        return compared | (left.isna() | right.isna()).to_numpy(dtype=bool)
+
+
+@dataclass
+class Expression:
+    """Any vectorized predicate: fn(frame) -> boolean Series/array of valid rows"""
+
+    name: str
+    fn: Callable = None
+
+    def mask(self, frame):
+        return np.asarray(self.fn(frame), dtype=bool)
+
+
+@dataclass
+class Unique:
+    """No duplicate rows over columns; the first occurrence is kept.
+
+    Evaluated after the other rules, on the rows they accept. Chunked modes
+    check each chunk on its own and then drop keys already seen in earlier
+    chunks (see SeenKeys), which needs keep='first'.
+    """
+
+    columns: tuple = ()
+    keep: str = 'first'
+    name: Optional[str] = None
+
+    def __post_init__(self):
+        self.columns = (self.columns,) if isinstance(self.columns, str) else tuple(self.columns)
+        self.name = self.name or f"unique_{'_'.join(self.columns)}"
+
+    def mask(self, frame):
+        columns = [col for col in self.columns if col in frame.columns]
+        if not columns:
+            return _all_valid(frame)
+        return ~frame.duplicated(subset=columns, keep=self.keep).to_numpy(dtype=bool)
+
+
+class RuleSet:
+    """Evaluate rules together and report how many rows each one rejects"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"rule names must be unique: {names}")
+        self.row_rules = [rule for rule in self.rules if not isinstance(rule, Unique)]
+        self.dedup_rules = [rule for rule in self.rules if isinstance(rule, Unique)]
+
+    def evaluate(self, frame):
+        """(keep mask, {rule name: rejected rows}); a row rejected by several rules counts for each"""
+        n_rows = len(frame)
+        valid = np.ones((len(self.row_rules), n_rows), dtype=bool)
+        for i, rule in enumerate(self.row_rules):
+            valid[i] = rule.mask(frame)
+        keep = valid.all(axis=0)
+        counts = {rule.name: int(n_rows - row.sum()) for rule, row in zip(self.row_rules, valid)}
+
+        # Dedup keys only look at rows every other rule accepts
+        for rule in self.dedup_rules:
+            accepted = np.flatnonzero(keep)
+            unique = rule.mask(frame.iloc[accepted])
+            keep[accepted[~unique]] = False
+            counts[rule.name] = int((~unique).sum())
+        return keep, counts
+
+
+class SeenKeys:
+    """Dedup keys carried across chunks, so chunked runs drop the same rows as one pass
+
+    Feed the chunks in input order after the row rules but before any dedup
+    rule: rule N only sees rows every earlier dedup rule kept, so applying the
+    rules per chunk first could let a row a later chunk's key removes still
+    knock out another rule's duplicate. Keys are kept exactly (one tuple per
+    distinct key), and only keep='first' can be decided chunk by chunk.
+    """
+
+    def __init__(self, rules):
+        self.rules = [rule for rule in rules if isinstance(rule, Unique)]
+        for rule in self.rules:
+            if rule.keep != 'first':
+                raise ValueError(f"rule '{rule.name}': chunked modes only support keep='first'")
+        self._seen = {rule.name: set() for rule in self.rules}
+
+    @staticmethod
+    def _keys(frame, columns, rows):
+        values = frame[columns].iloc[rows].astype(object)
+        return zip(*(values[col].where(values[col].notna(), None) for col in columns))
+
+    def update(self, frame):
+        """Record the keys of rows that are already kept (e.g. a previous run's output)"""
+        rows = np.arange(len(frame))
+        for rule in self.rules:
+            columns = [col for col in rule.columns if col in frame.columns]
+            if columns:
+                self._seen[rule.name].update(self._keys(frame, columns, rows))
+
+    def filter(self, frame):
+        """(frame without rows whose key an earlier row or chunk had, {rule name: rows dropped})
+
+        Rules apply in declaration order, each to the rows the previous ones kept.
+        """
+        keep = np.ones(len(frame), dtype=bool)
+        counts = {}
+        for rule in self.rules:
+            columns = [col for col in rule.columns if col in frame.columns]
+            if not columns:
+                counts[rule.name] = 0
+                continue
+            rows = np.flatnonzero(keep)
+            seen = self._seen[rule.name]
+            repeated = np.zeros(len(rows), dtype=bool)
+            for i, key in enumerate(self._keys(frame, columns, rows)):
+                if key in seen:
+                    repeated[i] = True
+                else:
+                    seen.add(key)
+            keep[rows[repeated]] = False
+            counts[rule.name] = int(repeated.sum())
+        return frame[keep], counts
@@ -0,0 +1,224 @@
+"""
+Out-of-core helpers for DatasetPreprocessor.process_stream
+
+- Reads raw reviews chunk by chunk (CSV chunksize or Parquet row groups)
+- Writes output incrementally (CSV or Parquet)
+- Sorts with an external merge sort: each processed chunk is sorted and
+  spilled to a Parquet run, then the runs are merged with a heap over small
+  per-run read buffers (in several passes when there are many runs)
+"""
+
+import heapq
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Rows read per run at a time during the merge; keep well below the chunk size
+DEFAULT_BLOCK_ROWS = 4_096
+# Runs merged in one pass; more runs are merged in several passes
+DEFAULT_MAX_FAN_IN = 64
+
+
+def is_parquet(path):
+    return str(path).endswith(('.parquet', '.pq'))
+
+
+def iter_input_chunks(path, chunk_rows):
+    """Yield the raw file as DataFrames of at most chunk_rows rows"""
+    if is_parquet(path):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def imap_bounded(pool, fn, items, max_pending):
+    """Ordered pool.map that keeps at most max_pending tasks in flight (Executor.map reads all input up front)"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def sort_frame(frame, sort_cols):
+    """Stable sort by (col, ascending) pairs"""
+    if not sort_cols:
+        return frame
+    cols, ascending = zip(*sort_cols)
+    return frame.sort_values(list(cols), ascending=list(ascending), kind='stable')
+
+
+def write_run(frame, path):
+    """Spill one sorted chunk to a Parquet run file"""
+    pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path)
+    return path
+
+
+def iter_run(path, block_rows):
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=block_rows):
+        yield batch.to_pandas()
+
+
+class _Descending:
+    """Sort key wrapper that reverses the order of one value"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _key_values(series, ascending):
+    """Comparable Python values for one sort column (None where missing)"""
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+    elif pd.api.types.is_datetime64_any_dtype(series) or str(series.dtype).startswith(('date32', 'timestamp')):
+        values = pd.to_datetime(series).to_numpy('datetime64[ns]').view('i8').astype('float64')
+    else:
+        values = series.astype(object).to_numpy()
+        if not ascending:
+            values = np.array([_Descending(value) for value in values], dtype=object)
+        values[missing] = None
+        return missing.tolist(), values.tolist()
+    if not ascending:
+        values = -values
+    values = values.astype(object)
+    values[missing] = None
+    return missing.tolist(), values.tolist()
+
+
+def _row_keys(block, sort_cols):
+    """One flat comparable key per row, ordering like sort_values (missing values last in either direction)"""
+    columns = []
+    for col, asc in sort_cols:
+        columns.extend(_key_values(block[col], asc))
+    return zip(*columns)
+
+
+def _iter_run_rows(index, path, block_rows, sort_cols, blocks):
+    """Yield (key, block ref, row) for every row of one run, registering each block in blocks"""
+    for b, block in enumerate(iter_run(path, block_rows)):
+        ref = (index, b)
+        blocks[ref] = block
+        for row, key in enumerate(_row_keys(block, sort_cols)):
+            yield key, ref, row
+
+
+def _merge_pass(paths, sort_cols, block_rows):
+    """Heap-based k-way merge of sorted runs, yielding sorted blocks of at most block_rows rows
+
+    Each run is read block_rows rows at a time, so memory stays at about one
+    block per run plus the output block. heapq.merge breaks ties by run order,
+    so the result equals a stable in-memory sort of the runs concatenated.
+    """
+    blocks = {}
+    latest = {}
+    rows = heapq.merge(
+        *(_iter_run_rows(i, path, block_rows, sort_cols, blocks) for i, path in enumerate(paths)),
+        key=lambda item: item[0],
+    )
+
+    def flush(picked):
+        refs = list(dict.fromkeys(ref for ref, _ in picked))
+        offsets = dict(zip(refs, np.cumsum([0] + [len(blocks[ref]) for ref in refs[:-1]])))
+        frame = pd.concat([blocks[ref] for ref in refs], ignore_index=True)
+        out = frame.take([offsets[ref] + row for ref, row in picked]).reset_index(drop=True)
+        # Every block but the newest of each run has been fully emitted by now
+        for ref in list(blocks):
+            if ref[1] < latest.get(ref[0], ref[1]):
+                del blocks[ref]
+        return out
+
+    picked = []
+    for _, ref, row in rows:
+        latest[ref[0]] = max(latest.get(ref[0], 0), ref[1])
+        picked.append((ref, row))
+        if len(picked) >= block_rows:
+            yield flush(picked)
+            picked = []
+    if picked:
+        yield flush(picked)
+
+
+def merge_sorted_runs(paths, sort_cols, block_rows=DEFAULT_BLOCK_ROWS, max_fan_in=DEFAULT_MAX_FAN_IN):
+    """K-way merge of sorted runs, yielding sorted blocks
+
+    With more than max_fan_in runs, consecutive groups of runs are first merged
+    into larger intermediate runs (written next to the inputs), so at most
+    max_fan_in readers of block_rows rows are open at once. Ties keep run
+    order, so the result equals a stable in-memory sort.
+    """
+    paths = list(paths)
+    if not sort_cols:
+        for path in paths:
+            yield from iter_run(path, block_rows)
+        return
+
+    level = 0
+    while len(paths) > max_fan_in:
+        merged = []
+        for g in range(0, len(paths), max_fan_in):
+            group = paths[g:g + max_fan_in]
+            target = f"{os.path.splitext(group[0])[0]}.merge-{level}-{g // max_fan_in}.parquet"
+            with ChunkWriter(target) as writer:
+                for block in _merge_pass(group, sort_cols, block_rows):
+                    writer.write(block)
+            merged.append(target)
+        paths = merged
+        level += 1
+
+    yield from _merge_pass(paths, sort_cols, block_rows)
+
+
+class ChunkWriter:
+    """Append DataFrames to a CSV or Parquet file (chosen by extension)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._header = True
+        self._writer = None
+        self._handle = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not is_parquet(self.path):
+            self._handle = open(self.path, 'w', newline='', encoding='utf-8')
+        return self
+
+    def write(self, frame):
+        if is_parquet(self.path):
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            frame.to_csv(self._handle, index=False, header=self._header)
+            self._header = False
+        self.rows += len(frame)
+
+    def __exit__(self, *exc):
+        if self._handle is not None:
+            self._handle.close()
+        if self._writer is not None:
+            self._writer.close()
+        elif is_parquet(self.path):
+            pq.write_table(pa.table({}), self.path)
+        return False
@@ -4,6 +4,7 @@ Provides lightweight helpers to:
 - compute coverage (non-null fraction) for any column
 - summarize counts of values per group (supports list-like values)
 - save small metric reports to disk as JSON or CSV
+- save timed spans as a Chrome trace (flame-graph view)
 
 Backwards-compatible wrappers remain for sentiment/theme specific use.
 """)
@@ -86,7 +87,37 @@ def save_metrics(metrics: Dict[str, Any], path: str, *, ensure_dir: bool = True,
 		if parent:
 			os.makedirs(parent, exist_ok=True)
 	with open(path, 'w', encoding='utf-8') as f:
-		json.dump(metrics, f, indent=indent)
+		json.dump(metrics, f, indent=indent, default=_to_json)
+
+
+def _to_json(value):
+	"""Fallback for numpy scalars, timestamps/dates and other objects in metric dicts."""
+	if hasattr(value, 'item'):
+		return value.item()
+	if hasattr(value, 'isoformat'):
+		return value.isoformat()
+	return str(value)
+
+
+def save_trace(spans: Iterable[Dict[str, Any]], path: str, *, ensure_dir: bool = True):
+	"""Save timed spans as a Chrome trace-event JSON file.
+
+	- each span needs `name`, `start_us` and `dur_us`; `pid`/`tid` default to 0.
+	- open the file in chrome://tracing, Perfetto or speedscope for a flame-graph view.
+	"""
+	events = [
+		{
+			'name': span['name'],
+			'ph': 'X',
+			'ts': span['start_us'],
+			'dur': span['dur_us'],
+			'pid': span.get('pid', 0),
+			'tid': span.get('tid', 0),
+			'args': span.get('args', {}),
+		}
+		for span in spans
+	]
+	save_metrics({'traceEvents': events, 'displayTimeUnit': 'ms'}, path, ensure_dir=ensure_dir, indent=None)
 
 
 def save_csv(df: pd.DataFrame, path: str, *, index: bool = False, ensure_dir: bool = True, **to_csv_kwargs):
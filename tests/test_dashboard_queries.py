@@ -0,0 +1,65 @@
+"""
+Test the dashboard query layer
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dashboard.queries import DashboardQueries
+
+
+@pytest.fixture
+def observations():
+    return pd.DataFrame({
+        'indicator_code': ['ACC_OWNERSHIP', 'ACC_OWNERSHIP', 'ACC_OWNERSHIP', 'USG_P2P_COUNT', 'USG_ATM_COUNT', 'ACC_OWNERSHIP'],
+        'source_name': ['Findex', 'Findex', 'Findex', 'NBE', 'NBE', 'NBE'],
+        'value_numeric': [35.0, 22.0, 46.0, 120.0, 80.0, 49.0],
+        'observation_date': ['2017-12-31', '2014-12-31', '2021-12-31', '2024-06-30', '2024-06-30', '2024-11-29'],
+    })
+
+
+def test_summary_matches_direct_filters(observations):
+    queries = DashboardQueries(observations)
+    assert queries.stat('ACC_OWNERSHIP', 'max') == 49.0
+    assert queries.stat('ACC_OWNERSHIP', 'growth_pct') == pytest.approx((49 - 46) / 46 * 100)
+    assert queries.stat('MISSING', 'max') == 0.0
+    assert queries.max_matching('P2P') / queries.max_matching('ATM') == pytest.approx(1.5)
+    assert list(queries.series('ACC_OWNERSHIP')['value_numeric']) == [22.0, 35.0, 46.0, 49.0]
+
+
+def test_filtered_and_channel_means(observations):
+    queries = DashboardQueries(observations)
+    filtered = queries.filtered(['ACC_OWNERSHIP'], ['Findex'], '2015-01-01', '2021-12-31')
+    assert sorted(filtered['value_numeric']) == [35.0, 46.0]
+
+    obs = observations.assign(observation_date=pd.to_datetime(observations['observation_date']))
+    expected = obs[obs['observation_date'] >= '2015-01-01'].groupby(['indicator_code', 'source_name'])['value_numeric'].mean()
+    means = queries.channel_means(start='2015-01-01').set_index(['indicator_code', 'source_name'])['value_numeric']
+    pd.testing.assert_series_equal(means.sort_index(), expected.sort_index())
+    assert queries.filtered(['ACC_OWNERSHIP'], start='2030-01-01').empty
+
+    chunks = list(queries.iter_filtered(chunk_rows=4))
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), queries.filtered())
+
+
+def test_live_forecaster_memoizes_fits(observations):
+    from src.dashboard.live_forecast import LiveForecaster
+
+    impacts = pd.DataFrame({
+        'event_id': ['EVT_1'], 'event_name': ['Fayda Rollout'], 'indicator_code': ['ACC_OWNERSHIP'],
+        'effective_date': pd.to_datetime(['2025-01-01']), 'estimate': [4.0],
+    })
+    forecaster = LiveForecaster(DashboardQueries(observations, version=1), impacts, profile='step')
+    base = forecaster.forecast('ACC_OWNERSHIP', [2025, 2026])
+    assert list(base['event_effect']) == [4.0, 4.0]
+
+    halved = forecaster.forecast('ACC_OWNERSHIP', [2025, 2026, 2027], event_scale={'EVT_1': 0.5})
+    np.testing.assert_allclose(halved['forecast_events'] - halved['forecast'], 2.0)
+    assert forecaster.cache_info().misses == 1 and forecaster.cache_info().hits == 1
+
+    trend_only = forecaster.forecast('ACC_OWNERSHIP', [2025], model_type='quadratic', with_events=False)
+    assert trend_only['forecast_events'].iloc[0] == trend_only['forecast'].iloc[0]
+    assert forecaster.cache_info().misses == 2
+    with pytest.raises(ValueError):
+        forecaster.forecast('MISSING', [2025])
@@ -0,0 +1,39 @@
+"""
+Test the dashboard downsampling helpers
+"""
+import numpy as np
+import pandas as pd
+
+from src.dashboard.downsample import downsample, lttb, minmax, webgl_figure
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4321] = 25.0
+    keep = lttb(x, y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+
+
+def test_minmax_keeps_bucket_extremes():
+    y = np.random.default_rng(0).normal(size=5000)
+    keep = minmax(y, 100)
+    assert len(keep) <= 100
+    assert y.argmax() in keep and y.argmin() in keep
+
+
+def test_webgl_figure_downsamples_each_series():
+    dates = pd.date_range('2000-01-01', periods=3000, freq='D')
+    frame = pd.DataFrame({
+        'observation_date': np.tile(dates, 2),
+        'value_numeric': np.arange(6000, dtype=float),
+        'indicator_code': ['USG_MM_TXN'] * 3000 + ['ACC_AGENTS'] * 3000,
+        'source_name': 'NBE',
+    })
+    fig = webgl_figure(frame, viewport_px=300)
+    assert len(fig.data) == 2
+    assert all(trace.type == 'scattergl' and len(trace.x) == 300 for trace in fig.data)
+    assert len(downsample(frame.iloc[:100], 'observation_date', 'value_numeric', 300)) == 100
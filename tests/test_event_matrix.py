@@ -0,0 +1,93 @@
+"""
+Test the cached event-indicator matrix builder
+"""
+import pandas as pd
+import pytest
+
+from src.analysis.event_matrix import build_event_indicator_matrix
+from src.data.unified_store import UnifiedStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    df = pd.DataFrame({
+        'record_id': ['EVT_1', 'EVT_2', 'IMP_1', 'IMP_2', 'IMP_3'],
+        'parent_id': [None, None, 'EVT_1', 'EVT_1', 'EVT_2'],
+        'record_type': ['event', 'event', 'impact_link', 'impact_link', 'impact_link'],
+        'indicator': ['Telebirr Launch', 'Fayda Rollout', None, None, None],
+        'related_indicator': [None, None, 'ACC_MM_ACCOUNT', 'ACC_MM_ACCOUNT', 'ACC_OWNERSHIP'],
+        'impact_magnitude': [None, None, 10.0, 20.0, 5.0],
+        'observation_date': ['2021-05-17', '2024-01-01', '2021-05-17', '2021-05-17', '2024-01-01'],
+    })
+    path = tmp_path / 'unified.csv'
+    df.to_csv(path, index=False)
+    return UnifiedStore.build(path, root=tmp_path / 'store')
+
+
+def test_matrix_matches_notebook_pivot(store):
+    matrix = build_event_indicator_matrix(store)
+    assert list(matrix.index) == ['Fayda Rollout', 'Telebirr Launch']
+    assert matrix.loc['Telebirr Launch', 'ACC_MM_ACCOUNT'] == 15.0
+    assert matrix.loc['Telebirr Launch', 'ACC_OWNERSHIP'] == 0.0
+
+    sparse = build_event_indicator_matrix(store, sparse=True)
+    assert sparse.sparse.density == pytest.approx(0.5)
+    pd.testing.assert_frame_equal(sparse.sparse.to_dense(), matrix)
+
+
+def test_matrix_cache_follows_content(store):
+    cache = store.root / 'matrix_cache'
+    build_event_indicator_matrix(store)
+    first = list(cache.glob('*.npz'))
+    assert len(first) == 1
+    build_event_indicator_matrix(store)
+    assert list(cache.glob('*.npz')) == first
+
+    store.upsert(pd.DataFrame({
+        'record_id': ['IMP_4'], 'record_type': ['impact_link'], 'parent_id': ['EVT_2'],
+        'related_indicator': ['ACC_MM_ACCOUNT'], 'impact_magnitude': [3.0],
+    }))
+    matrix = build_event_indicator_matrix(store)
+    assert matrix.loc['Fayda Rollout', 'ACC_MM_ACCOUNT'] == 3.0
+    assert len(list(cache.glob('*.npz'))) == 2
+
+
+def test_matrix_cache_keeps_other_value_columns(store, monkeypatch):
+    from src.analysis import event_matrix
+
+    build_event_indicator_matrix(store)
+    build_event_indicator_matrix(store, value_col='impact_magnitude')
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError('matrix rebuilt despite a cached copy')
+
+    monkeypatch.setattr(event_matrix, 'matrix_from_links', no_rebuild)
+    build_event_indicator_matrix(store)
+    build_event_indicator_matrix(store, value_col='impact_magnitude')
+
+    monkeypatch.undo()
+    monkeypatch.setattr(event_matrix, 'MAX_CACHED', 1)
+    build_event_indicator_matrix(store, value_col='impact_estimate')
+    assert len(list((store.root / 'matrix_cache').glob('*.npz'))) == 1
+
+
+def test_matrix_uses_numeric_estimate_over_text_magnitude(tmp_path):
+    """The unified data stores magnitude as high/medium/low; the estimate column carries the number"""
+    df = pd.DataFrame({
+        'record_id': ['EVT_1', 'IMP_1', 'IMP_2'],
+        'parent_id': [None, 'EVT_1', 'EVT_1'],
+        'record_type': ['event', 'impact_link', 'impact_link'],
+        'indicator': ['Telebirr Launch', None, None],
+        'related_indicator': [None, 'ACC_MM_ACCOUNT', 'ACC_OWNERSHIP'],
+        'impact_direction': [None, 'increase', 'decrease'],
+        'impact_magnitude': [None, 'high', 'medium'],
+        'impact_estimate': [None, 15.0, -20.0],
+        'observation_date': ['2021-05-17', '2021-05-17', '2021-05-17'],
+    })
+    path = tmp_path / 'unified.csv'
+    df.to_csv(path, index=False)
+    store = UnifiedStore.build(path, root=tmp_path / 'store')
+
+    matrix = build_event_indicator_matrix(store)
+    assert matrix.loc['Telebirr Launch'].to_dict() == {'ACC_MM_ACCOUNT': 15.0, 'ACC_OWNERSHIP': -20.0}
+    assert build_event_indicator_matrix(store, value_col='impact_magnitude').empty
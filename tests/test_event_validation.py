@@ -0,0 +1,55 @@
+"""
+Test the vectorized event pre/post validation
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.event_validation import pre_post_table
+
+
+@pytest.fixture
+def observations():
+    return pd.DataFrame({
+        'indicator_code': ['ACC_MM_ACCOUNT'] * 4 + ['ACC_OWNERSHIP'] * 3,
+        'observation_date': ['2020-06-30', '2020-12-31', '2021-12-31', '2023-12-31', '2017-12-31', '2021-12-31', '2024-11-29'],
+        'value_numeric': [2.0, 4.0, 4.7, 9.0, 35.0, 46.0, 49.0],
+    })
+
+
+@pytest.fixture
+def events():
+    return pd.DataFrame({
+        'record_id': ['EVT_TELEBIRR', 'EVT_MPESA'],
+        'indicator': ['Telebirr Launch', 'M-Pesa Ethiopia Launch'],
+        'observation_date': ['2021-05-17', '2023-08-01'],
+    })
+
+
+def get_pre_post(observations, event_date, indicator_code, window_months):
+    # Reference implementation from notebook 03
+    obs = observations.assign(observation_date=pd.to_datetime(observations['observation_date']))
+    pre = obs[(obs['indicator_code'] == indicator_code) & (obs['observation_date'] < event_date)
+              & (obs['observation_date'] >= event_date - pd.DateOffset(months=window_months))]
+    post = obs[(obs['indicator_code'] == indicator_code) & (obs['observation_date'] > event_date)
+               & (obs['observation_date'] <= event_date + pd.DateOffset(months=window_months))]
+    return pre['value_numeric'].mean(), post['value_numeric'].mean()
+
+
+def test_matches_notebook_pre_post(observations, events):
+    table = pre_post_table(observations, events, windows=(12, 24, 36), keep_all=True)
+    assert len(table) == 2 * 2 * 3
+
+    for row in table.itertuples():
+        pre, post = get_pre_post(observations, row.event_date, row.indicator_code, row.window_months)
+        np.testing.assert_allclose([row.pre_mean, row.post_mean], [pre, post])
+
+
+def test_predicted_vs_actual_change(observations, events):
+    impacts = pd.DataFrame({'event_id': ['EVT_TELEBIRR'], 'indicator_code': ['ACC_MM_ACCOUNT'], 'estimate': [2.0]})
+    table = pre_post_table(observations, events, impacts, windows=(12,))
+    telebirr = table[(table['event_id'] == 'EVT_TELEBIRR') & (table['indicator_code'] == 'ACC_MM_ACCOUNT')].iloc[0]
+    assert telebirr['actual_change'] == pytest.approx(4.7 - 3.0)
+    assert telebirr['error'] == pytest.approx(4.7 - 3.0 - 2.0)
+    # Pairs with neither a measurable change nor a prediction are dropped
+    assert len(table) == 1
@@ -0,0 +1,76 @@
+"""
+Test the streaming dashboard exports
+"""
+import gzip
+import os
+
+import pandas as pd
+import pytest
+
+from src.dashboard.exports import ExportCache, iter_chunks, write_chunks
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'indicator_code': ['ACC_OWNERSHIP'] * 5,
+        'value_numeric': [22.0, 35.0, 46.0, 49.0, 51.0],
+        'observation_date': pd.date_range('2020-01-01', periods=5, freq='YE'),
+    })
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'csv.gz', 'parquet'])
+def test_chunked_writes_round_trip(frame, tmp_path, fmt):
+    path = tmp_path / f'export.{fmt}'
+    assert write_chunks(iter_chunks(frame, chunk_rows=2), path, fmt) == 5
+
+    if fmt == 'parquet':
+        back = pd.read_parquet(path)
+    else:
+        back = pd.read_csv(path, parse_dates=['observation_date'], compression='gzip' if fmt == 'csv.gz' else None)
+    pd.testing.assert_frame_equal(back, frame, check_dtype=False)
+
+
+def test_cache_serves_repeated_requests_from_disk(frame, tmp_path):
+    cache = ExportCache(tmp_path / 'exports')
+    calls = []
+
+    def chunks():
+        calls.append(1)
+        return iter_chunks(frame, chunk_rows=2)
+
+    first = cache.get_or_create(chunks, {'indicators': ['ACC_OWNERSHIP']}, 'csv.gz', version=1)
+    again = cache.get_or_create(chunks, {'indicators': ['ACC_OWNERSHIP']}, 'csv.gz', version=1)
+    assert first == again and len(calls) == 1
+    with gzip.open(first, 'rt') as handle:
+        assert handle.readline().startswith('indicator_code')
+
+    cache.get_or_create(chunks, {'indicators': ['ACC_OWNERSHIP']}, 'csv.gz', version=2)
+    assert len(calls) == 2
+
+
+def test_lookup_does_not_build_and_static_url(frame, monkeypatch, tmp_path):
+    from src.dashboard import exports
+
+    monkeypatch.setattr(exports, 'STATIC_DIR', tmp_path / 'static')
+    cache = ExportCache(tmp_path / 'static' / 'exports')
+    assert cache.lookup({'table': 'forecasts'}, 'csv', version=1) is None
+    assert not cache.root.exists()
+
+    path = cache.get_or_create(lambda: iter_chunks(frame), {'table': 'forecasts'}, 'csv', version=1)
+    assert cache.lookup({'table': 'forecasts'}, 'csv', version=1) == path
+    assert exports.static_url(path) == f'app/static/exports/{path.name}'
+
+
+def test_writes_prune_old_versions_and_cap_size(frame, tmp_path):
+    cache = ExportCache(tmp_path / 'exports')
+    old = cache.get_or_create(lambda: iter_chunks(frame), {'indicators': ['A']}, 'csv', version=1)
+    current = cache.get_or_create(lambda: iter_chunks(frame), {'indicators': ['A']}, 'csv', version=2)
+    assert not old.exists() and current.exists()
+
+    cache.max_bytes = 2 * current.stat().st_size
+    second = cache.get_or_create(lambda: iter_chunks(frame), {'indicators': ['B']}, 'csv', version=2)
+    os.utime(current, ns=(0, 0))
+    assert cache.lookup({'indicators': ['B']}, 'csv', version=2) == second
+    third = cache.get_or_create(lambda: iter_chunks(frame), {'indicators': ['C']}, 'csv', version=2)
+    assert sorted(cache.root.iterdir()) == sorted([second, third])
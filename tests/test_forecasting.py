@@ -0,0 +1,213 @@
+"""
+Test the batched forecasting engine
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.forecasting import ForecastEngine, apply_event_impacts, create_scenarios
+
+
+@pytest.fixture
+def observations():
+    return pd.DataFrame({
+        'indicator_code': ['ACC_OWNERSHIP'] * 4 + ['ACC_MM_ACCOUNT'] * 2 + ['ACC_OWNERSHIP'],
+        'gender': ['all'] * 6 + ['female'],
+        'value_numeric': [22.0, 35.0, 46.0, 49.0, 4.7, 9.45, 36.0],
+        'observation_date': pd.to_datetime([
+            '2014-12-31', '2017-12-31', '2021-12-31', '2024-11-29', '2021-12-31', '2024-11-29', '2021-12-31',
+        ]),
+    })
+
+
+def test_batched_fit_matches_per_series_least_squares(observations):
+    engine = ForecastEngine().fit(observations)
+    assert len(engine.params_) == 3
+
+    access = observations[(observations['indicator_code'] == 'ACC_OWNERSHIP') & (observations['gender'] == 'all')]
+    slope, intercept = np.polyfit(access['observation_date'].dt.year, access['value_numeric'], 1)
+    forecast = engine.forecast([2025, 2027])
+    row = forecast[(forecast['indicator_code'] == 'ACC_OWNERSHIP') & (forecast['gender'] == 'all')]
+    np.testing.assert_allclose(row['forecast'], slope * np.array([2025, 2027]) + intercept)
+
+
+def test_single_point_series_stays_flat(observations):
+    forecast = ForecastEngine().fit(observations).forecast()
+    female = forecast[forecast['gender'] == 'female']
+    assert list(female['forecast']) == [36.0, 36.0, 36.0]
+
+
+def test_event_overlay_and_scenarios(observations):
+    forecast = ForecastEngine().fit(observations).forecast([2025])
+    matrix = pd.DataFrame({'ACC_OWNERSHIP': [15.0, 10.0]}, index=['Telebirr Launch', 'Fayda Rollout'])
+    out = create_scenarios(apply_event_impacts(forecast, matrix))
+    access = out[(out['indicator_code'] == 'ACC_OWNERSHIP') & (out['gender'] == 'all')].iloc[0]
+    assert access['forecast_events'] == pytest.approx(access['forecast'] + 25.0 / 3)
+    assert access['optimistic'] == pytest.approx(access['base'] * 1.2)
+
+
+def test_monte_carlo_bands_are_ordered_and_chunking_invariant(observations):
+    from src.forecasting.simulation import MonteCarloForecaster
+
+    engine = ForecastEngine().fit(observations)
+    bands = MonteCarloForecaster(engine, n_draws=2000, seed=7).bands()
+    assert (bands['p5'] <= bands['p50']).all() and (bands['p50'] <= bands['p95']).all()
+
+    trend = engine.forecast()
+    np.testing.assert_allclose(bands['p50'], trend['forecast'], rtol=0.05)
+
+    chunked = MonteCarloForecaster(engine, n_draws=2000, seed=7, max_chunk_bytes=1).bands()
+    assert chunked.shape == bands.shape
+
+
+def test_monte_carlo_adds_pending_event_impacts(observations):
+    from src.forecasting.events import impact_table
+    from src.forecasting.simulation import MonteCarloForecaster
+
+    events = pd.DataFrame({'record_id': ['EVT_1'], 'indicator': ['Fayda Rollout'], 'observation_date': ['2025-01-01']})
+    links = pd.DataFrame({
+        'record_id': ['IMP_1'], 'parent_id': ['EVT_1'], 'related_indicator': ['ACC_MM_ACCOUNT'],
+        'impact_direction': ['increase'], 'impact_estimate': [5.0], 'lag_months': [0], 'confidence': ['high'],
+    })
+    impacts = impact_table(links, events)
+    engine = ForecastEngine().fit(observations)
+    base = MonteCarloForecaster(engine, n_draws=4000, seed=3).bands([2025])
+    with_event = MonteCarloForecaster(engine, impacts, n_draws=4000, seed=3).bands([2025])
+
+    is_mm = base['indicator_code'] == 'ACC_MM_ACCOUNT'
+    lift = with_event.loc[is_mm, 'mean'].iloc[0] - base.loc[is_mm, 'mean'].iloc[0]
+    assert lift == pytest.approx(5.0, abs=0.5)
+    np.testing.assert_allclose(with_event.loc[~is_mm, 'mean'], base.loc[~is_mm, 'mean'])
+
+
+def _fayda_impacts(profile=None):
+    from src.forecasting.events import impact_table
+
+    events = pd.DataFrame({'record_id': ['EVT_1', 'EVT_2'], 'observation_date': ['2025-01-01', '2025-01-01']})
+    links = pd.DataFrame({
+        'record_id': ['IMP_1', 'IMP_2'], 'parent_id': ['EVT_1', 'EVT_2'],
+        'related_indicator': ['ACC_OWNERSHIP', 'ACC_OWNERSHIP'],
+        'impact_estimate': [6.0, 2.0], 'lag_months': [0, 12],
+    })
+    impacts = impact_table(links, events)
+    if profile is not None:
+        impacts['profile'] = profile
+    return impacts
+
+
+def test_event_effect_kernels_on_monthly_grid():
+    from src.forecasting.events import EventEffectModel, month_grid
+
+    model = EventEffectModel(_fayda_impacts(['ramp', 'decay']), ramp_months=12, half_life_months=6)
+    grid = month_grid('2024-12-01', '2027-12-31')
+    effects = model.effects(grid).loc['ACC_OWNERSHIP']
+
+    assert effects.iloc[0] == 0.0
+    assert effects[pd.Timestamp('2025-06-30')] == pytest.approx(3.0, abs=0.1)
+    assert effects[pd.Timestamp('2025-12-31')] == pytest.approx(6.0, abs=0.1)
+    # The decaying link starts a year after its event and has halved six months later
+    assert effects[pd.Timestamp('2026-06-30')] - 6.0 == pytest.approx(1.0, abs=0.1)
+
+
+def test_event_effect_batch_matches_single_schedules():
+    from src.forecasting.events import EventEffectModel, year_grid
+
+    model = EventEffectModel(_fayda_impacts(), profile='step')
+    grid = year_grid([2024, 2025, 2026])
+    active = np.array([[1, 1], [0, 1], [1, 1]])
+    scale = np.array([[1, 1], [1, 1], [2, 1]])
+    shift = np.array([[0, 0], [0, 0], [0, 24]])
+    batch = model.effects_batch(grid, active=active, scale=scale, shift_months=shift)
+
+    assert batch.shape == (3, 1, 3)
+    for i in range(3):
+        single = model.effects(grid, active=active[i], scale=scale[i], shift_months=shift[i])
+        np.testing.assert_allclose(batch[i], single.to_numpy())
+    np.testing.assert_allclose(batch[:, 0, :], [[0, 6, 8], [0, 0, 2], [0, 12, 12]])
+
+
+def test_event_effect_overlay_skips_realised_effects(observations):
+    from src.forecasting.events import EventEffectModel
+
+    engine = ForecastEngine().fit(observations)
+    out = EventEffectModel(_fayda_impacts(), profile='step').overlay(engine.forecast([2025, 2026]), engine.params_)
+    access = out[out['indicator_code'] == 'ACC_OWNERSHIP'].set_index(['gender', 'year'])['event_effect']
+    # `all` was last observed in 2024, `female` in 2021: both see the full pending effect
+    assert access[('all', 2025)] == pytest.approx(6.0)
+    assert access[('all', 2026)] == pytest.approx(8.0)
+    assert access[('female', 2026)] == pytest.approx(8.0)
+    assert (out.loc[out['indicator_code'] == 'ACC_MM_ACCOUNT', 'event_effect'] == 0).all()
+
+
+def test_scenario_batch_evaluates_event_calendars(observations):
+    from src.forecasting import Scenario, ScenarioBatch
+
+    engine = ForecastEngine().fit(observations)
+    scenarios = [
+        Scenario('baseline'),
+        Scenario('no_fayda', disabled=['EVT_1']),
+        Scenario('slip', dates={'EVT_1': '2027-01-01'}, scale={'EVT_2': 2.0}),
+    ]
+    batch = ScenarioBatch(engine, _fayda_impacts(), scenarios, profile='step')
+    values = batch.evaluate([2025, 2026])
+    assert values.shape == (3, 3, 2)
+
+    trend = engine.predict_matrix([2025, 2026])
+    access = engine.params_.index[(engine.params_['indicator_code'] == 'ACC_OWNERSHIP') & (engine.params_['gender'] == 'all')][0]
+    np.testing.assert_allclose(values[:, access] - trend[access], [[6, 8], [0, 2], [0, 4]])
+    mm = engine.params_.index[engine.params_['indicator_code'] == 'ACC_MM_ACCOUNT'][0]
+    np.testing.assert_allclose(values[:, mm], np.tile(trend[mm], (3, 1)))
+
+    pooled = ScenarioBatch(engine, _fayda_impacts(), scenarios, profile='step', n_jobs=2, parallel_threshold=1, chunk_size=1)
+    np.testing.assert_allclose(pooled.evaluate([2025, 2026]), values)
+    assert set(batch.frame([2025])['scenario']) == {'baseline', 'no_fayda', 'slip'}
+
+    with pytest.raises(ValueError, match='EVT_404'):
+        ScenarioBatch(engine, _fayda_impacts(), [Scenario('bad', disabled=['EVT_404'])]).evaluate()
+
+
+def test_crossing_times_interpolate_between_grid_points():
+    from src.forecasting.targets import crossing_times
+
+    years = np.array([2025.0, 2026.0, 2027.0])
+    values = np.array([[50.0, 55.0, 60.0], [61.0, 62.0, 63.0], [40.0, 41.0, 42.0]])
+    times = crossing_times(values, years, np.array([52.5, 60.0]))
+    np.testing.assert_allclose(times, [[2025.5, 2025.0, np.inf], [2027.0, 2025.0, np.inf]])
+
+
+def test_target_solver_batches_series_and_targets(observations):
+    from src.forecasting.targets import TargetSolver
+
+    engine = ForecastEngine().fit(observations)
+    solver = TargetSolver.from_engine(engine, n_draws=2000, seed=11)
+    result = solver.solve({'ACC_OWNERSHIP': [60, 70], 'ACC_MM_ACCOUNT': 20}, horizon=range(2025, 2046))
+    assert len(result) == 5
+
+    access = engine.params_.query("indicator_code == 'ACC_OWNERSHIP' and gender == 'all'").iloc[0]
+    analytic = access['center_year'] + (60 - access['coef_0']) / access['coef_1']
+    row = result[(result['indicator_code'] == 'ACC_OWNERSHIP') & (result['gender'] == 'all') & (result['target'] == 60)].iloc[0]
+    assert row['trend_year'] == pytest.approx(analytic, abs=0.05)
+    assert row['year_p10'] <= row['year_p50'] <= row['year_p90']
+    assert row['year_p50'] == pytest.approx(analytic, abs=1.0)
+
+    # The flat single-point female series never gets there on trend
+    female = result[(result['gender'] == 'female') & (result['target'] == 60)].iloc[0]
+    assert np.isinf(female['trend_year'])
+
+    by_year = solver.probability_by_year(60, horizon=range(2025, 2046))
+    probs = by_year.loc[(by_year['indicator_code'] == 'ACC_OWNERSHIP') & (by_year['gender'] == 'all'), list(range(2025, 2046))]
+    assert np.all(np.diff(probs.to_numpy()) >= 0)
+
+
+def test_target_solver_expected_year_includes_event_effects(observations):
+    """The expected crossing uses the same trend + event path the simulated quantiles are centred on"""
+    from src.forecasting.targets import TargetSolver
+
+    engine = ForecastEngine().fit(observations)
+    plain = TargetSolver.from_engine(engine, n_draws=2000, seed=5).solve({'ACC_OWNERSHIP': 60}, horizon=range(2025, 2046))
+    lifted = TargetSolver.from_engine(engine, _fayda_impacts(), n_draws=2000, seed=5).solve({'ACC_OWNERSHIP': 60}, horizon=range(2025, 2046))
+
+    row = lifted[lifted['gender'] == 'all'].iloc[0]
+    assert row['trend_year'] < plain[plain['gender'] == 'all'].iloc[0]['trend_year']
+    assert row['trend_year'] == pytest.approx(row['year_p50'], abs=1.0)
+
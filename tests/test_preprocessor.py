@@ -0,0 +1,296 @@
+"""
+Test the review DatasetPreprocessor
+"""
+import json
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from src.preprocessing.preprocessor import DatasetPreprocessor, PreprocessSchema, apply_dtypes, merge_stats
+from src.preprocessing.rules import AllowedValues, Compare, Pattern, Range, RuleSet, Unique
+from src.preprocessing.streaming import merge_sorted_runs, sort_frame, write_run
+
+
+def _reviews(n=40):
+    """Small raw reviews frame with messy text, missing values and bad ratings"""
+    rows = []
+    for i in range(n):
+        rows.append({
+            'review_id': f'r{i}',
+            'review_text': None if i % 11 == 0 else ('   ' if i % 13 == 0 else f'  great\tapp \n number {i}  '),
+            'rating': 7 if i % 9 == 0 else (i % 5) + 1,
+            'review_date': f'2024-{(i % 12) + 1:02d}-{(i % 27) + 1:02d} 10:15:00',
+            'bank_code': ['CBE', 'BOA', 'DASHEN'][i % 3],
+            'bank_name': ['Commercial Bank', 'Bank of Abyssinia', 'Dashen Bank'][i % 3],
+        })
+    return pd.DataFrame(rows)
+
+
+def test_clean_text_collapses_whitespace():
+    """Whitespace runs collapse to one space and empty reviews are dropped"""
+    pre = DatasetPreprocessor(verbose=False)
+    out = pre.process_dataframe(_reviews())
+
+    assert out['review_text'].str.contains(r'\s{2,}|^\s|\s$', regex=True).sum() == 0
+    assert (out['text_length'] == out['review_text'].str.len()).all()
+    assert out['rating'].between(1, 5).all()
+    assert {'review_year', 'review_month'} <= set(out.columns)
+
+
+def test_parallel_matches_sequential():
+    """Chunked multi-process run gives the same output and stats as a single pass"""
+    raw = _reviews()
+    sequential = DatasetPreprocessor(verbose=False)
+    expected = sequential.process_dataframe(raw)
+
+    parallel = DatasetPreprocessor(verbose=False)
+    result = parallel.process_dataframe(raw, n_jobs=2, chunk_size=7)
+
+    assert_frame_equal(result, expected)
+    for key in ('original_count', 'rows_removed_missing', 'empty_reviews_removed', 'rows_rejected', 'final_count'):
+        assert parallel.stats[key] == sequential.stats[key]
+    assert parallel.stats['missing_before'] == sequential.stats['missing_before']
+
+
+def test_dedup_rules_span_chunks(tmp_path):
+    """Duplicate keys in different chunks are dropped the same way in parallel, streaming and single-pass runs"""
+    raw = _reviews(60)
+    raw['review_id'] = [f'r{i % 25}' for i in range(60)]
+    schema = PreprocessSchema(rules=(Range('rating', 1, 5, name='rating_range'), Unique('review_id')))
+
+    sequential = DatasetPreprocessor(schema=schema, verbose=False)
+    expected = sequential.process_dataframe(raw)
+    parallel = DatasetPreprocessor(schema=schema, verbose=False)
+    assert_frame_equal(parallel.process_dataframe(raw, n_jobs=2, chunk_size=7), expected)
+
+    raw_path, out_path = tmp_path / 'raw.csv', tmp_path / 'out.csv'
+    raw.to_csv(raw_path, index=False)
+    streaming = DatasetPreprocessor(schema=schema, verbose=False)
+    assert streaming.process_stream(str(raw_path), str(out_path), chunk_rows=9, report=False)
+    assert sorted(pd.read_csv(out_path)['review_id']) == sorted(expected['review_id'])
+
+    for pre in (parallel, streaming):
+        assert pre.stats['rule_rejections'] == sequential.stats['rule_rejections']
+        assert pre.stats['rows_rejected'] == sequential.stats['rows_rejected']
+        assert pre.stats['invalid_ratings_removed'] == sequential.stats['invalid_ratings_removed'] > 0
+
+
+def test_multiple_dedup_rules_match_single_pass(tmp_path):
+    """A row dropped by the first dedup rule in a later chunk must not knock out the second rule's duplicate"""
+    raw = _reviews(6).assign(rating=3)
+    raw['review_id'] = ['r0', 'r1', 'r0', 'r2', 'r3', 'r4']
+    raw['review_text'] = ['a', 'b', 'c', 'c', 'd', 'e']
+    schema = PreprocessSchema(rules=(Unique('review_id'), Unique('review_text')))
+
+    sequential = DatasetPreprocessor(schema=schema, verbose=False)
+    expected = sequential.process_dataframe(raw)
+    assert 'r2' in set(expected['review_id'])
+    parallel = DatasetPreprocessor(schema=schema, verbose=False)
+    assert_frame_equal(parallel.process_dataframe(raw, n_jobs=2, chunk_size=2), expected)
+
+    raw_path, out_path = tmp_path / 'raw.csv', tmp_path / 'out.csv'
+    raw.to_csv(raw_path, index=False)
+    streaming = DatasetPreprocessor(schema=schema, verbose=False)
+    assert streaming.process_stream(str(raw_path), str(out_path), chunk_rows=2, report=False)
+    assert sorted(pd.read_csv(out_path)['review_id']) == sorted(expected['review_id'])
+
+    for pre in (parallel, streaming):
+        assert pre.stats['rule_rejections'] == sequential.stats['rule_rejections']
+        assert pre.stats['rows_rejected'] == sequential.stats['rows_rejected']
+
+
+def test_validate_ratings_is_deprecated_alias():
+    pre = DatasetPreprocessor(verbose=False)
+    pre.df = _reviews()
+    with pytest.warns(DeprecationWarning):
+        pre.validate_ratings()
+    assert pre.df['rating'].between(1, 5).all()
+    assert pre.stats['invalid_ratings_removed'] == pre.stats['rule_rejections']['rating_range']
+
+
+def test_merge_stats():
+    merged = merge_stats([
+        {'original_count': 3, 'missing_before': {'a': 1}, 'label': 'x'},
+        {'original_count': 2, 'missing_before': {'a': 2, 'b': 1}, 'label': 'y'},
+    ])
+    assert merged == {'original_count': 5, 'missing_before': {'a': 3, 'b': 1}, 'label': 'y'}
+
+
+def test_stream_matches_in_memory(tmp_path):
+    """Chunked reads, spilled runs and the external merge give the in-memory result"""
+    raw = _reviews(200)
+    raw_path = tmp_path / 'raw.csv'
+    raw.to_csv(raw_path, index=False)
+
+    expected_path = tmp_path / 'expected.csv'
+    in_memory = DatasetPreprocessor(verbose=False)
+    in_memory.process_dataframe(pd.read_csv(raw_path), output_path=str(expected_path), save=True)
+
+    streamed_path = tmp_path / 'streamed.csv'
+    streaming = DatasetPreprocessor(verbose=False)
+    assert streaming.process_stream(str(raw_path), str(streamed_path), chunk_rows=23, block_rows=5, report=False)
+
+    assert streaming.df is None
+    assert_frame_equal(pd.read_csv(streamed_path), pd.read_csv(expected_path))
+    for key in ('original_count', 'rows_removed_missing', 'empty_reviews_removed', 'rows_rejected', 'final_count'):
+        assert streaming.stats[key] == in_memory.stats[key]
+    assert streaming.output_summary['category_counts'] == in_memory.df['bank_name'].value_counts().to_dict()
+
+
+def test_merge_sorted_runs_matches_stable_sort(tmp_path):
+    """Multi-pass heap merge over many small runs, with a descending key and missing values"""
+    sort_cols = [('group', True), ('value', False)]
+    frame = pd.DataFrame({
+        'group': [f'g{i % 3}' for i in range(300)],
+        'value': [None if i % 17 == 0 else float(i % 7) for i in range(300)],
+        'row': range(300),
+    })
+    paths = [write_run(sort_frame(part, sort_cols), str(tmp_path / f'run-{i}.parquet'))
+             for i, part in enumerate(frame[lo:lo + 20] for lo in range(0, 300, 20))]
+
+    blocks = list(merge_sorted_runs(paths, sort_cols, block_rows=8, max_fan_in=4))
+    assert max(len(block) for block in blocks) <= 8
+    merged = pd.concat(blocks, ignore_index=True)
+    assert_frame_equal(merged, sort_frame(frame, sort_cols).reset_index(drop=True))
+
+
+def test_stream_parquet_round_trip(tmp_path):
+    raw_path = tmp_path / 'raw.parquet'
+    _reviews(60).to_parquet(raw_path, index=False)
+    out_path = tmp_path / 'out.parquet'
+
+    pre = DatasetPreprocessor(verbose=False)
+    assert pre.process_stream(str(raw_path), str(out_path), chunk_rows=16, block_rows=4, n_jobs=2, report=False)
+
+    out = pd.read_parquet(out_path)
+    assert len(out) == pre.stats['final_count']
+    keys = list(zip(out['bank_code'], pd.to_datetime(out['review_date'])))
+    assert keys == sorted(keys, key=lambda key: (key[0], -key[1].value))
+
+
+def test_incremental_only_reprocesses_delta(tmp_path):
+    raw = _reviews(60)
+    raw_path, out_path = tmp_path / 'raw.csv', tmp_path / 'processed.csv'
+    raw.to_csv(raw_path, index=False)
+
+    first = DatasetPreprocessor(verbose=False)
+    assert first.process_incremental(str(raw_path), str(out_path), report=False)
+    assert first.delta_stats['new_rows'] == 60
+
+    # Two new reviews, one edited review, one edit that only touches whitespace
+    grown = pd.concat([raw, _reviews(62).iloc[60:].assign(review_id=['n1', 'n2'])], ignore_index=True)
+    grown.loc[grown['review_id'] == 'r1', 'review_text'] = 'completely new text'
+    grown.loc[grown['review_id'] == 'r2', 'review_text'] = grown.loc[grown['review_id'] == 'r2', 'review_text'] + '   '
+    grown.to_csv(raw_path, index=False)
+
+    second = DatasetPreprocessor(verbose=False)
+    assert second.process_incremental(str(raw_path), str(out_path), report=False)
+    assert second.delta_stats['original_count'] == 4
+    assert (second.delta_stats['new_rows'], second.delta_stats['changed_rows']) == (2, 2)
+    assert second.delta_stats['content_changed_rows'] == 1
+
+    full = DatasetPreprocessor(verbose=False)
+    expected = full.process_dataframe(pd.read_csv(raw_path))
+    assert_frame_equal(pd.read_csv(out_path), pd.read_csv(_saved(expected, tmp_path)))
+    for key in ('original_count', 'rows_removed_missing', 'empty_reviews_removed', 'rows_rejected', 'final_count'):
+        assert second.stats[key] == full.stats[key]
+
+    third = DatasetPreprocessor(verbose=False)
+    assert third.process_incremental(str(raw_path), str(out_path), report=False)
+    assert third.delta_stats['original_count'] == 0
+    assert third.stats['final_count'] == full.stats['final_count']
+
+
+def test_incremental_dedup_checks_existing_output(tmp_path):
+    """A new row repeating a key already in the output is rejected, as in a full run"""
+    raw = _reviews(2).assign(rating=3, review_text=['good app', 'bad'])
+    raw_path, out_path = tmp_path / 'raw.csv', tmp_path / 'processed.csv'
+    raw.to_csv(raw_path, index=False)
+    schema = PreprocessSchema(rules=(Unique('review_text'),))
+    assert DatasetPreprocessor(schema=schema, verbose=False).process_incremental(str(raw_path), str(out_path), report=False)
+
+    grown = pd.concat([raw, raw.iloc[[0]].assign(review_id='r2')], ignore_index=True)
+    grown.to_csv(raw_path, index=False)
+    incremental = DatasetPreprocessor(schema=schema, verbose=False)
+    assert incremental.process_incremental(str(raw_path), str(out_path), report=False)
+    assert incremental.delta_stats['rule_rejections'] == {'unique_review_text': 1}
+
+    full = DatasetPreprocessor(schema=schema, verbose=False)
+    expected = full.process_dataframe(grown)
+    assert_frame_equal(pd.read_csv(out_path), pd.read_csv(_saved(expected, tmp_path)))
+    assert incremental.stats['rows_rejected'] == full.stats['rows_rejected'] == 1
+    manifest = pd.read_parquet(f'{out_path}.manifest.parquet').set_index('review_id')
+    assert manifest.loc['r2', 'status'] == 'rejected'
+
+
+def _saved(frame, tmp_path):
+    path = tmp_path / 'expected.csv'
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_output_dtypes_persist_to_parquet(tmp_path):
+    """The declared compact dtypes are enforced on output and survive a Parquet round trip"""
+    out_path = tmp_path / 'processed.parquet'
+    pre = DatasetPreprocessor(verbose=False)
+    out = pre.process_dataframe(_reviews(), output_path=str(out_path), save=True)
+
+    expected = {col: dtype for col, dtype in pre.schema.dtypes.items() if col in out.columns}
+    assert {col: str(out[col].dtype) for col in expected} == {col: str(pd.Series(dtype=dtype).dtype) for col, dtype in expected.items()}
+    assert isinstance(out['bank_code'].dtype, pd.CategoricalDtype)
+
+    # Parquet keeps categoricals, Arrow dates and small ints; string storage is re-applied on read
+    restored = pd.read_parquet(out_path)
+    assert (restored[['rating', 'review_date', 'bank_code']].dtypes == out[['rating', 'review_date', 'bank_code']].dtypes).all()
+    assert_frame_equal(apply_dtypes(restored, pre.schema.dtypes), out)
+
+
+def test_declarative_rules_count_rejections():
+    """Ranges, allowed values, patterns, cross-column and dedup rules share one pass"""
+    raw = _reviews(30)
+    raw.loc[3, 'review_id'] = raw.loc[2, 'review_id']
+    raw['source'] = ['playstore'] * 29 + ['telegram']
+    raw['first_seen'] = pd.Timestamp('2024-06-01')
+
+    schema = PreprocessSchema(rules=(
+        Range('rating', 1, 5),
+        AllowedValues('source', ('playstore',)),
+        Pattern('review_id', r'^r\d+$'),
+        Compare('first_seen', '>=', 'review_date'),
+        Unique('review_id'),
+    ))
+    pre = DatasetPreprocessor(schema=schema, verbose=False)
+    raw['review_date'] = pd.to_datetime(raw['review_date'])
+    keep, counts = RuleSet(schema.rules).evaluate(raw)
+
+    assert counts['rating_range'] == int((~raw['rating'].between(1, 5)).sum())
+    assert counts['source_allowed'] == 1
+    assert counts['review_id_pattern'] == 0
+    assert counts['first_seen_>=_review_date'] == int((raw['review_date'] > raw['first_seen']).sum())
+    assert counts['unique_review_id'] == 1
+    assert not keep[3]
+
+    out = pre.process_dataframe(raw.drop(columns=['first_seen']))
+    assert pre.stats['rule_rejections']['source_allowed'] == 1
+    assert out['review_id'].is_unique
+    assert pre.stats['rows_rejected'] == pre.stats['count_after_cleaning'] - pre.stats['final_count']
+
+
+def test_step_metrics_export(tmp_path):
+    """Each step records timing and row counts, exportable as JSON and as a Chrome trace"""
+    pre = DatasetPreprocessor(verbose=False)
+    pre.process_dataframe(_reviews(), n_jobs=2, chunk_size=15)
+
+    steps = pre.stats['steps']
+    assert {'parallel_row_steps', 'clean_text', 'validate_rows', 'prepare_final_output'} <= set(steps)
+    assert steps['check_missing_data']['rows_in'] == 40
+    assert steps['prepare_final_output']['rows_out'] == pre.stats['final_count']
+    assert all(step['seconds'] >= 0 and 'rows_per_s' in step for step in steps.values())
+
+    pre.export_metrics(str(tmp_path / 'metrics.json'), trace_path=str(tmp_path / 'trace.json'))
+    saved = json.loads((tmp_path / 'metrics.json').read_text())
+    assert saved['steps']['clean_text']['rows_in'] == steps['clean_text']['rows_in']
+    trace = json.loads((tmp_path / 'trace.json').read_text())
+    assert {event['name'] for event in trace['traceEvents']} == set(steps)
+    assert all(event['ph'] == 'X' for event in trace['traceEvents'])
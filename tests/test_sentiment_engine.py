@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline import sentiment as sent
+
+
+def _vader_available():
+    try:
+        sent.nltk.data.find('sentiment/vader_lexicon.zip')
+        return True
+    except LookupError:
+        return False
+
+
+needs_vader = pytest.mark.skipif(not _vader_available(), reason='VADER lexicon not installed')
+
+
+def test_sentiment_labels_thresholds():
+    labels = sent.sentiment_labels(np.array([0.5, 0.05, 0.0, -0.049, -0.05]))
+    assert labels.tolist() == ['positive', 'positive', 'neutral', 'neutral', 'negative']
+
+
+@needs_vader
+def test_vader_scores_match_per_text_analyzer():
+    texts = pd.Series(['I love this app!', None, 'Terrible, it keeps crashing.', 'ok'] * 3)
+    scores = sent.vader_scores(texts, n_jobs=2, chunk_size=4)
+    assert set(scores) == set(sent.VADER_FIELDS)
+    assert all(isinstance(values, np.ndarray) and len(values) == len(texts) for values in scores.values())
+
+    reference = sent.SentimentIntensityAnalyzer()
+    for i, text in enumerate(texts):
+        expected = reference.polarity_scores(text) if text is not None else {'neg': 0, 'neu': 1, 'pos': 0, 'compound': 0}
+        assert [scores[field][i] for field in sent.VADER_FIELDS] == pytest.approx([expected[field] for field in sent.VADER_FIELDS])
+
+
+@needs_vader
+def test_analyzer_is_shared_and_batch_matches_single():
+    sent.analyze_headline_sentiment('fine')
+    assert sent.get_vader() is sent.get_vader()
+
+    df = pd.DataFrame({'review_text': ['Great service', 'Awful app', 'Great service']})
+    out = sent.batch_sentiment(df)
+    single = [sent.compute_sentiment(text) for text in df['review_text']]
+    assert out['sentiment_score'].tolist() == pytest.approx([r['score'] for r in single])
+    assert out['sentiment_label'].tolist() == [r['label'] for r in single]
+
+
+def test_fallback_results_are_not_cached_as_transformer(monkeypatch):
+    from src.pipeline.text_cache import TextCache, text_key
+
+    monkeypatch.setattr(sent, '_init_transformer_pipeline', lambda model_name=None: None)
+    monkeypatch.setattr(sent, '_vader_results', lambda texts, n_jobs=1: [{'score': 0.0, 'label': 'neutral', 'method': 'vader'} for _ in texts])
+    assert sent._resolved_method('transformer') == 'vader'
+
+    cache = TextCache()
+    sent.batch_sentiment(pd.DataFrame({'review_text': ['good']}), method='transformer', cache=cache)
+    assert text_key('good', f'sentiment/transformer/{sent._transformer_model_name}', sent.SENTIMENT_VERSION) not in cache._memory
+    assert text_key('good', 'sentiment/vader', sent.SENTIMENT_VERSION) in cache._memory
@@ -0,0 +1,95 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.pipeline.sentiment import batch_sentiment
+from src.pipeline.sentiment_service import SentimentService
+
+
+class LengthModel:
+    """Predictor that records every batch it is given."""
+
+    def __init__(self):
+        self.batches = []
+        self.seen = []
+
+    def predict(self, texts):
+        self.batches.append(len(texts))
+        self.seen.extend(texts)
+        if 'boom' in texts:
+            raise RuntimeError('boom')
+        return [{'score': float(len(text)), 'label': 'neutral', 'method': 'transformer'} for text in texts]
+
+
+def test_service_coalesces_concurrent_requests():
+    model = LengthModel()
+    with SentimentService(model, max_batch_texts=64, max_wait_ms=200) as service:
+        results = {}
+
+        def call(i):
+            results[i] = service.predict(['x' * i, 'y' * (i + 1)])
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = service.stats()
+
+    assert all([r['score'] for r in results[i]] == [i, i + 1] for i in range(10))
+    # One warm-up call, then far fewer model batches than requests
+    assert model.batches[0] == 1 and len(model.batches) - 1 < 10
+    assert stats['requests'] == 10 and stats['texts'] == 20
+    assert stats['mean_batch_texts'] > 2
+    assert stats['latency_p95_ms'] >= stats['latency_p50_ms'] > 0
+
+
+def test_service_batch_limit_and_errors():
+    model = LengthModel()
+    with SentimentService(model, max_batch_texts=3, max_wait_ms=50) as service:
+        futures = [service.submit(['a', 'b']) for _ in range(4)] + [service.submit(['ccc'] * 7)]
+        assert [f.result(5) for f in futures[:4]] == [[{'score': 1.0, 'label': 'neutral', 'method': 'transformer'}] * 2] * 4
+        assert [r['score'] for r in futures[4].result(5)] == [3.0] * 7
+        assert max(model.batches[1:]) <= 3
+
+        with pytest.raises(RuntimeError):
+            service.predict(['boom'])
+        assert service.stats()['errors'] == 1
+        assert service.predict([]) == []
+
+
+def test_service_survives_cancelled_and_bad_requests():
+    class ShortModel(LengthModel):
+        def predict(self, texts):
+            return super().predict(texts)[:-1] if 'short' in texts else super().predict(texts)
+
+    model = ShortModel()
+    with SentimentService(model, max_wait_ms=50) as service:
+        assert service.submit(['a']).cancel()
+        with pytest.raises(ValueError):
+            service.predict(['short', 'x'], timeout=5)
+        assert service.predict(['bb'], timeout=5)[0]['score'] == 2.0
+    assert 'a' not in model.seen
+
+
+def test_server_requires_authkey(monkeypatch):
+    from multiprocessing import AuthenticationError
+
+    from src.pipeline.sentiment_service import AUTHKEY_ENV, connect, start_server
+
+    monkeypatch.delenv(AUTHKEY_ENV, raising=False)
+    manager = start_server(('127.0.0.1', 0), model=LengthModel())
+    try:
+        assert connect(manager.address).predict(['abc'])[0]['score'] == 3.0
+        with pytest.raises(AuthenticationError):
+            connect(manager.address, authkey=b'guess')
+    finally:
+        manager.shutdown()
+
+
+def test_batch_sentiment_uses_service():
+    df = pd.DataFrame({'review_text': ['good', 'good', 'fine app']})
+    with SentimentService(LengthModel()) as service:
+        out = batch_sentiment(df, method='transformer', service=service)
+    assert out['sentiment_score'].tolist() == [4.0, 4.0, 8.0]
@@ -0,0 +1,80 @@
+"""
+Test the shared Arrow cache used by the dashboard workers
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from src.dashboard.queries import DashboardQueries
+from src.dashboard.shared_cache import SharedArrowCache, data_version_stamp
+
+
+def test_stamp_tracks_data_files_but_not_caches(tmp_path):
+    (tmp_path / 'dashboard_cache').mkdir()
+    (tmp_path / 'text_cache').mkdir()
+    (tmp_path / 'data.csv').write_text('a\n1\n')
+    stamp = data_version_stamp([tmp_path])
+    (tmp_path / 'dashboard_cache' / 'x.arrow').write_text('cached')
+    (tmp_path / 'text_cache' / 'results.sqlite').write_text('cached')
+    assert data_version_stamp([tmp_path]) == stamp
+    (tmp_path / 'data.csv').write_text('a\n1\n2\n')
+    assert data_version_stamp([tmp_path]) != stamp
+
+
+def test_cache_builds_once_and_maps_shared_file(tmp_path):
+    cache = SharedArrowCache(tmp_path / 'arrow')
+    observations = pd.DataFrame({
+        'indicator_code': ['ACC_OWNERSHIP', 'ACC_OWNERSHIP', 'ACC_MM_ACCOUNT'],
+        'source_name': ['Findex', None, 'Findex'],
+        'value_numeric': [46.0, 49.0, None],
+        'observation_date': ['2021-12-31', '2024-11-29', '2021-12-31'],
+    })
+
+    class Store:
+        calls = 0
+
+        def observations(self, arrow=False):
+            Store.calls += 1
+            return observations
+
+    first = DashboardQueries.from_shared_cache(Store(), cache, 'v1')
+    second = DashboardQueries.from_shared_cache(Store(), cache, 'v1')
+    assert Store.calls == 1
+    assert isinstance(second.observations['value_numeric'].dtype, pd.ArrowDtype)
+    assert second.stat('ACC_OWNERSHIP', 'max') == first.stat('ACC_OWNERSHIP', 'max') == 49.0
+    assert second.sources == ['Findex', 'unknown']
+    assert second.channel_means().equals(first.channel_means())
+
+    DashboardQueries.from_shared_cache(Store(), cache, 'v2')
+    assert [path.name for path in (tmp_path / 'arrow').glob('*.arrow')] == ['observations-v2.arrow']
+
+
+def test_write_survives_files_locked_by_mappings(tmp_path, monkeypatch):
+    """Windows refuses to replace or delete mapped files; writes carry on and pruning is retried"""
+    cache = SharedArrowCache(tmp_path / 'arrow')
+    frame = pd.DataFrame({'value': [1.0, 2.0]})
+    cache.write('obs', 'v1', frame)
+
+    real_unlink, real_replace = Path.unlink, os.replace
+
+    def locked_unlink(self, missing_ok=False):
+        if self.suffix == '.arrow':
+            raise PermissionError(self)
+        return real_unlink(self, missing_ok=missing_ok)
+
+    def locked_replace(src, dst):
+        if Path(dst).exists():
+            raise PermissionError(dst)
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(Path, 'unlink', locked_unlink)
+    monkeypatch.setattr(os, 'replace', locked_replace)
+    cache.write('obs', 'v2', frame)
+    cache.write('obs', 'v2', frame)
+    assert sorted(path.name for path in cache.root.iterdir()) == ['obs-v1.arrow', 'obs-v2.arrow']
+
+    monkeypatch.undo()
+    cache.write('obs', 'v2', frame)
+    assert [path.name for path in cache.root.iterdir()] == ['obs-v2.arrow']
+    assert cache.read('obs', 'v2')['value'].tolist() == [1.0, 2.0]
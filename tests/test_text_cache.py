@@ -0,0 +1,74 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.text_cache import TextCache, normalize_text, resolve_texts, resolve_vectors
+
+
+class Counter:
+    """Processor that records which texts it was asked to compute."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [len(text) for text in texts]
+
+
+def test_normalize_text():
+    assert normalize_text('  good\t\napp ') == 'good app'
+    assert normalize_text(None) == normalize_text(np.nan) == ''
+    assert normalize_text('café') == 'café'
+
+
+def test_resolve_texts_computes_each_distinct_text_once():
+    compute = Counter()
+    texts = pd.Series(['good app', 'good  app', None, '👍', 'good app', np.nan, '👍'])
+    results = resolve_texts(texts, compute, namespace='length')
+
+    assert results == [8, 8, 0, 1, 8, 0, 1]
+    assert compute.calls == [['good app', '', '👍']]
+
+
+def test_resolve_vectors_stacks_and_handles_empty_input():
+    def embed(texts):
+        return [np.full(3, len(text), dtype=float) for text in texts]
+
+    vectors = resolve_vectors(['ab', 'ab ', 'c'], embed, namespace='embedding/test', dim=3)
+    np.testing.assert_array_equal(vectors, [[2, 2, 2], [2, 2, 2], [1, 1, 1]])
+    assert resolve_vectors([], embed, namespace='embedding/test', dim=3).shape == (0, 3)
+
+
+def test_text_cache_reuses_results_across_instances(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    first = Counter()
+    resolve_texts(['a', 'bb', 'a'], first, namespace='length', version='1', cache=TextCache(path))
+
+    cache = TextCache(path)
+    second = Counter()
+    assert resolve_texts(['bb', 'ccc', 'a'], second, namespace='length', version='1', cache=cache) == [2, 3, 1]
+    assert second.calls == [['ccc']]
+    assert cache.counters['disk_hits'] == 2
+
+    # The memory front answers repeats without touching SQLite
+    resolve_texts(['bb'], second, namespace='length', version='1', cache=cache)
+    assert cache.counters['memory_hits'] == 1
+
+    # A new processor version never sees the old entries
+    third = Counter()
+    resolve_texts(['a'], third, namespace='length', version='2', cache=cache)
+    assert third.calls == [['a']]
+
+
+def test_text_cache_memory_bound_and_pickle(tmp_path):
+    cache = TextCache(memory_items=2)
+    resolve_texts(['a', 'b', 'c'], Counter(), namespace='length', cache=cache)
+    assert len(cache._memory) == 2
+
+    disk = TextCache(tmp_path / 'cache.sqlite')
+    resolve_texts(['a'], Counter(), namespace='length', cache=disk)
+    clone = pickle.loads(pickle.dumps(disk))
+    assert clone.path == disk.path
+    assert clone.get_many(list(disk._memory)) == dict(disk._memory)
@@ -0,0 +1,59 @@
+import re
+
+import pandas as pd
+import pytest
+
+nltk = pytest.importorskip('nltk')
+
+
+def _nltk_data_available():
+    for resource in ('tokenizers/punkt_tab', 'corpora/stopwords', 'corpora/wordnet', 'taggers/averaged_perceptron_tagger_eng'):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            return False
+    return True
+
+
+pytestmark = pytest.mark.skipif(not _nltk_data_available(), reason='NLTK data packages not installed')
+
+TEXTS = [
+    'The apps were crashing constantly, worst banking app!!',
+    'Transfers are running smoothly https://example.com',
+    None,
+    'The apps were crashing constantly, worst banking app!!',
+]
+
+
+def test_normalizer_matches_per_text_reference():
+    from nltk import pos_tag, word_tokenize
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+    from src.pipeline.preprocessing import TextNormalizer, _pos_tag_to_wordnet
+
+    normalizer = TextNormalizer()
+    lemmatizer = WordNetLemmatizer()
+    stop_words = set(stopwords.words('english'))
+    for text in TEXTS[:2]:
+        cleaned = re.sub(r"[^\w\s'-]", ' ', re.sub(r"http\S+|www\S+", " ", text))
+        tokens = [t.lower() for t in word_tokenize(cleaned) if t.isalpha()]
+        tokens = [t for t in tokens if t not in stop_words and len(t) >= 2]
+        expected = ' '.join(lemmatizer.lemmatize(tok, _pos_tag_to_wordnet(tag)) for tok, tag in pos_tag(tokens))
+        assert normalizer.normalize(text) == expected
+
+
+def test_normalize_series_parallel_and_cache():
+    from src.pipeline.preprocessing import TextNormalizer, preprocess_dataframe
+
+    normalizer = TextNormalizer()
+    series = pd.Series(TEXTS * 3)
+    sequential = normalizer.normalize_series(series)
+    assert sequential.iloc[2] == ''
+    assert sequential.iloc[0] == sequential.iloc[3]
+    assert normalizer.cache_info().hits > 0
+
+    parallel = normalizer.normalize_series(series, n_jobs=2, chunk_size=4)
+    pd.testing.assert_series_equal(parallel, sequential)
+
+    out = preprocess_dataframe(pd.DataFrame({'review_text': TEXTS}))
+    assert out['review_text_preprocessed'].tolist() == sequential.iloc[:4].tolist()
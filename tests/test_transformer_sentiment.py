@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src.pipeline.transformer_sentiment import plan_batches, transformer_available
+
+
+def test_plan_batches_sorts_and_respects_budget():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(3, 200, size=500)
+    batches = plan_batches(lengths, max_batch_tokens=1024, max_batch_size=16)
+
+    flat = np.concatenate(batches)
+    assert sorted(flat.tolist()) == list(range(len(lengths)))
+    assert np.all(np.diff(lengths[flat]) >= 0)
+    for batch in batches:
+        assert len(batch) <= 16
+        assert lengths[batch].max() * len(batch) <= 1024
+
+
+def test_plan_batches_oversized_text_gets_own_batch():
+    batches = plan_batches([5, 900, 5], max_batch_tokens=100)
+    assert [b.tolist() for b in batches] == [[0, 2], [1]]
+    assert plan_batches([]) == []
+
+
+@pytest.mark.skipif(not transformer_available(), reason="torch/transformers not installed")
+def test_transformer_sentiment_keeps_input_order():
+    from src.pipeline.transformer_sentiment import TransformerSentiment
+
+    model = TransformerSentiment(window=2, max_batch_size=2)
+    texts = ['great app, love it', 'terrible, it keeps crashing ' * 200, 'great app, love it']
+    results = model.predict(texts)
+    assert [r['label'] for r in results] == ['positive', 'negative', 'positive']
+    assert results[0] == results[2]
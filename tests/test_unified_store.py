@@ -0,0 +1,109 @@
+"""
+Test the columnar unified-data store
+"""
+import pandas as pd
+import pytest
+
+from src.data.unified_store import UnifiedStore
+
+
+@pytest.fixture
+def unified_csv(tmp_path):
+    df = pd.DataFrame({
+        'record_id': ['REC_1', 'REC_2', 'REC_3', 'REC_4', 'EVT_1', 'IMP_1'],
+        'parent_id': [None, None, None, None, None, 'EVT_1'],
+        'record_type': ['observation', 'observation', 'observation', 'observation', 'event', 'impact_link'],
+        'indicator_code': ['ACC_OWNERSHIP', 'ACC_MM_ACCOUNT', 'ACC_OWNERSHIP', 'ACC_OWNERSHIP', 'EVT_TELEBIRR', None],
+        'value_numeric': [22.0, 4.7, 46.0, 35.0, None, 15.0],
+        'observation_date': ['2014-12-31', '2021-12-31', '2021-12-31', '2017-12-31', '2021-05-17', '2021-05-17'],
+        'related_indicator': [None, None, None, None, None, 'ACC_OWNERSHIP'],
+    })
+    path = tmp_path / 'unified.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_build_partitions_by_record_type(unified_csv, tmp_path):
+    store = UnifiedStore.build(unified_csv, root=tmp_path / 'store')
+    assert store.record_types == ['event', 'impact_link', 'observation']
+    assert store.keys() == ['ACC_MM_ACCOUNT', 'ACC_OWNERSHIP']
+
+
+def test_observations_filters_by_indicator_and_date(unified_csv, tmp_path):
+    store = UnifiedStore.build(unified_csv, root=tmp_path / 'store')
+    obs = store.observations(['ACC_OWNERSHIP'], start='2015-01-01', end='2021-12-31')
+    assert list(obs['value_numeric']) == [35.0, 46.0]
+    assert isinstance(obs['value_numeric'].dtype, pd.ArrowDtype)
+
+    numpy_backed = store.observations(start='2021-01-01', arrow=False)
+    assert set(numpy_backed['indicator_code']) == {'ACC_OWNERSHIP', 'ACC_MM_ACCOUNT'}
+
+
+def test_open_or_build_reuses_fresh_store(unified_csv, tmp_path):
+    root = tmp_path / 'store'
+    UnifiedStore.build(unified_csv, root=root)
+    reopened = UnifiedStore.open_or_build(unified_csv, root=root)
+    assert not reopened.is_stale(unified_csv)
+    assert list(reopened.impact_links(['ACC_OWNERSHIP'])['parent_id']) == ['EVT_1']
+
+
+def test_upsert_writes_delta_and_tracks_changes(unified_csv, tmp_path):
+    store = UnifiedStore.build(unified_csv, root=tmp_path / 'store')
+    base_version = store.version
+
+    new_rows = pd.DataFrame({
+        'record_id': ['REC_3', 'REC_9'],
+        'record_type': ['observation', 'observation'],
+        'indicator_code': ['ACC_OWNERSHIP', 'ACC_OWNERSHIP'],
+        'value_numeric': [47.0, 49.0],
+        'observation_date': ['2021-12-31', '2024-11-29'],
+    })
+    version = store.upsert(new_rows)
+    assert version == base_version + 1
+    assert list(store.observations(['ACC_OWNERSHIP'])['value_numeric']) == [22.0, 35.0, 47.0, 49.0]
+
+    changed = store.changes_since(base_version)
+    assert set(changed['record_id']) == {'REC_3', 'REC_9'}
+    assert store.changes_since(version).empty
+
+    store.compact()
+    reopened = UnifiedStore(tmp_path / 'store')
+    assert reopened.manifest['deltas'] == []
+    assert list(reopened.observations(['ACC_OWNERSHIP'])['value_numeric']) == [22.0, 35.0, 47.0, 49.0]
+    assert set(reopened.changes_since(base_version)['record_id']) == {'REC_3', 'REC_9'}
+
+
+def test_upsert_rejects_orphan_impact_links(unified_csv, tmp_path):
+    store = UnifiedStore.build(unified_csv, root=tmp_path / 'store')
+    orphan = pd.DataFrame({
+        'record_id': ['IMP_2'],
+        'record_type': ['impact_link'],
+        'parent_id': ['EVT_404'],
+        'related_indicator': ['ACC_MM_ACCOUNT'],
+    })
+    with pytest.raises(ValueError, match='EVT_404'):
+        store.upsert(orphan)
+
+    linked = pd.DataFrame({
+        'record_id': ['EVT_2', 'IMP_2'],
+        'record_type': ['event', 'impact_link'],
+        'parent_id': [None, 'EVT_2'],
+        'related_indicator': [None, 'ACC_MM_ACCOUNT'],
+    })
+    store.upsert(linked)
+    assert list(store.impact_links(['ACC_MM_ACCOUNT'])['parent_id']) == ['EVT_2']
+
+
+def test_reads_during_background_compaction(unified_csv, tmp_path):
+    """Keyed reads stay consistent while compactions replace the tables and indexes"""
+    store = UnifiedStore.build(unified_csv, root=tmp_path / 'store')
+    for i in range(5):
+        store.upsert(pd.DataFrame({
+            'record_id': [f'REC_X{i}'], 'record_type': ['observation'], 'indicator_code': ['ACC_OWNERSHIP'],
+            'value_numeric': [50.0 + i], 'observation_date': [f'{2025 + i}-12-31'],
+        }))
+        thread = store.compact(background=True)
+        for _ in range(20):
+            values = store.observations(['ACC_OWNERSHIP'], start='2015-01-01')['value_numeric']
+            assert list(values)[:2] == [35.0, 46.0] and len(values) == 3 + i
+        thread.join()